@@ -6,73 +6,120 @@ class Card(object):
     """
     A class to represent a Poker Game Card.
 
+    Cards are immutable and interned: the 52 cards are built once (when the module is
+    imported) and constructing a card returns the existing instance, so cards can be
+    compared by identity and converted from bitwise evaluations without allocations.
     ...
 
     Attributes
     ----------
     _card_num : int
-        value of Poker Game card (can be value between 2 and 14 or value in ['T', 'J', 'Q', 'K', 'A'])
+        value of Poker Game card (can be value between 2 and 9 or value in ['T', 'J', 'Q', 'K', 'A'])
     _suit : str
         suit of Poker Game card (can be value in ['c', 'd', 's', 'h'])
+    _num : int
+        numeric value of Poker Game card (between 2 and 14)
+    _suit_index : int
+        index of suit of Poker Game card in suits
+    _evaluation : int
+        bitwise evaluation of Poker Game card (readable by hand Evaluator)
+    _sort_key : int
+        key by which cards are ordered (numeric value of card)
     n_enumerator : dict
         mapping from card letter value to card number value
     suits : list
         suits possible for a card
+    interned : dict
+        card of each (numeric value, suit) pair
+    by_evaluation : dict
+        card of each bitwise evaluation
+    deck : list
+        the 52 cards (built when the module is imported)
     """
 
+    __slots__ = ('_card_num', '_suit', '_num', '_suit_index', '_evaluation', '_sort_key')
+
     # mapping from card letter value to card number value
     n_enumerator = {'T': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14}
 
     # suits possible for a card (Clubs, Diamonds, Spades, Hearts)
     suits = ['c', 'd', 's', 'h']
 
-    def __init__(self, card_num, card_suit):
+    # cards already built (by (numeric value, suit) and by bitwise evaluation)
+    interned = {}
+    by_evaluation = {}
+
+    def __new__(cls, card_num, card_suit):
         """ 
-        Constructor for all the necessary attributes of the Card object.
+        Returns the Card of the entered value and suit (built on first use).
         """
         if type(card_num) == int:
             if card_num < 2 or card_num > 14:
                 raise Exception(
                     'Card number must be between 2 and 14 (inclusive).')
-            self._card_num = card_num
-            for k in self.n_enumerator:
-                if self.n_enumerator[k] == card_num:
-                    self._card_num = k
+            num = card_num
         elif type(card_num) == str:
-            if card_num.upper() not in self.n_enumerator:
+            if card_num.upper() not in cls.n_enumerator:
                 raise Exception(
                     "Card letter must be \'T\', \'J\', \'Q\', \'K\', or \'A\'.")
-            self._card_num = card_num.upper()
+            num = cls.n_enumerator[card_num.upper()]
         else:
             raise Exception('Card number/letter must be number or string.')
 
-        if card_suit.lower() not in self.suits:
+        if type(card_suit) != str or card_suit.lower() not in cls.suits:
             raise Exception(
                 "Invalid suit. Valid suits are \'c\', \'d\', \'s\', and \'h\'.")
-        self._suit = card_suit.lower()
+        suit = card_suit.lower()
+
+        card = cls.interned.get((num, suit))
+        if card is None:
+            card = object.__new__(cls)
+            letter = CardService.card_values[num - 2]
+            object.__setattr__(card, '_card_num', letter if letter in cls.n_enumerator else num)
+            object.__setattr__(card, '_suit', suit)
+            object.__setattr__(card, '_num', num)
+            object.__setattr__(card, '_suit_index', cls.suits.index(suit))
+            object.__setattr__(card, '_evaluation', CardService.create_evaluation(letter + suit))
+            object.__setattr__(card, '_sort_key', num)
+            cls.interned[(num, suit)] = card
+            cls.by_evaluation[card._evaluation] = card
+        return card
+
+    def __setattr__(self, name, value):
+        raise Exception('Cards are immutable.')
+
+    def __reduce__(self):
+        ''' Cards are pickled by value and suit (unpickling returns the interned card). '''
+        return (Card, (self._num, self._suit))
+
+    @staticmethod
+    def from_evaluation_int(card):
+        """ Returns Card of an integer value readable by hand Evaluator (e.g. for narration or features)"""
+        return Card.by_evaluation[card]
 
     def to_evaluation_int(self):
         """ Returns corresponding integer value of Card which is readable by hand Evaluator"""
-        return CardService.create_evaluation(str(self))
+        return self._evaluation
 
     def get_card_num(self):
         """ Getter for card numeric value"""
-
-        if self._card_num in self.n_enumerator:
-            return self.n_enumerator[self._card_num]
-        return self._card_num
+        return self._num
 
     def get_card_suit(self):
         ''' Getter for card suit '''
         return self._suit
 
+    def get_suit_index(self):
+        ''' Getter for index of card suit in suits '''
+        return self._suit_index
+
     def __lt__(self, other):
         ''' 
         Less than Comparator for card object.
 
         Compares card values.
         '''
-        return self.get_card_num() < other.get_card_num()
+        return self._sort_key < other._sort_key
 
     def __str__(self):
         '''
@@ -81,3 +128,7 @@ class Card(object):
         e.g. 7H (for 7 of Hearts)
         '''
         return str(self._card_num) + self._suit
+
+
+# build the 52 cards of the deck
+Card.deck = [Card(num, suit) for suit in Card.suits for num in range(2, 15)]
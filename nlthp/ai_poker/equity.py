@@ -0,0 +1,297 @@
+import atexit
+import itertools
+import math
+import multiprocessing
+from collections import OrderedDict
+from statistics import NormalDist
+
+import numpy
+
+from ai_poker.evaluator.deck import Deck
+from ai_poker.evaluator.evaluator import Evaluator
+
+# number of runouts sampled and evaluated together by a worker
+CHUNK_SIZE = 5000
+
+# Evaluator of current process (created on first use, lookups are shared through the LookupTable cache)
+evaluator = None
+
+# process pools already started (by number of workers), reused across calls
+pools = {}
+
+# exact equities already enumerated (by canonical key), oldest are discarded first
+CACHE_SIZE = 10000
+exact_cache = OrderedDict()
+
+# suit bits of the 4 suits, permuted to find suit-isomorphic hands
+SUITS = (1, 2, 4, 8)
+
+
+def get_evaluator():
+    ''' Returns Evaluator of current process. '''
+    global evaluator
+    if evaluator is None:
+        evaluator = Evaluator()
+    return evaluator
+
+
+def get_pool(workers):
+    ''' Returns process pool with the entered number of workers (started on first use). '''
+    if workers not in pools:
+        pools[workers] = multiprocessing.Pool(workers)
+    return pools[workers]
+
+
+@atexit.register
+def close_pools():
+    ''' Stops process pools started by this module. '''
+    for pool in pools.values():
+        pool.terminate()
+    pools.clear()
+
+
+def check_cards(cards):
+    ''' Raises Exception if a card has been entered twice. '''
+    if len(set(cards)) != len(cards):
+        raise Exception('Cards must be distinct.')
+
+
+def sample_equity(hole, board, opponents, n_opponents, n_samples, seed):
+    """
+    Samples runouts of the remaining deck and returns the sum and sum of squares of the
+    share of the pot won by hole cards in each runout (1 for a win, 1/k for a k-way tie).
+
+    Missing board cards and the hole cards of n_opponents random opponents are dealt from
+    the remaining deck, opponents with known hole cards are entered in opponents.
+    """
+    rng = numpy.random.default_rng(seed)
+    dead = list(hole) + list(board) + [card for cards in opponents for card in cards]
+    remaining = numpy.array([card for card in Deck.get_deck_of_cards() if card not in dead], dtype=numpy.int64)
+
+    # deal cards in a random order for each runout
+    num_board = 5 - len(board)
+    order = rng.random((n_samples, len(remaining))).argsort(axis=1)[:, :num_board + 2 * n_opponents]
+    dealt = remaining[order]
+
+    boards = numpy.concatenate((numpy.tile(numpy.array(board, dtype=numpy.int64), (n_samples, 1)),
+                                dealt[:, :num_board]), axis=1)
+    hole_cards = [numpy.tile(numpy.array(cards, dtype=numpy.int64), (n_samples, 1)) for cards in opponents]
+    hole_cards += [dealt[:, num_board + 2 * i:num_board + 2 * i + 2] for i in range(n_opponents)]
+
+    ranks = get_evaluator().evaluate_batch(numpy.tile(numpy.array(hole, dtype=numpy.int64), (n_samples, 1)), boards)
+    opponent_ranks = numpy.stack([get_evaluator().evaluate_batch(cards, boards) for cards in hole_cards])
+
+    # pot is split between players with the best hand
+    best = opponent_ranks.min(axis=0)
+    ties = (opponent_ranks == ranks).sum(axis=0)
+    share = numpy.where(ranks < best, 1.0, numpy.where(ranks == best, 1.0 / (ties + 1), 0.0))
+
+    return float(share.sum()), float((share ** 2).sum())
+
+
+def estimate_equity(hole, board=(), n_opponents=1, n_samples=100000, workers=None, opponents=(),
+                    margin=None, confidence=0.95, seed=None):
+    """
+    Estimates equity of hole cards (expected share of the pot at showdown) by Monte Carlo
+    sampling of the remaining deck.
+
+    ...
+
+    Parameters
+    ----------
+    hole : list
+        hole cards (in bitwise evaluation format)
+    board : list
+        community cards dealt so far (0, 3, 4 or 5 cards)
+    n_opponents : int
+        number of opponents with random hole cards
+    n_samples : int
+        maximum number of runouts sampled
+    workers : int
+        number of worker processes sampling runouts (sampled in current process if None or 1)
+    opponents : list
+        hole cards of opponents with known cards (in addition to the random opponents)
+    margin : float
+        sampling stops early once the confidence interval is within +/- margin of the equity
+    confidence : float
+        confidence level of the confidence interval
+    seed : int
+        seed of the random runouts
+
+    Returns
+    -------
+    tuple
+        (equity, margin of confidence interval, number of runouts sampled)
+    """
+
+    hole, board, opponents = list(hole), list(board), [list(cards) for cards in opponents]
+    check_cards(hole + board + [card for cards in opponents for card in cards])
+    if len(hole) != 2 or len(board) not in (0, 3, 4, 5):
+        raise Exception('Enter 2 hole cards and 0, 3, 4 or 5 board cards.')
+    if n_opponents + len(opponents) < 1:
+        raise Exception('Equity needs at least one opponent.')
+    if n_samples < 1:
+        raise Exception('Equity needs at least one sample.')
+    if 2 * n_opponents + 5 - len(board) > 52 - len(hole) - len(board) - 2 * len(opponents):
+        raise Exception('Not enough cards left in the deck for ' + str(n_opponents) + ' random opponents.')
+
+    workers = workers or 1
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    seeds = numpy.random.SeedSequence(seed)
+
+    total, total_squares, sampled = 0.0, 0.0, 0
+    while sampled < n_samples:
+        # each worker samples one chunk of runouts per round
+        chunks = []
+        for i in range(workers):
+            size = min(CHUNK_SIZE, n_samples - sampled - CHUNK_SIZE * i)
+            if size <= 0:
+                break
+            chunks.append((hole, board, opponents, n_opponents, size, seeds.spawn(1)[0]))
+
+        if workers == 1:
+            results = [sample_equity(*chunk) for chunk in chunks]
+        else:
+            results = get_pool(workers).starmap(sample_equity, chunks)
+
+        for chunk, (chunk_total, chunk_squares) in zip(chunks, results):
+            total += chunk_total
+            total_squares += chunk_squares
+            sampled += chunk[4]
+
+        # standard error of the mean share
+        equity = total / sampled
+        variance = max(total_squares / sampled - equity ** 2, 0.0)
+        error = z * math.sqrt(variance / sampled)
+        if margin is not None and error <= margin:
+            break
+
+    return equity, error, sampled
+
+
+def permute_suits(cards, permutation):
+    ''' Returns cards with suit bits replaced through the entered suit permutation (suit bit -> suit bit). '''
+    return [(card & ~0xF000) | (permutation[(card >> 12) & 0xF] << 12) for card in cards]
+
+
+def canonical_key(holes, board, dead):
+    """
+    Returns the same key for every deal that only differs by a permutation of suits
+    (and by the order of cards within hole cards, board and dead cards).
+
+    The key is the smallest deal found through the 24 suit permutations and is a valid
+    deal itself, with players in the same order as entered.
+    """
+    best = None
+    for suits in itertools.permutations(SUITS):
+        permutation = dict(zip(SUITS, suits))
+        key = (tuple(tuple(sorted(permute_suits(cards, permutation))) for cards in holes),
+               tuple(sorted(permute_suits(board, permutation))),
+               tuple(sorted(permute_suits(dead, permutation))))
+        if best is None or key < best:
+            best = key
+    return best
+
+
+def enumerate_runouts(holes, board, remaining, first_cards):
+    """
+    Evaluates every runout of the remaining deck whose first card is one of first_cards
+    (indexes in remaining) and returns the number of runouts along with the runouts won,
+    the runouts tied and the pot shares of each player.
+    """
+    num_players = len(holes)
+    wins, ties, shares = numpy.zeros(num_players), numpy.zeros(num_players), numpy.zeros(num_players)
+    num_runouts = 0
+    missing = 5 - len(board)
+    remaining = numpy.array(remaining, dtype=numpy.int64)
+
+    for first in first_cards:
+        # runouts are the first card with every combination of the following cards
+        if missing:
+            rest = numpy.fromiter(itertools.chain.from_iterable(
+                itertools.combinations(range(first + 1, len(remaining)), missing - 1)), dtype=numpy.intp)
+            rest = rest.reshape(-1, missing - 1)
+            runouts = numpy.concatenate((numpy.full((len(rest), 1), remaining[first]), remaining[rest]), axis=1)
+        else:
+            runouts = numpy.zeros((1, 0), dtype=numpy.int64)
+        boards = numpy.concatenate((numpy.tile(numpy.array(board, dtype=numpy.int64), (len(runouts), 1)), runouts),
+                                   axis=1)
+
+        ranks = numpy.stack([get_evaluator().evaluate_batch(numpy.tile(numpy.array(cards, dtype=numpy.int64),
+                                                                       (len(boards), 1)), boards)
+                             for cards in holes])
+        winners = ranks == ranks.min(axis=0)
+        num_winners = winners.sum(axis=0)
+
+        wins += (winners & (num_winners == 1)).sum(axis=1)
+        ties += (winners & (num_winners > 1)).sum(axis=1)
+        shares += (winners / num_winners).sum(axis=1)
+        num_runouts += len(boards)
+
+    return num_runouts, wins, ties, shares
+
+
+def enumerate_equity(holes, board=(), dead=(), workers=None):
+    """
+    Computes exact equities of players all-in before the river by evaluating every
+    runout of the remaining board cards.
+
+    Results are cached by canonical key, so deals that only differ by a permutation of
+    suits are only enumerated once.
+
+    ...
+
+    Parameters
+    ----------
+    holes : list
+        hole cards of each player (in bitwise evaluation format)
+    board : list
+        community cards dealt so far (0, 3, 4 or 5 cards)
+    dead : list
+        cards known to be out of the deck (e.g. folded hole cards)
+    workers : int
+        number of worker processes enumerating runouts (enumerated in current process if None or 1)
+
+    Returns
+    -------
+    list
+        (share of runouts won, share of runouts tied, equity) of each player
+    """
+
+    holes, board, dead = [list(cards) for cards in holes], list(board), list(dead)
+    check_cards([card for cards in holes for card in cards] + board + dead)
+    if len(holes) < 2 or any(len(cards) != 2 for cards in holes):
+        raise Exception('Enter 2 hole cards for at least 2 players.')
+    if len(board) not in (0, 3, 4, 5):
+        raise Exception('Enter 0, 3, 4 or 5 board cards.')
+
+    key = canonical_key(holes, board, dead)
+    if key in exact_cache:
+        exact_cache.move_to_end(key)
+        return list(exact_cache[key])
+    holes, board, dead = [list(cards) for cards in key[0]], list(key[1]), list(key[2])
+
+    used = [card for cards in holes for card in cards] + board + dead
+    remaining = [card for card in Deck.get_deck_of_cards() if card not in used]
+    missing = 5 - len(board)
+    first_cards = list(range(len(remaining) - missing + 1)) if missing else [0]
+
+    # first cards are dealt round-robin so every task gets a similar number of runouts
+    workers = workers or 1
+    num_tasks = min(len(first_cards), workers * 4) if workers > 1 else 1
+    tasks = [(holes, board, remaining, first_cards[i::num_tasks]) for i in range(num_tasks)]
+    if workers == 1:
+        results = [enumerate_runouts(*task) for task in tasks]
+    else:
+        results = get_pool(workers).starmap(enumerate_runouts, tasks)
+
+    num_runouts = sum(result[0] for result in results)
+    wins = sum(result[1] for result in results) / num_runouts
+    ties = sum(result[2] for result in results) / num_runouts
+    shares = sum(result[3] for result in results) / num_runouts
+    equities = [(float(wins[i]), float(ties[i]), float(shares[i])) for i in range(len(holes))]
+
+    exact_cache[key] = equities
+    if len(exact_cache) > CACHE_SIZE:
+        exact_cache.popitem(last=False)
+    return list(equities)
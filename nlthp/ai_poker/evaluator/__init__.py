@@ -1,3 +1,5 @@
 from ai_poker.evaluator.card_service import CardService 
-from ai_poker.evaluator.deck import Deck 
+from ai_poker.evaluator.deck import Deck, Shoe 
 from ai_poker.evaluator.evaluator import Evaluator 
+from ai_poker.evaluator.hand_state import HandState 
+from ai_poker.evaluator.isomorphism import HandIndexer 
@@ -69,6 +69,18 @@ class CardService(object):
     # unicodes for hearts and diamonds
     unicode_reds = [2, 4]
 
+    # cards dealt in each round of hands indexed by canonicalize (by number of board cards,
+    # the order of board cards does not matter)
+    canonical_rounds = {
+        0 : (2,),    # preflop
+        3 : (2, 3),  # flop
+        4 : (2, 4),  # turn
+        5 : (2, 5),  # river
+    }
+
+    # hand indexers used by canonicalize (created on first use, by number of board cards)
+    indexers = {}
+
     @staticmethod
     def create_evaluation(card_value_suit_pair):
         ''' Creates bit evaluation given a card value-suit pair. '''
@@ -168,4 +180,29 @@ class CardService(object):
     @staticmethod
     def get_suit_bit(card):
         ''' Returns bit value of card suit. '''
-        return (card >> 12) & 0xF
\ No newline at end of file
+        return (card >> 12) & 0xF
+
+    @staticmethod
+    def get_indexer(num_board_cards):
+        ''' Returns HandIndexer of hands with the entered number of board cards. '''
+        from ai_poker.evaluator.isomorphism import HandIndexer
+
+        if num_board_cards not in CardService.canonical_rounds:
+            raise Exception('Enter 0, 3, 4 or 5 board cards.')
+        if num_board_cards not in CardService.indexers:
+            CardService.indexers[num_board_cards] = HandIndexer(CardService.canonical_rounds[num_board_cards])
+        return CardService.indexers[num_board_cards]
+
+    @staticmethod
+    def canonicalize(hole, board=()):
+        """
+        Returns index of the suit-isomorphic class of hole cards and board.
+
+        Hands that only differ by a permutation of suits (or by the order of hole cards
+        and of board cards) get the same index: 169 indexes preflop, 1,286,792 on the
+        flop, 13,960,050 on the turn and 123,156,254 on the river. Indexes are dense (0 to size of the indexer - 1), so they can be used
+        as cache keys or as indexes of arrays.
+        """
+
+        board = list(board)
+        return CardService.get_indexer(len(board)).index([list(hole), board] if board else [list(hole)])
@@ -1,5 +1,8 @@
 
 from random import shuffle
+
+import numpy
+
 from ai_poker.evaluator.card_service import CardService
 
 class Deck(object):
@@ -14,6 +17,8 @@ class Deck(object):
     ----------
     cards : list
         list of Poker Card bitwise Evaluations
+    position : int
+        index of the next card to take from the top of the deck
     """
 
     complete_deck = []
@@ -24,25 +29,28 @@ class Deck(object):
         self.shuffle()
 
     def shuffle(self):
-        ''' Shuffles deck of cards. '''
+        ''' Shuffles deck of cards (cards already taken are put back). '''
         shuffle(self.cards)
+        self.position = 0
 
     def take_card(self, n=1):
         ''' Returns card from top of deck (enter number of cards to return). '''
+        if self.position + n > len(self.cards):
+            raise Exception('Not enough cards left in deck.')
 
         # take top card
         if n == 1:
-            return self.cards.pop(0)
+            self.position += 1
+            return self.cards[self.position - 1]
 
         # take number of cards specified 
-        cards = []
-        for i in range(n):
-            cards.append(self.take_card())
+        cards = self.cards[self.position:self.position + n]
+        self.position += n
         return cards
 
     def __str__(self):
         ''' Pretty prints deck of cards through unicode values. '''
-        return CardService.print_cards(self.cards)
+        return CardService.print_cards(self.cards[self.position:])
 
     @staticmethod
     def get_deck_of_cards():
@@ -56,4 +64,61 @@ class Deck(object):
                 # create Evaluation for each rank - suit combo
                 Deck.complete_deck.append(CardService.create_evaluation(rank + suit))
 
-        return list(Deck.complete_deck)
\ No newline at end of file
+        return list(Deck.complete_deck)
+
+
+class Shoe(object):
+    """
+    A class to represent a block of pre-shuffled decks (of bitwise evaluations).
+
+    Decks are shuffled num_decks at a time as the rows of a NumPy array, so the cost of
+    shuffling is shared by many hands and each hand only moves a cursor to the next row.
+    ...
+
+    Attributes
+    ----------
+    num_decks : int
+        number of decks shuffled at once
+    rng : Generator
+        random generator of the shuffles (seeded for reproducible simulations)
+    decks : ndarray
+        current block of shuffled decks (num_decks x 52)
+    rows : list
+        rows of decks as lists of cards (read by the table engine)
+    cursor : int
+        index of the next deck of the block
+    """
+
+    def __init__(self, num_decks=1024, seed=None):
+        ''' Initialises generator of shuffled decks (first block is shuffled on first use). '''
+        self.num_decks = num_decks
+        self.rng = numpy.random.default_rng(seed)
+        self.decks = None
+        self.rows = None
+        self.cursor = num_decks
+
+    def shuffle(self):
+        ''' Shuffles a new block of decks. '''
+        cards = numpy.tile(numpy.array(Deck.get_deck_of_cards(), dtype=numpy.int64), (self.num_decks, 1))
+        self.decks = self.rng.permuted(cards, axis=1)
+        self.rows = self.decks.tolist()
+        self.cursor = 0
+
+    def next_deck(self):
+        ''' Returns next shuffled deck (list of 52 cards, must not be modified). '''
+        if self.cursor == self.num_decks:
+            self.shuffle()
+        self.cursor += 1
+        return self.rows[self.cursor - 1]
+
+    def next_decks(self, n):
+        ''' Returns the next n shuffled decks as an (n, 52) array. '''
+        decks = []
+        while n > 0:
+            if self.cursor == self.num_decks:
+                self.shuffle()
+            taken = min(n, self.num_decks - self.cursor)
+            decks.append(self.decks[self.cursor:self.cursor + taken])
+            self.cursor += taken
+            n -= taken
+        return numpy.concatenate(decks) if decks else numpy.zeros((0, 52), dtype=numpy.int64)
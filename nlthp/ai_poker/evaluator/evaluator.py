@@ -1,7 +1,8 @@
 
-import itertools
-from ai_poker.evaluator.card_service import CardService
+import numpy
+
 from ai_poker.evaluator.deck import Deck
+from ai_poker.evaluator.hand_state import HandState
 from ai_poker.evaluator.lookup import LookupTable
 
 class Evaluator(object):
@@ -15,23 +16,26 @@ class Evaluator(object):
     - 5 card hand (on flop)
     - 6 card hand (on turn)
     - 7 card hand (on river)
+
+    6 and 7 card hands are looked up directly (one unsuited lookup and one
+    flush lookup per suit) instead of evaluating every 5 card combination.
     ...
 
     Attributes
     ----------
     table : LookupTable
-        dictionary for efficiently looking up Poker hand values/strengths
+        arrays for efficiently looking up Poker hand values/strengths
     '''
 
     def __init__(self):
         ''' 
-        Initialises LookupTable attributes and generates LookupTable.
+        Initialises LookupTable attributes and loads LookupTable.
         
-        Generates LookupTable mappings for 5 card hands, 6 card hands and 7
-        card hands.
+        LookupTable mappings for 5 card hands, 6 card hands and 7 card hands are
+        generated once, cached on disk and shared by all Evaluators.
         '''
 
-        self.table = LookupTable()
+        self.table = LookupTable.load()
         
         self.hand_map = {
             5 : self.evaluate_five_cards,
@@ -44,6 +48,47 @@ class Evaluator(object):
         all_cards = cards + board
         return self.hand_map[len(all_cards)](all_cards)
 
+    def start(self, hole_cards):
+        '''
+        Returns HandState holding the entered hole cards, to which the board cards are added 
+        street by street (each card added costs O(1) and the hand is evaluated with rank()).
+        '''
+        return HandState(self.table, hole_cards)
+
+    def evaluate_batch(self, hole_cards, boards):
+        '''
+        Performs lookup of many hand values/strengths at once.
+
+        Takes an (N, 2) array of hole cards and an (N, 3), (N, 4) or (N, 5) array of 
+        boards (cards in bitwise evaluation format) and returns an (N,) array of ranks in 
+        the range [1, 7462], computed with array operations only.
+        '''
+        hole_cards = numpy.asarray(hole_cards, dtype=numpy.int64)
+        boards = numpy.asarray(boards, dtype=numpy.int64)
+        if hole_cards.ndim != 2 or hole_cards.shape[1] != 2:
+            raise Exception('Hole cards must be an array of shape (N, 2).')
+        if boards.ndim != 2 or boards.shape[0] != hole_cards.shape[0] or not 3 <= boards.shape[1] <= 5:
+            raise Exception('Boards must be an array of shape (N, 3), (N, 4) or (N, 5).')
+
+        cards = numpy.concatenate((hole_cards, boards), axis=1)
+        lookup_flush, lookup_unsuited, hash_high, hash_low = self.table.get_arrays()
+        rank_keys = numpy.array(LookupTable.rank_keys, dtype=numpy.int64)
+
+        # best unsuited hand from unsuited index of all cards
+        keys = rank_keys[(cards >> 8) & 0xF].sum(axis=1)
+        index = hash_high[keys // LookupTable.hash_split] + hash_low[keys % LookupTable.hash_split]
+        ranks = lookup_unsuited[index].astype(numpy.int32)
+
+        # best flush from rank mask of each suit (0 when suit has fewer than 5 cards)
+        suits = (cards >> 12) & 0xF
+        rank_bits = cards >> 16
+        for suit in (1, 2, 4, 8):
+            masks = numpy.bitwise_or.reduce(numpy.where(suits == suit, rank_bits, 0), axis=1)
+            flushes = lookup_flush[masks]
+            ranks = numpy.where((flushes > 0) & (flushes < ranks), flushes, ranks)
+
+        return ranks
+
     def evaluate_five_cards(self, cards):
         """
         Performs a hand evalution given a hand of 5 cards (after flop), mapping them to
@@ -51,48 +96,59 @@ class Evaluator(object):
         """
         if cards[0] & cards[1] & cards[2] & cards[3] & cards[4] & 0xF000:
             handOR = (cards[0] | cards[1] | cards[2] | cards[3] | cards[4]) >> 16
-            prime = CardService.prime_product_from_rankings(handOR)
-            return self.table.lookup_flush[prime]
+            return self.table.lookup_flush[handOR]
 
         else:
-            prime = CardService.prime_product_from_hand(cards)
-            return self.table.lookup_unsuited[prime]
+            rank_keys = LookupTable.rank_keys
+            key = rank_keys[(cards[0] >> 8) & 0xF] + rank_keys[(cards[1] >> 8) & 0xF] \
+                + rank_keys[(cards[2] >> 8) & 0xF] + rank_keys[(cards[3] >> 8) & 0xF] \
+                + rank_keys[(cards[4] >> 8) & 0xF]
+            table = self.table
+            return table.lookup_unsuited[table.hash_high[key // LookupTable.hash_split] 
+                                         + table.hash_low[key % LookupTable.hash_split]]
 
     def evaluate_six_cards(self, cards):
         """
         Performs a hand evalution given a hand of 6 cards (after turn), mapping them to
         a rank in the range [1, 7462], with lower ranks being better evaluations.
         """
-        minimum = LookupTable.possible_high_card
-
-        # generate combinations of five card hands
-        five_card_combos = itertools.combinations(cards, 5)
-
-        # calculate what best 5 card hand is (discards one card)
-        for combo in five_card_combos:
-            score = self.evaluate_five_cards(combo)
-            if score < minimum:
-                minimum = score
-
-        return minimum
+        return self.evaluate_many_cards(cards)
 
     def evaluate_seven_cards(self, cards):
         """
         Performs a hand evalution given a hand of 7 cards (after river), mapping them to
         a rank in the range [1, 7462], with lower ranks being better evaluations.
         """
-        minimum = LookupTable.possible_high_card
+        return self.evaluate_many_cards(cards)
 
-        # generate combinations of five card hands
-        five_card_combos = itertools.combinations(cards, 5)
-
-        # calculate what best 5 card hand is (discards two cards)
-        for combo in five_card_combos:
-            score = self.evaluate_five_cards(combo)
-            if score < minimum:
-                minimum = score
+    def evaluate_many_cards(self, cards):
+        """
+        Performs a direct hand evaluation of 5 to 7 cards without going through
+        every 5 card combination.
 
-        return minimum
+        The unsuited index of all cards gives the best unsuited hand in one lookup and
+        the rank mask of each suit gives the best flush in one lookup.
+        """
+        table = self.table
+        rank_keys = LookupTable.rank_keys
+        key = 0
+        # rank bits of the cards of each suit (indexed by suit bit)
+        suit_masks = [0] * 9
+        for card in cards:
+            key += rank_keys[(card >> 8) & 0xF]
+            suit_masks[(card >> 12) & 0xF] |= card >> 16
+
+        rank = table.lookup_unsuited[table.hash_high[key // LookupTable.hash_split] 
+                                     + table.hash_low[key % LookupTable.hash_split]]
+
+        # masks with fewer than 5 cards map to 0 (no flush)
+        lookup_flush = table.lookup_flush
+        for suit in (1, 2, 4, 8):
+            flush = lookup_flush[suit_masks[suit]]
+            if flush and flush < rank:
+                rank = flush
+
+        return rank
 
     def get_hand_rank(self, hand_rank):
         '''
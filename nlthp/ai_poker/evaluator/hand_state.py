@@ -0,0 +1,88 @@
+from ai_poker.evaluator.lookup import LookupTable
+
+
+class HandState(object):
+    """
+    A class to represent the evaluation state of a hand as it grows street by street.
+
+    Cards are folded in one at a time (hole cards, then flop, turn and river) and each
+    card only updates the state of the hand, so the hand can be evaluated on every street
+    without evaluating its previous cards again.
+    ...
+
+    Attributes
+    ----------
+    table : LookupTable
+        lookups used to evaluate the hand
+    cards : list
+        cards of the hand (in bitwise evaluation format)
+    key : int
+        unsuited index key of the cards (sum of the key of each card rank)
+    suit_masks : list
+        rank bits of the cards of each suit (indexed by suit bit)
+    suit_counts : list
+        number of cards of each suit (indexed by suit bit)
+    flush_suit : int
+        suit bit of the suit with 5 or more cards (0 if there is none)
+    """
+
+    def __init__(self, table, cards=()):
+        ''' Initialises state of an empty hand and adds the entered cards. '''
+        self.table = table
+        self.cards = []
+        self.key = 0
+        self.suit_masks = [0] * 9
+        self.suit_counts = [0] * 9
+        self.flush_suit = 0
+
+        for card in cards:
+            self.add(card)
+
+    def add(self, card):
+        ''' Adds a card to the hand (returns the HandState to allow chaining). '''
+        suit = (card >> 12) & 0xF
+        self.cards.append(card)
+        self.key += LookupTable.rank_keys[(card >> 8) & 0xF]
+        self.suit_masks[suit] |= card >> 16
+        self.suit_counts[suit] += 1
+
+        # with 7 cards or less only one suit can have 5 cards
+        if self.suit_counts[suit] >= 5:
+            self.flush_suit = suit
+
+        return self
+
+    def extend(self, cards):
+        ''' Adds each of the entered cards to the hand. '''
+        for card in cards:
+            self.add(card)
+        return self
+
+    def rank(self):
+        """
+        Returns rank of the hand in the range [1, 7462] (lower ranks being better 
+        evaluations), the hand must have between 5 and 7 cards.
+        """
+        if not 5 <= len(self.cards) <= 7:
+            raise Exception('Hand must have between 5 and 7 cards to be evaluated.')
+
+        table = self.table
+        rank = table.lookup_unsuited[table.hash_high[self.key // LookupTable.hash_split]
+                                     + table.hash_low[self.key % LookupTable.hash_split]]
+        if self.flush_suit:
+            rank = min(rank, table.lookup_flush[self.suit_masks[self.flush_suit]])
+        return rank
+
+    def copy(self):
+        ''' Returns copy of the hand (for evaluating different runouts from the same street). '''
+        other = HandState(self.table)
+        other.cards = self.cards[:]
+        other.key = self.key
+        other.suit_masks = self.suit_masks[:]
+        other.suit_counts = self.suit_counts[:]
+        other.flush_suit = self.flush_suit
+        return other
+
+    def __len__(self):
+        ''' Number of cards in the hand. '''
+        return len(self.cards)
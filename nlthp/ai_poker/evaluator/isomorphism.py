@@ -0,0 +1,207 @@
+from math import comb
+
+from ai_poker.evaluator.card_service import CardService
+
+
+class HandIndexer(object):
+    """
+    A class to map hands to a dense index of their suit-isomorphic classes.
+
+    Two hands are isomorphic if one can be turned into the other by permuting suits
+    (e.g. AsKs and AhKh, or 7c2d and 7h2s), so they are equivalent for every purpose
+    that does not care about actual suits. Cards are dealt in rounds (e.g. 2 hole cards,
+    then 3 flop cards) and the order of cards within a round does not matter.
+
+    Each suit of a hand is described by the number of cards it has in each round and
+    by the ranks of those cards (indexed in colex order among the ranks the suit has
+    left). Suits with the same numbers of cards are interchangeable, so the index of a
+    hand is the offset of its suit configuration plus the multiset index of the suits
+    of each group of interchangeable suits.
+    ...
+
+    Attributes
+    ----------
+    rounds : tuple
+        number of cards dealt in each round
+    configurations : dict
+        offset and groups of interchangeable suits of each suit configuration
+        (number of cards of each suit in each round, sorted in decreasing order)
+    offsets : list
+        (offset, configuration) of each suit configuration, sorted by offset
+    size : int
+        number of isomorphic classes of hands
+    """
+
+    # number of suits and ranks of a deck
+    num_suits = 4
+    num_ranks = 13
+
+    # suits of canonical hands (suit bits)
+    suits = (1, 2, 4, 8)
+
+    def __init__(self, rounds):
+        ''' Enumerates every suit configuration of the entered rounds along with its offset. '''
+        self.rounds = tuple(rounds)
+        self.configurations = {}
+        self.offsets = []
+        self.size = 0
+
+        for configuration in self.enumerate_configurations(0, self.rounds, None):
+            # groups of interchangeable suits: (first suit, number of suits, number of ways to deal a suit)
+            groups = []
+            for i, counts in enumerate(configuration):
+                if i and configuration[i - 1] == counts:
+                    first, num_suits, suit_size = groups[-1]
+                    groups[-1] = (first, num_suits + 1, suit_size)
+                else:
+                    groups.append((i, 1, self.suit_size(counts)))
+
+            num_hands = 1
+            for first, num_suits, suit_size in groups:
+                num_hands *= comb(suit_size + num_suits - 1, num_suits)
+
+            self.configurations[configuration] = (self.size, groups)
+            self.offsets.append((self.size, configuration))
+            self.size += num_hands
+
+    def enumerate_configurations(self, suit, remaining, largest):
+        ''' Yields suit configurations dealing the remaining cards of each round to suits suit onwards. '''
+        if suit == HandIndexer.num_suits:
+            if not any(remaining):
+                yield ()
+            return
+
+        for counts in self.enumerate_counts(0, remaining, HandIndexer.num_ranks):
+            # suits are sorted in decreasing order of counts
+            if largest is not None and counts > largest:
+                continue
+            left = tuple(total - count for total, count in zip(remaining, counts))
+            for configuration in self.enumerate_configurations(suit + 1, left, counts):
+                yield (counts,) + configuration
+
+    def enumerate_counts(self, round_index, remaining, ranks_left):
+        ''' Yields numbers of cards of a single suit in each round (in decreasing order). '''
+        if round_index == len(remaining):
+            yield ()
+            return
+
+        for count in range(min(remaining[round_index], ranks_left), -1, -1):
+            for counts in self.enumerate_counts(round_index + 1, remaining, ranks_left - count):
+                yield (count,) + counts
+
+    def suit_size(self, counts):
+        ''' Returns number of ways to deal ranks of a suit with the entered number of cards in each round. '''
+        size, ranks_left = 1, HandIndexer.num_ranks
+        for count in counts:
+            size *= comb(ranks_left, count)
+            ranks_left -= count
+        return size
+
+    def suit_index(self, masks):
+        ''' Returns index of the ranks (bit masks for each round) of a suit among hands with the same counts. '''
+        index, multiplier, used = 0, 1, 0
+        for mask in masks:
+            # colex index of the ranks among the ranks the suit has left
+            colex, position = 0, 1
+            for rank in range(HandIndexer.num_ranks):
+                if mask & (1 << rank):
+                    colex += comb(rank - bin(used & ((1 << rank) - 1)).count('1'), position)
+                    position += 1
+            index += colex * multiplier
+            multiplier *= comb(HandIndexer.num_ranks - bin(used).count('1'), position - 1)
+            used |= mask
+        return index
+
+    def suit_masks(self, index, counts):
+        ''' Returns rank bit masks for each round of a suit given its index (reverse of suit_index). '''
+        masks, used = [], 0
+        for count in counts:
+            ranks_left = [rank for rank in range(HandIndexer.num_ranks) if not used & (1 << rank)]
+            index, colex = divmod(index, comb(len(ranks_left), count))
+
+            mask = 0
+            for position in range(count, 0, -1):
+                # largest available position with a colex value within the index left
+                available = position - 1
+                while comb(available + 1, position) <= colex:
+                    available += 1
+                colex -= comb(available, position)
+                mask |= 1 << ranks_left[available]
+            masks.append(mask)
+            used |= mask
+        return masks
+
+    def index(self, rounds):
+        """
+        Returns index (0 to size - 1) of the isomorphic class of a hand.
+
+        ...
+
+        Parameters
+        ----------
+        rounds : list
+            cards of each round (in bitwise evaluation format)
+
+        Returns
+        -------
+        int
+            index of the hand
+        """
+
+        if tuple(len(cards) for cards in rounds) != self.rounds:
+            raise Exception('Enter ' + ', '.join(str(count) for count in self.rounds) + ' cards in each round.')
+
+        # rank bits of each suit in each round
+        masks = {suit: [0] * len(rounds) for suit in HandIndexer.suits}
+        for round_index, cards in enumerate(rounds):
+            for card in cards:
+                masks[(card >> 12) & 0xF][round_index] |= (card >> 16) & 0x1FFF
+
+        counts = {suit: tuple(bin(mask).count('1') for mask in masks[suit]) for suit in HandIndexer.suits}
+        order = sorted(HandIndexer.suits, key=lambda suit: counts[suit], reverse=True)
+        offset, groups = self.configurations[tuple(counts[suit] for suit in order)]
+
+        index = 0
+        for first, num_suits, suit_size in groups:
+            # multiset index of the suits of the group
+            suit_indexes = sorted(self.suit_index(masks[suit]) for suit in order[first:first + num_suits])
+            group_index = sum(comb(suit_index + i, i + 1) for i, suit_index in enumerate(suit_indexes))
+            index = index * comb(suit_size + num_suits - 1, num_suits) + group_index
+
+        return offset + index
+
+    def unindex(self, index):
+        ''' Returns cards of each round of the canonical hand of an index (reverse of index). '''
+        if not 0 <= index < self.size:
+            raise Exception('Index must be between 0 and ' + str(self.size - 1) + '.')
+
+        # configuration with the largest offset within the index
+        low, high = 0, len(self.offsets) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.offsets[middle][0] <= index:
+                low = middle
+            else:
+                high = middle - 1
+        offset, configuration = self.offsets[low]
+        index -= offset
+
+        # suit indexes of each group (groups were combined with the first group as most significant)
+        suit_indexes = [0] * HandIndexer.num_suits
+        for first, num_suits, suit_size in reversed(self.configurations[configuration][1]):
+            index, group_index = divmod(index, comb(suit_size + num_suits - 1, num_suits))
+            for i in range(num_suits, 0, -1):
+                value = i - 1
+                while comb(value + 1, i) <= group_index:
+                    value += 1
+                group_index -= comb(value, i)
+                suit_indexes[first + i - 1] = value - (i - 1)
+
+        rounds = [[] for count in self.rounds]
+        for suit, counts, suit_index in zip(HandIndexer.suits, configuration, suit_indexes):
+            for round_index, mask in enumerate(self.suit_masks(suit_index, counts)):
+                for rank in range(HandIndexer.num_ranks):
+                    if mask & (1 << rank):
+                        rounds[round_index].append(CardService.create_evaluation(
+                            CardService.card_values[rank] + CardService.int_to_char_suit[suit]))
+        return rounds
@@ -1,5 +1,14 @@
 
 import itertools
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+import numpy
+
 from ai_poker.evaluator.card_service import CardService
 
 class LookupTable(object):
@@ -12,10 +21,24 @@ class LookupTable(object):
 
     Attributes
     ----------
-    lookup_flush : dict
-        dictionary for efficiently looking up flush value hands
-    lookup_unsuited : dict
-        dictionary for efficiently looking up all other unsuited value hands
+    lookup_flush : array
+        best flush rank for every 13-bit rank mask with 5, 6 or 7 bits set (0 otherwise)
+    lookup_unsuited : array
+        best unsuited rank of every 5, 6 and 7 card rank combination, indexed by unsuited 
+        index (see below)
+    hash_high : array
+        unsuited index contribution of the number of cards and of the ranks 9 to A
+    hash_low : array
+        unsuited index contribution of the ranks 2 to 8
+    ----------
+    Unsuited index:
+    Each card adds rank_keys[rank] to the key of a hand, which counts the cards of each rank
+    in base 5 (and the number of cards in the highest digit). The key is split in two and 
+    hash_high[key // hash_split] + hash_low[key % hash_split] gives the position of the 
+    hand among all rank combinations with the same number of cards (a minimal perfect hash):
+        5 cards          6175 combinations   index 0     to 6174
+        6 cards          18395 combinations  index 6175  to 24569
+        7 cards          49205 combinations  index 24570 to 73774
     ----------
     Number of Distinct Possible Hand Values:
     Straight Flush   10 
@@ -30,7 +53,7 @@ class LookupTable(object):
     -------------------------
     TOTAL            7462
     Here we create a lookup table which maps
-        a each hand to its unique prime product value => rank in range [1, 7462]
+        a each hand to its flush rank mask or unsuited index (plain array indexes) => rank in range [1, 7462]
     
     Examples:
         Royal flush (best hand possible)          => 1
@@ -74,15 +97,86 @@ class LookupTable(object):
         9 : "High Card"
     }
 
-    def __init__(self):
-        ''' Initialises LookupTable attributes and generates LookupTable. '''
-        self.lookup_flush = {}
-        self.lookup_unsuited = {}
+    # key added to unsuited index key by each card rank (one base 5 digit per rank + card count)
+    rank_keys = [5**ranking + 5**len(CardService.card_rankings) for ranking in CardService.card_rankings]
+
+    # unsuited index key is split between ranks 2 to 8 and ranks 9 to A (+ card count)
+    hash_split = 5**7
+
+    # on-disk cache file format (bump version whenever the stored lookups change)
+    cache_magic = b'NLTHPLUT'
+    cache_version = 2
+    cache_header = struct.Struct('<8sIIIII')
+
+    # environment variable overriding default cache file location
+    cache_env = 'AI_POKER_LOOKUP_CACHE'
+
+    # LookupTables already loaded by this process (shared by all Evaluators) 
+    loaded = {}
+
+    def __init__(self, generate=True):
+        ''' 
+        Initialises LookupTable attributes and generates LookupTable 
+        (LookupTable.load creates tables with generate=False and reads them from the cache file). 
+        '''
+        self.lookup_flush = array('h', [0]) * (1 << len(CardService.card_rankings))
+        self.lookup_unsuited = array('h')
+        self.hash_high = array('i')
+        self.hash_low = array('i')
+        self.arrays = None
+
+        if not generate:
+            return
+
+        # generate unsuited index
+        self.add_unsuited_index()
 
         # generate LookupTable
         self.add_flushes()  
         self.add_other_hands()
 
+        # generate direct lookups for 6 and 7 card hands
+        self.add_six_and_seven_card_flushes()
+        self.add_six_and_seven_card_hands()
+
+    def add_unsuited_index(self):
+        '''
+        Generates hash_high and hash_low, which map the key of an unsuited hand to its 
+        unsuited index, and allocates lookup_unsuited.
+        '''
+
+        num_high = len(CardService.card_rankings) - 7
+
+        # number of cards of each key of ranks 2 to 8
+        low_cards = [sum((key // 5**ranking) % 5 for ranking in range(7)) for key in range(self.hash_split)]
+
+        # keys of ranks 2 to 8 are numbered among keys with the same number of cards
+        low_counts = [0] * 8
+        self.hash_low = array('i', [0]) * self.hash_split
+        for key in range(self.hash_split):
+            if low_cards[key] < len(low_counts):
+                self.hash_low[key] = low_counts[low_cards[key]]
+                low_counts[low_cards[key]] += 1
+
+        # keys of ranks 9 to A take the index of the first hand they start (for each number of cards)
+        self.hash_high = array('i', [0]) * (len(low_counts) * 5**num_high)
+        index = 0
+        for num_cards in (5, 6, 7):
+            for key in range(5**num_high):
+                high_cards = sum((key // 5**ranking) % 5 for ranking in range(num_high))
+                if high_cards <= num_cards:
+                    self.hash_high[num_cards * 5**num_high + key] = index
+                    index += low_counts[num_cards - high_cards]
+
+        self.lookup_unsuited = array('h', [0]) * index
+
+    def unsuited_index(self, rankings):
+        ''' Returns unsuited index of a list of 5, 6 or 7 card rankings. '''
+        key = 0
+        for ranking in rankings:
+            key += LookupTable.rank_keys[ranking]
+        return self.hash_high[key // self.hash_split] + self.hash_low[key % self.hash_split]
+
     def add_flushes(self):
         '''Adds all distinct flushes hand rankings to LookupTable. '''
 
@@ -126,15 +220,13 @@ class LookupTable(object):
         # start from best ranking because highest ranking hand is straight flush
         rank = 1
         for straight_flush in possible_straight_flush:
-            prime_product = CardService.prime_product_from_rankings(straight_flush)
-            self.lookup_flush[prime_product] = rank
+            self.lookup_flush[straight_flush] = rank
             rank += 1
 
         # check for flushes that are found in hands that are also full houses         
         rank = LookupTable.possible_full_house + 1
         for flush in flushes:
-            prime_product = CardService.prime_product_from_rankings(flush)
-            self.lookup_flush[prime_product] = rank
+            self.lookup_flush[flush] = rank
             rank += 1
 
         # add straights and high card hands in a similar manner (only hands with unique/distinct five cards)
@@ -151,15 +243,15 @@ class LookupTable(object):
         rank = LookupTable.possible_flush + 1
         # add straight hands to LookupTable 
         for straigth in straights:
-            prime_product = CardService.prime_product_from_rankings(straigth)
-            self.lookup_unsuited[prime_product] = rank
+            rankings = [ranking for ranking in CardService.card_rankings if straigth & (1 << ranking)]
+            self.lookup_unsuited[self.unsuited_index(rankings)] = rank
             rank += 1
 
         rank = LookupTable.possible_pair + 1
         # add high card hands to LookupTable 
         for high_card in high_cards:
-            prime_product = CardService.prime_product_from_rankings(high_card)
-            self.lookup_unsuited[prime_product] = rank
+            rankings = [ranking for ranking in CardService.card_rankings if high_card & (1 << ranking)]
+            self.lookup_unsuited[self.unsuited_index(rankings)] = rank
             rank += 1
 
     def add_other_hands(self):
@@ -185,8 +277,8 @@ class LookupTable(object):
             kickers.remove(four_of_kind)
             # add all combinations of Four of a Kind (from 4 Aces + 1 King to 4 Aces + 1 Two)
             for kicker in kickers:
-                product = CardService.primes[four_of_kind]**4 * CardService.primes[kicker]
-                self.lookup_unsuited[product] = rank
+                rankings = [four_of_kind] * 4 + [kicker]
+                self.lookup_unsuited[self.unsuited_index(rankings)] = rank
                 rank += 1
         
         # start from higest Full House hand value (3 Aces + 2 Kings)
@@ -200,8 +292,8 @@ class LookupTable(object):
 
             # add all combinations of Full House hands
             for pair_rank in pair_ranks:
-                product = CardService.primes[full_house]**3 * CardService.primes[pair_rank]**2
-                self.lookup_unsuited[product] = rank
+                rankings = [full_house] * 3 + [pair_rank] * 2
+                self.lookup_unsuited[self.unsuited_index(rankings)] = rank
                 rank += 1
 
         # start from higest Three of a Kind hand value (3 Aces + 1 King + 1 Queen)
@@ -217,8 +309,8 @@ class LookupTable(object):
             # add all combinations of Three of a Kind hands
             for kickers in gen_bit:
                 first_kicker, second_kicker = kickers
-                product = CardService.primes[three_of_kind]**3 * CardService.primes[first_kicker] * CardService.primes[second_kicker]
-                self.lookup_unsuited[product] = rank
+                rankings = [three_of_kind] * 3 + [first_kicker, second_kicker]
+                self.lookup_unsuited[self.unsuited_index(rankings)] = rank
                 rank += 1
 
         # start from highest Two Pair hand value (2 Aces + 2 Kings + 1 Queen )
@@ -236,8 +328,8 @@ class LookupTable(object):
             kickers.remove(pair2)
             # add all combinations of Two Pair hands
             for kicker in kickers:
-                product = CardService.primes[pair1]**2 * CardService.primes[pair2]**2 * CardService.primes[kicker]
-                self.lookup_unsuited[product] = rank
+                rankings = [pair1] * 2 + [pair2] * 2 + [kicker]
+                self.lookup_unsuited[self.unsuited_index(rankings)] = rank
                 rank += 1
 
         # start from highest Pair hand value (2 Aces + 1 King + 1 Queen + 1 Jack)
@@ -255,12 +347,158 @@ class LookupTable(object):
             for kickers in pair_hands:
 
                 first_kicker, second_kicker, third_kicker = kickers
-                product = CardService.primes[pair]**2 * CardService.primes[first_kicker] \
-                        * CardService.primes[second_kicker] * CardService.primes[third_kicker]
-                self.lookup_unsuited[product] = rank
+                rankings = [pair] * 2 + [first_kicker, second_kicker, third_kicker]
+                self.lookup_unsuited[self.unsuited_index(rankings)] = rank
                 rank += 1
 
 
+    def add_six_and_seven_card_flushes(self):
+        '''
+        Adds best flush hand ranking for every rank mask of 6 or 7 suited cards.
+
+        Every mask takes the best ranking found by dropping one card, so 6 card masks
+        are built from the 5 card masks and 7 card masks from the 6 card masks.
+        '''
+
+        masks = {6: [], 7: []}
+        for mask in range(len(self.lookup_flush)):
+            bits = bin(mask).count('1')
+            if bits in masks:
+                masks[bits].append(mask)
+
+        for bits in (6, 7):
+            for mask in masks[bits]:
+                best = LookupTable.possible_high_card
+                for card_ranking in CardService.card_rankings:
+                    if mask & (1 << card_ranking):
+                        best = min(best, self.lookup_flush[mask ^ (1 << card_ranking)])
+                self.lookup_flush[mask] = best
+
+    def add_six_and_seven_card_hands(self):
+        '''
+        Adds best unsuited hand ranking of every 6 and 7 card rank combination to LookupTable.
+
+        Every combination takes the best ranking of the hands found by dropping one card, 
+        which were added in the previous pass.
+        '''
+
+        for num_cards in (6, 7):
+            for rankings in itertools.combinations_with_replacement(CardService.card_rankings, num_cards):
+                # a rank can only appear once per suit
+                if any(rankings.count(ranking) > 4 for ranking in set(rankings)):
+                    continue
+
+                best = LookupTable.possible_high_card
+                for ranking in set(rankings):
+                    dropped = list(rankings)
+                    dropped.remove(ranking)
+                    best = min(best, self.lookup_unsuited[self.unsuited_index(dropped)])
+                self.lookup_unsuited[self.unsuited_index(rankings)] = best
+
+    def get_arrays(self):
+        '''
+        Returns NumPy views of the lookups for batch evaluations.
+
+        Returns a tuple (lookup_flush, lookup_unsuited, hash_high, hash_low) of arrays 
+        sharing memory with the lookups (and with the cache file when it is memory-mapped).
+        '''
+        if self.arrays is None:
+            self.arrays = (numpy.frombuffer(self.lookup_flush, dtype=numpy.int16),
+                           numpy.frombuffer(self.lookup_unsuited, dtype=numpy.int16),
+                           numpy.frombuffer(self.hash_high, dtype=numpy.intc),
+                           numpy.frombuffer(self.hash_low, dtype=numpy.intc))
+
+        return self.arrays
+
+    @staticmethod
+    def default_cache_path():
+        ''' Returns location of cache file (can be set through AI_POKER_LOOKUP_CACHE). '''
+        path = os.environ.get(LookupTable.cache_env)
+        if path:
+            return path
+        return os.path.join(os.path.expanduser('~'), '.cache', 'ai_poker',
+                            'lookup_table.v' + str(LookupTable.cache_version) + '.bin')
+
+    @classmethod
+    def load(cls, path=None):
+        '''
+        Returns LookupTable read from the cache file, generating and saving it first if the 
+        file is missing or was written by another version.
+
+        The file is memory-mapped read-only and loaded once per process, so every Evaluator
+        (and every process forked afterwards) shares the same copy of the lookups.
+        '''
+        if path is None:
+            path = cls.default_cache_path()
+        if path in cls.loaded:
+            return cls.loaded[path]
+
+        table = cls.read(path)
+        if table is None:
+            table = cls()
+            try:
+                table.save(path)
+                table = cls.read(path)
+            except OSError:
+                # cache location not writable, keep generated LookupTable in memory
+                pass
+
+        cls.loaded[path] = table
+        return table
+
+    @classmethod
+    def read(cls, path):
+        ''' Reads LookupTable from a cache file (returns None if file is missing or invalid). '''
+
+        # lookups are used in place, which needs the byte order of the file
+        if sys.byteorder != 'little':
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(data) < cls.cache_header.size:
+            return None
+        magic, version, num_flush, num_unsuited, num_high, num_low = cls.cache_header.unpack_from(data)
+        if magic != cls.cache_magic or version != cls.cache_version:
+            return None
+        if len(data) != cls.cache_header.size + 2 * (num_flush + num_unsuited) + 4 * (num_high + num_low):
+            return None
+
+        # sections are stored as: hash_high, hash_low, lookup_flush, lookup_unsuited
+        sections = []
+        offset = cls.cache_header.size
+        view = memoryview(data)
+        for code, size, count in (('i', 4, num_high), ('i', 4, num_low), ('h', 2, num_flush), ('h', 2, num_unsuited)):
+            sections.append(view[offset:offset + size * count].cast(code))
+            offset += size * count
+
+        table = cls(generate=False)
+        table.hash_high, table.hash_low, table.lookup_flush, table.lookup_unsuited = sections
+        return table
+
+    def save(self, path):
+        ''' Writes LookupTable to a cache file (written to a temporary file then moved into place). '''
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                f.write(self.cache_header.pack(self.cache_magic, self.cache_version, len(self.lookup_flush),
+                                               len(self.lookup_unsuited), len(self.hash_high), len(self.hash_low)))
+                for section, dtype in ((self.hash_high, '<i4'), (self.hash_low, '<i4'), 
+                                       (self.lookup_flush, '<i2'), (self.lookup_unsuited, '<i2')):
+                    f.write(numpy.asarray(section).astype(dtype).tobytes())
+            # cache file is shared read-only between users and processes
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
     def get_next_lex_bit(self, bits):
         ''' 
         Computes the lexicographically next bit permutation.
@@ -0,0 +1,176 @@
+import struct
+
+import numpy
+
+from ai_poker.card import Card
+
+# kinds of hand events (seat is the index of the player in the active players of the table,
+# amount is a number of chips and cards are in bitwise evaluation format)
+HAND_START = 0      # seat: dealer, amount: number of players in hand
+DEAL = 1            # seat: player, amount: stack of player, cards: hole cards
+SMALL_BLIND = 2     # seat: player, amount: small blind
+BIG_BLIND = 3       # seat: player, amount: big blind
+CHECK = 4           # seat: player
+FOLD = 5            # seat: player
+CALL = 6            # seat: player, amount: chips called
+ALL_IN_CALL = 7     # seat: player, amount: chips called (whole stack)
+RAISE = 8           # seat: player, amount: total bet of player in betting round
+ALL_IN_RAISE = 9    # seat: player, amount: total bet of player in betting round (whole stack)
+RETURN = 10         # seat: player, amount: uncalled chips returned to player
+BOARD = 11          # cards: community cards dealt
+ROUND_END = 12      # end of a betting round
+WIN = 13            # seat: player, amount: chips won without any community card dealt
+MAIN_POT = 14       # seat: player, amount: chips won from main pot
+SIDE_POT = 15       # seat: player, amount: chips won from a side pot
+ODD_CHIPS = 16      # seat: player, amount: odd chips of a split pot
+HAND_END = 17       # end of hand
+
+# binary record of an event: kind, seat, amount and up to 3 cards (0 when not dealt)
+RECORD = struct.Struct('<Bbq3I')
+RECORD_DTYPE = numpy.dtype([('kind', '<u1'), ('seat', '<i1'), ('amount', '<i8'), ('cards', '<u4', (3,))])
+
+
+class EventSink(object):
+    """
+    A class to represent a receiver of the events of the hands played at a Table.
+
+    Sinks are attached to a Table (see Table.add_sink), events are only generated
+    when at least one sink is attached.
+    ...
+    """
+
+    def handle(self, kind, seat, amount, cards):
+        ''' Receives an event of a hand (see event kinds). '''
+        pass
+
+    def close(self):
+        ''' Releases any resource held by the sink. '''
+        pass
+
+
+class NullSink(EventSink):
+    ''' Sink discarding every event. '''
+    pass
+
+
+class ListSink(EventSink):
+    """
+    Sink keeping every event in memory as (kind, seat, amount, cards) tuples.
+    ...
+
+    Attributes
+    ----------
+    events : list
+        events received
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def handle(self, kind, seat, amount, cards):
+        self.events.append((kind, seat, amount, tuple(cards)))
+
+
+class BinarySink(EventSink):
+    """
+    Sink writing events to a file as fixed size binary records (see RECORD),
+    which can be read back with read_events.
+    ...
+
+    Attributes
+    ----------
+    file : file
+        binary file events are written to
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+
+    def handle(self, kind, seat, amount, cards):
+        cards = tuple(cards)
+        # events with more than 3 cards are split in records of 3 cards
+        for start in range(0, max(len(cards), 1), 3):
+            chunk = cards[start:start + 3]
+            self.file.write(RECORD.pack(kind, seat, amount, *(chunk + (0,) * (3 - len(chunk)))))
+
+    def close(self):
+        self.file.close()
+
+
+def read_events(path):
+    ''' Returns events written by a BinarySink as a structured array (kind, seat, amount, cards). '''
+    return numpy.fromfile(path, dtype=RECORD_DTYPE)
+
+
+class NarratorSink(EventSink):
+    """
+    Sink narrating hands played at a Table to standard output.
+
+    ...
+
+    Attributes
+    ----------
+    table : Table
+        table whose hands are narrated (names of players are looked up from its active players)
+    board : list
+        community cards dealt in current hand
+    max_bet : int
+        largest bet of current betting round
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.board = []
+        self.max_bet = 0
+
+    def name(self, seat):
+        return self.table.active_players[seat].get_name()
+
+    def handle(self, kind, seat, amount, cards):
+        if kind == HAND_START:
+            self.board = []
+            self.max_bet = 0
+        elif kind == DEAL:
+            print(self.name(seat) + '(' + str(amount) + ')', 'dealt', Card.from_evaluation_int(cards[0]),
+                  'and', Card.from_evaluation_int(cards[1]))
+        elif kind == SMALL_BLIND:
+            # new line after dealt cards
+            print()
+            print(self.name(seat), 'posts small blind of', amount)
+            self.max_bet = max(self.max_bet, amount)
+        elif kind == BIG_BLIND:
+            print(self.name(seat), 'posts big blind of', amount)
+            self.max_bet = max(self.max_bet, amount)
+        elif kind == CHECK:
+            print(self.name(seat), 'checks.')
+        elif kind == FOLD:
+            print(self.name(seat), 'folds.')
+        elif kind == CALL:
+            print(self.name(seat), 'calls', amount)
+        elif kind == ALL_IN_CALL:
+            print(self.name(seat), 'all-in calls with', amount)
+        elif kind == RAISE:
+            print(self.name(seat), 'raises', amount - self.max_bet, 'to', amount)
+            self.max_bet = amount
+        elif kind == ALL_IN_RAISE:
+            print(self.name(seat), 'raises all-in', amount - self.max_bet, 'to', amount)
+            self.max_bet = amount
+        elif kind == RETURN:
+            print(amount, 'uncalled chips return to', self.name(seat))
+        elif kind == BOARD:
+            self.board += cards
+            print([str(Card.from_evaluation_int(c)) for c in self.board])
+        elif kind == ROUND_END:
+            # new line for better output layout
+            print()
+            self.max_bet = 0
+        elif kind == WIN:
+            print(self.name(seat), 'wins', amount)
+        elif kind == MAIN_POT:
+            print(self.name(seat), 'wins', amount, 'from main pot')
+        elif kind == SIDE_POT:
+            print(self.name(seat), 'wins', amount, 'from side pot')
+        elif kind == ODD_CHIPS:
+            print(self.name(seat), 'wins', amount, 'odd chips')
+        elif kind == HAND_END:
+            print()
@@ -0,0 +1,145 @@
+import numpy
+
+from ai_poker.evaluator.deck import Deck
+
+# schema of the features Agents learn from: game features (7 cards then stack of player)
+# followed by action features (one row per candidate action)
+CARD_FEATURES = ['dealt', 'number', 'clubs', 'diamonds', 'spades', 'hearts']
+GAME_FEATURES = ['card%d_%s' % (i, name) for i in range(7) for name in CARD_FEATURES] + ['stack']
+ACTION_FEATURES = ['check', 'fold', 'call', 'raise', 'raise_to', 'raise_by', 'raise_pot_fraction']
+FEATURES = GAME_FEATURES + ACTION_FEATURES
+
+NUM_GAME_FEATURES = len(GAME_FEATURES)
+NUM_ACTION_FEATURES = len(ACTION_FEATURES)
+NUM_FEATURES = len(FEATURES)
+
+# column (among action features) of each action
+ACTION_COLUMNS = {'check': 0, 'fold': 1, 'call': 2, 'raise': 3, 'bet': 3}
+
+# position of each suit (by suit bit) in the suit encoding of card features (clubs, diamonds, spades, hearts)
+SUIT_FEATURES = numpy.array([0, 2, 3, 0, 1, 0, 0, 0, 0], dtype=numpy.int64)
+
+# features of each card (in bitwise evaluation format), built on first use
+card_rows = {}
+
+
+def card_row(card):
+    ''' Returns the 6 features of a card (dealt, number and suit encoding). '''
+    if not card_rows:
+        for other in Deck.get_deck_of_cards():
+            row = numpy.zeros(len(CARD_FEATURES), dtype=numpy.float32)
+            row[0] = 1
+            row[1] = ((other >> 8) & 0xF) + 2
+            row[2 + SUIT_FEATURES[(other >> 12) & 0xF]] = 1
+            card_rows[other] = row
+    return card_rows[card]
+
+
+def card_number(card):
+    ''' Returns key by which cards are sorted in features (number of card). '''
+    return (card >> 8) & 0xF
+
+
+def encode_cards(features, holes, board):
+    """
+    Writes card features of many decisions into the first 42 columns of features, given
+    hole cards as an (N, 2) array and community cards as an (N, k) array (0 when not dealt).
+    Hole cards and community cards are each sorted by number (equal numbers keep their order).
+    """
+
+    cards = []
+    for group in (holes, board):
+        order = numpy.argsort(numpy.where(group != 0, card_number(group), 13), axis=1, kind='stable')
+        cards.append(numpy.take_along_axis(group, order, axis=1))
+    cards = numpy.concatenate(cards, axis=1)
+
+    dealt = cards != 0
+    blocks = features[:, :6 * cards.shape[1]].reshape(len(cards), cards.shape[1], 6)
+    blocks[:, :, 0] = dealt
+    blocks[:, :, 1] = numpy.where(dealt, card_number(cards) + 2, 0)
+    rows, slots = numpy.nonzero(dealt)
+    blocks[rows, slots, 2 + SUIT_FEATURES[(cards[rows, slots] >> 12) & 0xF]] = 1
+
+
+def encode_actions(features, columns, amounts, max_bets, pots):
+    """
+    Writes action features of many actions into features (N, 7), given the column of each
+    action (see ACTION_COLUMNS), the raise amounts (new total bet, ignored for other actions),
+    and the largest bet of betting round and the pot before each action.
+    """
+
+    raised = columns == ACTION_COLUMNS['raise']
+    features[:] = 0
+    features[numpy.arange(len(columns)), columns] = 1
+    features[:, 4] = numpy.where(raised, amounts, 0)
+    features[:, 5] = numpy.where(raised, amounts - max_bets, 0)
+    features[:, 6] = numpy.where(raised, features[:, 5] / numpy.maximum(pots, 1), 0)
+
+
+class FeatureEncoder(object):
+    """
+    A class to encode the features of the decisions of a Player into preallocated float32 arrays.
+
+    Game features of a decision are written once into a row, and the design matrix of the
+    candidate actions (one row per action) is built by broadcasting the game features
+    next to the block of action features. Returned arrays are views of the buffers of the
+    encoder, they are overwritten by the next decision.
+    ...
+
+    Attributes
+    ----------
+    row : ndarray
+        features (game features then action features) of the selected action
+    game : ndarray
+        game features of current decision (view of row)
+    matrix : ndarray
+        design matrix of candidate actions (grown when more actions are entered)
+    """
+
+    def __init__(self, capacity=64):
+        self.row = numpy.zeros(NUM_FEATURES, dtype=numpy.float32)
+        self.game = self.row[:NUM_GAME_FEATURES]
+        self.matrix = numpy.zeros((capacity, NUM_FEATURES), dtype=numpy.float32)
+
+    def encode_game(self, hole, board, stack):
+        ''' Writes and returns game features of hole cards, community cards and stack of a player. '''
+        self.game[:] = 0
+        cards = sorted(hole, key=card_number) + sorted(board, key=card_number)
+        for i, card in enumerate(cards):
+            self.game[6 * i:6 * i + 6] = card_row(card)
+        self.game[NUM_GAME_FEATURES - 1] = stack
+        return self.game
+
+    def encode_action(self, action, max_bet, pot):
+        ''' Writes action features of an action after the game features and returns the full row. '''
+        actions = self.row[NUM_GAME_FEATURES:]
+        actions[:] = 0
+        actions[ACTION_COLUMNS[action[0]]] = 1
+        if actions[3]:
+            actions[4] = action[1]
+            actions[5] = action[1] - max_bet
+            actions[6] = actions[5] / pot
+        return self.row
+
+    def design_matrix(self, raise_amounts, others, max_bet, pot):
+        """
+        Returns the (actions, 50) design matrix of the candidate actions of current decision,
+        raises (array of new total bets) first, then the other actions (e.g. ('call',), ('fold',)).
+        """
+
+        num_actions = len(raise_amounts) + len(others)
+        if num_actions > len(self.matrix):
+            self.matrix = numpy.zeros((2 * num_actions, NUM_FEATURES), dtype=numpy.float32)
+        matrix = self.matrix[:num_actions]
+        matrix[:, :NUM_GAME_FEATURES] = self.game
+
+        actions = matrix[:, NUM_GAME_FEATURES:]
+        actions[:] = 0
+        num_raises = len(raise_amounts)
+        actions[:num_raises, 3] = 1
+        actions[:num_raises, 4] = raise_amounts
+        actions[:num_raises, 5] = actions[:num_raises, 4] - max_bet
+        actions[:num_raises, 6] = actions[:num_raises, 5] / pot
+        for i, action in enumerate(others):
+            actions[num_raises + i, ACTION_COLUMNS[action[0]]] = 1
+        return matrix
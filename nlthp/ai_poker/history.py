@@ -0,0 +1,213 @@
+import errno
+import os
+import stat
+import tempfile
+
+import numpy
+
+from ai_poker import events
+from ai_poker.events import EventSink
+
+# largest number of players at a table covered by a hand history
+MAX_SEATS = 10
+
+# columns of hands (one row per hand, seats are indexes of the active players of the hand)
+HAND_COLUMNS = {
+    'num_players': ('<u1', ()),             # number of players dealt in hand
+    'dealer': ('<i1', ()),                  # seat of dealer
+    'players': ('<i2', (MAX_SEATS,)),       # index of player of each seat in table players (-1 if empty)
+    'stacks': ('<i8', (MAX_SEATS,)),        # stack of each seat when dealt (before blinds)
+    'holes': ('<u4', (MAX_SEATS, 2)),       # hole cards of each seat (bitwise evaluation format)
+    'board': ('<u4', (5,)),                 # community cards (0 when not dealt)
+    'winnings': ('<i8', (MAX_SEATS,)),      # chips won by each seat from pots
+}
+
+# columns of actions (blinds, checks, folds, calls, raises and uncalled returns, in order)
+ACTION_COLUMNS = {
+    'action_seat': '<i1',                   # seat of player
+    'action_kind': '<u1',                   # event kind (see events)
+    'action_amount': '<i8',                 # amount of event (total bet of player for raises)
+    'action_street': '<u1',                 # betting round (0 preflop, 1 flop, 2 turn, 3 river)
+}
+
+# event kinds stored as actions
+ACTION_KINDS = (events.SMALL_BLIND, events.BIG_BLIND, events.CHECK, events.FOLD, events.CALL, events.ALL_IN_CALL,
+                events.RAISE, events.ALL_IN_RAISE, events.RETURN)
+
+# event kinds of chips won from pots
+WIN_KINDS = (events.WIN, events.MAIN_POT, events.SIDE_POT, events.ODD_CHIPS)
+
+
+def publish_shard(path, written):
+    """
+    Renames the directory of a fully written shard to the next free shard of a hand history
+    and returns it (safe between processes, readers never see a partially written shard).
+    """
+    index = len([name for name in os.listdir(path) if name.startswith('shard_')])
+    while True:
+        shard = os.path.join(path, 'shard_%06d' % index)
+        try:
+            os.rename(written, shard)
+            return shard
+        except OSError as error:
+            # shard was published by another process
+            if error.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                raise
+            index += 1
+
+
+class HistorySink(EventSink):
+    """
+    A class to record every hand played at a Table to an append-only columnar hand history.
+
+    Hands are buffered in memory and written to a new shard (directory) of the hand
+    history every shard_size hands and when the sink is closed. Shards are written to a
+    temporary directory and renamed into place once complete. Each column of a
+    shard is a .npy file (read back through a memory map) or, if compress is set,
+    all columns of a shard are stored in a single compressed .npz file.
+    ...
+
+    Attributes
+    ----------
+    table : Table
+        table whose hands are recorded
+    path : str
+        directory of the hand history
+    shard_size : int
+        number of hands of each shard
+    compress : bool
+        boolean value to indicate if shards are compressed
+    hands : dict
+        buffered columns of hands (arrays of shard_size rows)
+    actions : dict
+        buffered columns of actions (lists)
+    offsets : list
+        offset of the first action of each buffered hand
+    num_hands : int
+        number of buffered hands
+    street : int
+        betting round of current hand
+    board : int
+        number of community cards dealt in current hand
+    """
+
+    def __init__(self, table, path, shard_size=10000, compress=False):
+        self.table = table
+        self.path = path
+        self.shard_size = shard_size
+        self.compress = compress
+        self.hands = {name: numpy.zeros((shard_size,) + shape, dtype=dtype) for name, (dtype, shape) in HAND_COLUMNS.items()}
+        self.actions = {name: [] for name in ACTION_COLUMNS}
+        self.offsets = [0]
+        self.num_hands = 0
+        self.street = 0
+        self.board = 0
+
+    def handle(self, kind, seat, amount, cards):
+        hand = self.num_hands
+        if kind in ACTION_KINDS:
+            self.actions['action_seat'].append(seat)
+            self.actions['action_kind'].append(kind)
+            self.actions['action_amount'].append(amount)
+            self.actions['action_street'].append(self.street)
+        elif kind == events.DEAL:
+            self.hands['stacks'][hand, seat] = amount
+            self.hands['holes'][hand, seat] = cards
+        elif kind == events.BOARD:
+            self.hands['board'][hand, self.board:self.board + len(cards)] = cards
+            self.board += len(cards)
+            self.street += 1
+        elif kind in WIN_KINDS:
+            self.hands['winnings'][hand, seat] += amount
+        elif kind == events.HAND_START:
+            if amount > MAX_SEATS:
+                raise Exception('Hand histories hold at most ' + str(MAX_SEATS) + ' players.')
+            players = self.table.get_players()
+            self.hands['num_players'][hand] = amount
+            self.hands['dealer'][hand] = seat
+            self.hands['players'][hand] = -1
+            self.hands['players'][hand, :amount] = [players.index(player) for player in self.table.get_active_players()]
+            self.street, self.board = 0, 0
+        elif kind == events.HAND_END:
+            self.offsets.append(len(self.actions['action_seat']))
+            self.num_hands += 1
+            if self.num_hands == self.shard_size:
+                self.flush()
+
+    def flush(self):
+        ''' Writes buffered hands to a new shard of the hand history. '''
+        if not self.num_hands:
+            return
+
+        columns = {name: column[:self.num_hands] for name, column in self.hands.items()}
+        columns.update({name: numpy.array(self.actions[name], dtype=dtype) for name, dtype in ACTION_COLUMNS.items()})
+        columns['action_offsets'] = numpy.array(self.offsets, dtype=numpy.int64)
+        columns['blinds'] = numpy.array(self.table.get_blinds_and_buyin()[:2], dtype=numpy.int64)
+        columns['names'] = numpy.array([player.get_name() for player in self.table.get_players()], dtype=str)
+
+        # shard is written to a temporary directory of the hand history, then published
+        os.makedirs(self.path, exist_ok=True)
+        written = tempfile.mkdtemp(prefix='.writing_', dir=self.path)
+        # shards get the permissions of the hand history (temporary directories are private)
+        os.chmod(written, stat.S_IMODE(os.stat(self.path).st_mode))
+        if self.compress:
+            numpy.savez_compressed(os.path.join(written, 'columns.npz'), **columns)
+        else:
+            for name, column in columns.items():
+                numpy.save(os.path.join(written, name + '.npy'), column)
+        publish_shard(self.path, written)
+
+        # reinitialise buffers (hand columns are reused)
+        for name, column in self.hands.items():
+            column[:] = 0
+        self.actions = {name: [] for name in ACTION_COLUMNS}
+        self.offsets = [0]
+        self.num_hands = 0
+
+    def close(self):
+        self.flush()
+
+
+class HandHistory(object):
+    """
+    A class to read a hand history written by HistorySink.
+
+    Only published shards are read (shards still being written are in temporary directories),
+    so a hand history can be read while other processes keep appending to it.
+
+    ...
+
+    Attributes
+    ----------
+    path : str
+        directory of the hand history
+    shards : list
+        columns of each shard (dict of arrays, memory mapped unless the shard is compressed)
+    num_hands : int
+        total number of hands of the hand history
+    """
+
+    def __init__(self, path, mmap_mode='r'):
+        self.path = path
+        self.shards = []
+        for name in sorted(os.listdir(path)):
+            shard = os.path.join(path, name)
+            if not name.startswith('shard_') or not os.listdir(shard):
+                continue
+            if os.path.exists(os.path.join(shard, 'columns.npz')):
+                with numpy.load(os.path.join(shard, 'columns.npz')) as data:
+                    self.shards.append({column: data[column] for column in data.files})
+            else:
+                self.shards.append({column[:-4]: numpy.load(os.path.join(shard, column), mmap_mode=mmap_mode)
+                                    for column in os.listdir(shard) if column.endswith('.npy')})
+        self.num_hands = sum(len(shard['num_players']) for shard in self.shards)
+
+    def column(self, name):
+        ''' Returns a column of every shard as a single array (action offsets are shifted across shards). '''
+        if name == 'action_offsets':
+            offsets, start = [numpy.zeros(1, dtype=numpy.int64)], 0
+            for shard in self.shards:
+                offsets.append(shard['action_offsets'][1:] + start)
+                start += shard['action_offsets'][-1]
+            return numpy.concatenate(offsets)
+        return numpy.concatenate([shard[name] for shard in self.shards])
@@ -0,0 +1,85 @@
+import bisect
+
+import numpy
+
+
+def ladder_index(ladder, stacks, amounts):
+    ''' Returns index of the first raise fraction of the ladder for which int(stack * fraction) >= amount, for each stack. '''
+    stacks = stacks.astype(numpy.float64)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        index = numpy.searchsorted(ladder, amounts / stacks)
+
+    # correct rounding of the division at the boundaries
+    while True:
+        lower = (index > 0) & ((stacks * ladder[numpy.maximum(index - 1, 0)]).astype(numpy.int64) >= amounts)
+        higher = (index < len(ladder)) & ((stacks * ladder[numpy.minimum(index, len(ladder) - 1)]).astype(numpy.int64) < amounts)
+        if not lower.any() and not higher.any():
+            return index
+        index = index - lower + higher
+
+
+def bucket_positions(positions, window, buckets):
+    """
+    Returns offsets (from the start of the window of valid raises) of the raises selected
+    at the entered positions (0 to buckets - 1) when a window holds more raises than buckets,
+    the selected raises being evenly spread from the smallest to the largest raise.
+    """
+
+    spread = numpy.rint(positions * (window - 1) / max(buckets - 1, 1)).astype(numpy.int64)
+    return numpy.where(window > buckets, spread, positions)
+
+
+class RaiseLadder(object):
+    """
+    A class to represent the raise choices of a Player as a sorted ladder of fractions of stack.
+
+    The raise amount of a fraction is int(stack * fraction), which grows with the fraction,
+    so the raises within a minimum raise and a maximum bet are a window of the ladder found
+    by two binary searches. Optionally the raises of a window are capped to a number of
+    buckets evenly spread over the window.
+    ...
+
+    Attributes
+    ----------
+    fractions : ndarray
+        raise choices sorted in increasing order (fractions of stack)
+    values : list
+        raise choices as a list (for binary searches of a single stack)
+    buckets : int
+        maximum number of raises of a window (all raises if None)
+    """
+
+    def __init__(self, raise_choices, raise_increase, buckets=None):
+        ''' Builds ladder of the fractions 1, raise_increase, raise_increase ** 2, ... (raise_choices of them). '''
+        if buckets is not None and buckets < 2:
+            raise Exception('Raise buckets must be at least 2.')
+
+        # each fraction is the previous one times raise_increase (as multiplied in the original ladder)
+        factors = numpy.ones(raise_choices, dtype=numpy.float64)
+        factors[1:] = raise_increase if raise_choices > 1 else 1
+        self.fractions = numpy.sort(numpy.cumprod(factors))
+        self.values = self.fractions.tolist()
+        self.buckets = buckets
+
+    def index(self, stack, amount):
+        ''' Returns index of the first fraction for which int(stack * fraction) >= amount. '''
+        index = bisect.bisect_left(self.values, amount / stack)
+
+        # correct rounding of the division at the boundaries
+        while index > 0 and int(stack * self.values[index - 1]) >= amount:
+            index -= 1
+        while index < len(self.values) and int(stack * self.values[index]) < amount:
+            index += 1
+        return index
+
+    def raises(self, stack, min_raise_amount, max_bet):
+        ''' Returns raise amounts (in increasing order) of a stack between the minimum raise and maximum bet. '''
+        low = self.index(stack, min_raise_amount)
+        high = self.index(stack, max_bet + 1)
+        if high <= low:
+            return numpy.zeros(0, dtype=numpy.int64)
+
+        fractions = self.fractions[low:high]
+        if self.buckets is not None and high - low > self.buckets:
+            fractions = fractions[bucket_positions(numpy.arange(self.buckets), high - low, self.buckets)]
+        return (stack * fractions).astype(numpy.int64)
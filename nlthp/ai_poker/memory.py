@@ -0,0 +1,132 @@
+import numpy
+
+from ai_poker.features import NUM_FEATURES
+
+
+class ReplayMemory(object):
+    """
+    A class to represent the memory of features/labels of a Player as a fixed capacity ring buffer.
+
+    Rows (features of a decision and stack of the player when deciding) are appended in O(1),
+    overwriting the oldest row once the memory is full, and are labelled at the end of the
+    hand with the change of stack of the player. Arrays grow by doubling until they reach
+    the capacity, so memories of short simulations stay small.
+    ...
+
+    Attributes
+    ----------
+    capacity : int
+        maximum number of rows kept (older rows are forgotten)
+    features : ndarray
+        features of each row (float32)
+    stacks : ndarray
+        stack of player when each row was recorded
+    labels : ndarray
+        label of each row (change of stack from decision to end of hand)
+    start : int
+        position of the oldest row in arrays
+    size : int
+        number of rows kept
+    unlabelled : int
+        number of newest rows not labelled yet (decisions of current hand)
+    total : int
+        number of labelled rows ever added (including forgotten rows)
+    """
+
+    def __init__(self, capacity, num_features=NUM_FEATURES, initial_size=1024):
+        self.capacity = capacity
+        size = max(min(capacity, initial_size), 1)
+        self.features = numpy.zeros((size, num_features), dtype=numpy.float32)
+        self.stacks = numpy.zeros(size, dtype=numpy.int64)
+        self.labels = numpy.zeros(size, dtype=numpy.float64)
+        self.start = 0
+        self.size = 0
+        self.unlabelled = 0
+        self.total = 0
+
+    def __len__(self):
+        return self.size
+
+    def grow(self, size):
+        ''' Grows arrays to hold size rows (only before rows wrap around, oldest row is first). '''
+        size = min(self.capacity, max(size, 2 * len(self.features)))
+        for name in ('features', 'stacks', 'labels'):
+            array = getattr(self, name)
+            grown = numpy.zeros((size,) + array.shape[1:], dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            setattr(self, name, grown)
+
+    def positions(self, first, count):
+        ''' Returns positions in arrays of count rows from the first-th oldest row. '''
+        return (self.start + first + numpy.arange(count)) % len(self.features)
+
+    def append(self, features, stack):
+        ''' Adds features of a decision (not labelled yet) and stack of player, forgetting the oldest row if full. '''
+        if self.size == len(self.features) < self.capacity:
+            self.grow(self.size + 1)
+
+        if self.size < len(self.features):
+            position = self.size
+            self.size += 1
+        else:
+            position = self.start
+            self.start = (self.start + 1) % len(self.features)
+
+        self.features[position] = features
+        self.stacks[position] = stack
+        self.unlabelled = min(self.unlabelled + 1, self.size)
+
+    def label(self, stack):
+        ''' Labels rows of current hand with the change of stack of player from each decision to stack. '''
+        if not self.unlabelled:
+            return
+        positions = self.positions(self.size - self.unlabelled, self.unlabelled)
+        self.labels[positions] = stack - self.stacks[positions]
+        self.total += self.unlabelled
+        self.unlabelled = 0
+
+    def extend(self, features, stacks, labels):
+        ''' Adds labelled rows (e.g. recorded elsewhere), forgetting the oldest rows if full. '''
+        if self.unlabelled:
+            raise Exception('Rows of current hand must be labelled before adding labelled rows.')
+
+        # only the newest rows fit in memory
+        self.total += len(labels)
+        count = min(len(labels), self.capacity)
+        features, stacks, labels = features[len(labels) - count:], stacks[len(labels) - count:], labels[len(labels) - count:]
+        if self.size + count > len(self.features):
+            self.grow(self.size + count)
+
+        positions = self.positions(self.size, count)
+        self.features[positions] = features
+        self.stacks[positions] = stacks
+        self.labels[positions] = labels
+
+        total = self.size + count
+        if total > len(self.features):
+            self.start = (self.start + total - len(self.features)) % len(self.features)
+        self.size = min(total, len(self.features))
+
+    def view(self):
+        """
+        Returns (features, labels) of the labelled rows for fitting a regressor, as views of the
+        arrays when possible (rows are no longer in the order they were added once the memory is full).
+        """
+
+        labelled = self.size - self.unlabelled
+        if self.start == 0 or (self.size == len(self.features) and not self.unlabelled):
+            return self.features[:labelled], self.labels[:labelled]
+        positions = self.positions(0, labelled)
+        return self.features[positions], self.labels[positions]
+
+    def ordered(self):
+        ''' Returns copies of (features, stacks, labels) of the labelled rows from oldest to newest. '''
+        positions = self.positions(0, self.size - self.unlabelled)
+        return self.features[positions], self.stacks[positions], self.labels[positions]
+
+    def newest(self, count):
+        ''' Returns copies of (features, labels) of the count newest labelled rows (all kept rows if fewer). '''
+        labelled = self.size - self.unlabelled
+        count = min(count, labelled)
+        positions = self.positions(labelled - count, count)
+        return self.features[positions], self.labels[positions]
@@ -1,8 +1,18 @@
-
+import copy
 import random
 
 import numpy
 
+from ai_poker.features import ACTION_COLUMNS, NUM_GAME_FEATURES, FeatureEncoder
+from ai_poker.ladder import RaiseLadder
+from ai_poker.memory import ReplayMemory
+from ai_poker.training import FullTraining
+
+# actions other than raises a player can perform
+CHECK = (('check',),)
+CALL_OR_FOLD = (('call',), ('fold',))
+NO_RAISES = numpy.zeros(0, dtype=numpy.int64)
+
 
 class Player(object):
     """
@@ -23,22 +33,29 @@ class Player(object):
         Allows player to continuously improve by forgetting 'weaker' strategies.
     raise_increase : float
         times raise must be larger than previous raise
+    raise_buckets : int
+        maximum number of raise choices player picks from in a decision (evenly spread over the
+        valid raise choices, all valid raise choices if None)
     regressor : Regressor
         machine learning regressor which represents the model the agents will learn through.
         This allows Agents to predict the action with best return/gain
-    features : list
-        features associated with each table state from which Agents can learn
+    replay_memory : ReplayMemory
+        features associated with each table state from which Agents can learn, along with the
+        stack of the player when features are recorded and the results of each hand (labels),
+        kept in a ring buffer of the last memory decisions
     fit : bool
         boolean value to indicate if Regression model has been fit
-    labels : list
-        stores results of each hand to allow Agents to learn from with the selected features used
     stack : int
         amount of chips/stack each player currently has
-    stacks : list
-        amount of chips/stack each player has after each hand (when features are recorded - used for 
-        Agents to learn how they get highest gain)
     train : bool
         boolean value which indicates if Agents should update their regressor after each hand
+    encoder : FeatureEncoder
+        encoder of the features of each decision (see features.FEATURES for the schema)
+    ladder : RaiseLadder
+        sorted raise choices (fractions of stack) from which valid raises are found by binary search
+    training : FullTraining
+        how the regressor is trained on the memory (refitted from scratch by default, or updated
+        with the newest features/labels with IncrementalTraining)
     """
 
     """
@@ -46,7 +63,8 @@ class Player(object):
     receiving TableStates and returning actions.
     """
 
-    def __init__(self, name, chips_amount, raise_choices, memory, regressor=None, raise_increase=None, ):
+    def __init__(self, name, chips_amount, raise_choices, memory, regressor=None, raise_increase=None, raise_buckets=None,
+                 training=None):
         """ 
         Constructor for all the necessary attributes of the Player object.
         """
@@ -55,18 +73,17 @@ class Player(object):
         self.memory = memory
         self.chips_amount = chips_amount
         self.regressor = regressor
-        self.features = []
+        self.replay_memory = ReplayMemory(memory)
         self.fit = False
-        self.labels = []
         self.stack = 0
-        self.stacks = []
         self.train = True
 
         # calculate raise choices that players have (depend on blinds and previous raise)
-        self.r_choices = [1]
-        for i in range(raise_choices - 1):
-            self.r_choices = [self.r_choices[0]
-                              * raise_increase] + self.r_choices
+        self.ladder = RaiseLadder(raise_choices, raise_increase, raise_buckets)
+        self.r_choices = self.ladder.values
+
+        self.encoder = FeatureEncoder()
+        self.training = training if training is not None else FullTraining()
 
     def gen_game_features(self, table_state):
         """ 
@@ -74,63 +91,16 @@ class Player(object):
         These are features from which the Agent Players learn (in combination with the labels).
         """
 
-        # initialise the features with 0
-        game_features = 43 * [0]
-
-        # sort cards for feature generation (order is necessary for storing in features list)
-        # sort player private cards
-        hold_cards = sorted(self.cards)
-
-        # sort table community card
-        table_cards = sorted(table_state.cards)
-
-        # add number and suit of each card to features
-        cards = hold_cards + table_cards
-        for i in range(len(cards)):
-            game_features[6 * i] = 1
-            game_features[6 * i + 1] = cards[i].get_card_num()
-            suit = cards[i].get_card_suit()
-
-            # create binary encoding for suit
-            game_features[6 * i + 2] = suit == 'c'
-            game_features[6 * i + 3] = suit == 'd'
-            game_features[6 * i + 4] = suit == 's'
-            game_features[6 * i + 5] = suit == 'h'
-
-        # player stack size
-        game_features[42] = self.stack
-
-        print(game_features)
-        return game_features
+        return self.encoder.encode_game(self.cards, table_state.cards, self.stack).tolist()
 
     def gen_action_features(self, action, table_state):
         """
         Generates a list of features from a given player action. 
         """
 
-        # create binary encoding for action
-        action_features = 7 * [0]
-
-        # add action to binary encoded features
-        if action[0] == 'check':
-            action_features[0] = 1
-        elif action[0] == 'fold':
-            action_features[1] = 1
-        elif action[0] == 'call':
-            action_features[2] = 1
-        elif action[0] == 'raise' or action[0] == 'bet':
-            action_features[3] = 1
-            action_features[4] = action[1]
-            # raised amount
-            action_features[5] = action[1] - \
-                max(table_state.current_bets)
-            # proportion of raise by to pot size
-            action_features[6] = action_features[5] / \
-                sum(table_state.bets + table_state.current_bets)
-        else:
+        if action[0] not in ACTION_COLUMNS:
             raise Exception('Invalid action.')
-
-        return action_features
+        return self.encoder.encode_action(action, table_state.max_bet, table_state.pot)[NUM_GAME_FEATURES:].tolist()
 
     def buy_chips(self, new_stack):
         """ 
@@ -164,36 +134,33 @@ class Player(object):
         """
 
         # generate game features for agent learning/action selection
-        game_features = self.gen_game_features(table_state)
-        all_actions = self.all_actions(table_state)
+        self.encoder.encode_game(self.cards, table_state.cards, self.stack)
+        raise_amounts, others = self.action_space(table_state)
+        num_raises = len(raise_amounts)
 
         # if agent has not been trained yet
         if not self.fit:
             # select random action
-            selected_action = random.choice(all_actions)
+            index = random.randrange(num_raises + len(others))
         # otherwise if player has been trained
         else:
-            # determine best action according to features/labels and table state
-            all_features = []
-            for action in all_actions:
-                all_features.append(
-                    game_features + self.gen_action_features(action, table_state))
-            # calculate predicted gain on each action
-            predicted_gain = self.regressor.predict(all_features)
-            selected_action = all_actions[numpy.argmax(predicted_gain)]
-
-        # store features of selected action
-        action_features = self.gen_action_features(
-            selected_action, table_state)
+            # calculate predicted gain on each action (design matrix of all actions at once)
+            matrix = self.encoder.design_matrix(raise_amounts, others, table_state.max_bet, table_state.pot)
+            index = int(numpy.argmax(self.regressor.predict(matrix)))
+        if index < num_raises:
+            selected_action = ('raise', int(raise_amounts[index]))
+        else:
+            selected_action = others[index - num_raises]
 
         # if agent is being trained
         if self.train:
-            # learn from features/labels and predicted gains
-            self.stacks.append(self.stack)
-            self.features.append(game_features + action_features)
+            # store features of selected action to learn from features/labels
+            self.replay_memory.append(self.encoder.encode_action(
+                selected_action, table_state.max_bet, table_state.pot), self.stack)
 
         # if player is user dispaly list of actions to choose from (allows player to play via CMD)
         if (narrate_hands and self.name == "User"):
+            all_actions = self.all_actions(table_state)
             print("Possible moves: \n" + str(all_actions))
             pos_move = int(
                 input("Enter number to select which move to play: "))
@@ -229,13 +196,16 @@ class Player(object):
         to restrict lower level Agents from improving too much.
         """
 
-        for i in range(len(self.labels), len(self.features)):
-            self.labels.append(self.stack - self.stacks[i])
+        # label features of hand (features older than memory were overwritten as new ones were recorded)
+        self.replay_memory.label(self.stack)
 
-        # update features/labels
-        self.features = self.features[-self.memory:]
-        self.stacks = self.stacks[-self.memory:]
-        self.labels = self.labels[-self.memory:]
+    def remember(self, features, stacks, labels):
+        """
+        Adds features/labels of hands played elsewhere (e.g. by a copy of the Player on a table
+        replica in a worker process) and discards features/labels older than Player memory.
+        """
+
+        self.replay_memory.extend(features, stacks, labels)
 
     def train_player(self):
         """ 
@@ -246,12 +216,36 @@ class Player(object):
         if not self.train:
             return
 
-        self.regressor.fit(self.features, self.labels)
+        # fit on the whole memory (views, no copy of features/labels) or update with the newest features/labels
+        features, labels, full = self.training.rows(self.replay_memory, self.regressor)
+        self.training.fit(self.regressor, features, labels, full)
         self.fit = True
 
-    def all_actions(self, table_state):
+    def training_snapshot(self):
+        """
+        Returns (regressor, features, labels, full) to train the player agent elsewhere (e.g. in a
+        background thread) while it keeps playing: copies of its regressor and of the features/labels
+        to train it on (None if the player does not train).
+        """
+
+        if not self.train:
+            return None
+
+        features, labels, full = self.training.rows(self.replay_memory, self.regressor)
+        return copy.deepcopy(self.regressor), numpy.array(features), numpy.array(labels), full
+
+    def swap_regressor(self, regressor):
+        """
+        Replaces the regressor of the player agent with a regressor trained elsewhere.
+        """
+
+        self.regressor = regressor
+        self.fit = True
+
+    def action_space(self, table_state):
         """ 
-        Returns a list of all possible actions a player has given a Poker table state.
+        Returns the actions a player can perform given a Poker table state as an array of
+        raise amounts (new total bet of player) and a tuple of the other actions.
         """
 
         # amount necessary to call (if any)
@@ -261,43 +255,31 @@ class Player(object):
         min_raise_amount = table_state.min_raise_amount
 
         # record current bets of table
-        current_bets = table_state.current_bets
-        player_current_bet = current_bets[table_state.currently_active]
+        player_current_bet = table_state.current_bets[table_state.currently_active]
 
         # calculate maximum bet player can make
         max_bet = (self.stack + player_current_bet) // 5
 
-        # list of actions player can perform
-        actions = []
-
         # if player does not have enough chips to call full amount
         if to_call > self.stack:
-            actions.append(('call',))
-            actions.append(('fold',))
-            return actions
+            return NO_RAISES, CALL_OR_FOLD
+
+        other_actions = CHECK if to_call == 0 else CALL_OR_FOLD
 
         # if player has enough chips to call but not to raise by any amount
         if max_bet < min_raise_amount:
-            if to_call == 0:
-                actions.append(('check',))
-            else:
-                actions.append(('call',))
-                actions.append(('fold',))
-            return actions
+            return NO_RAISES, other_actions
 
         # add all possible raise choices of player (depend on min raise amount)
-        for r in self.r_choices:
-            amount = int(self.stack * r)
-            if amount >= min_raise_amount and amount <= max_bet:
-                actions.append(('raise', amount))
+        return self.ladder.raises(self.stack, min_raise_amount, max_bet), other_actions
 
-        if to_call == 0:
-            actions.append(('check',))
-        else:
-            actions.append(('call',))
-            actions.append(('fold',))
+    def all_actions(self, table_state):
+        """ 
+        Returns a list of all possible actions a player has given a Poker table state.
+        """
 
-        return actions
+        raise_amounts, others = self.action_space(table_state)
+        return [('raise', amount) for amount in raise_amounts.tolist()] + list(others)
 
     def take_hole_cards(self, cards): self.cards = cards
 
@@ -317,9 +299,9 @@ class Player(object):
 
     def get_raise_choices(self): return self.r_choices[:]
 
-    def get_features(self): return self.features[:]
+    def get_features(self): return self.replay_memory.ordered()[0].tolist()
 
-    def get_labels(self): return self.labels[:]
+    def get_labels(self): return self.replay_memory.ordered()[2].tolist()
 
     # Setters
 
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+import itertools
+import os
+import struct
+from math import comb
+
+import numpy
+
+from ai_poker.equity import SUITS, canonical_key, estimate_equity, get_evaluator
+from ai_poker.evaluator.card_service import CardService
+from ai_poker.evaluator.deck import Deck
+
+# starting hand classes are the suit-isomorphic preflop classes of CardService.canonicalize
+NUM_CLASSES = 169
+
+# number of players at table covered by the multiway table
+MIN_PLAYERS = 2
+MAX_PLAYERS = 9
+
+# location of the preflop equity file shipped with ai_poker
+TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'preflop_equity.bin')
+
+# file format (equities are stored as fixed point numbers: equity * EQUITY_SCALE)
+TABLES_MAGIC = b'NLTHPPRE'
+TABLES_VERSION = 2
+TABLES_HEADER = struct.Struct('<8sIII')
+EQUITY_SCALE = 65535
+
+# preflop tables (loaded on first use)
+tables = None
+
+# combos of hole cards of each starting hand class (generated on first use)
+combos = None
+
+# rank patterns of boards enumerated for exact head-to-head equities (generated on first use)
+patterns = None
+
+# number of ways to pick k cards of a rank among n cards left (BINOMIAL[n][k])
+BINOMIAL = numpy.array([[comb(n, k) for k in range(5)] for n in range(5)], dtype=numpy.int64)
+
+
+def hand_class(hole):
+    ''' Returns starting hand class (0 to 168) of hole cards. '''
+    return CardService.canonicalize(hole)
+
+
+def class_name(index):
+    ''' Returns name of starting hand class (e.g. AA, AKs or AKo). '''
+    first, second = sorted(class_combos(index)[0], key=CardService.get_rank_bit, reverse=True)
+    name = CardService.card_values[CardService.get_rank_bit(first)] + CardService.card_values[CardService.get_rank_bit(second)]
+    if CardService.get_rank_bit(first) == CardService.get_rank_bit(second):
+        return name
+    return name + ('s' if CardService.get_suit_bit(first) == CardService.get_suit_bit(second) else 'o')
+
+
+def class_combos(index):
+    ''' Returns every combination of hole cards of a starting hand class (6, 4 or 12 combos). '''
+    global combos
+    if combos is None:
+        combos = [[] for i in range(NUM_CLASSES)]
+        cards = Deck.get_deck_of_cards()
+        for i in range(len(cards)):
+            for j in range(i + 1, len(cards)):
+                combos[hand_class((cards[i], cards[j]))].append((cards[i], cards[j]))
+    return combos[index][:]
+
+
+def get_patterns():
+    """
+    Returns rank patterns of boards used to enumerate head-to-head equities (built on first use):
+
+    boards : (M, 13) counts of each rank of every multiset of 5 board ranks
+    unsuited : (M, 13, 13) rank of the best hand without flushes of each board and pair of hole ranks
+    flushes : for 3, 4 and 5 board cards of a single suit, a tuple (masks, others, board, mask, other)
+        of the rank masks of the suited board cards, the rank counts of the other board cards,
+        and for every combination of both the board pattern and the indexes of mask and others
+    """
+    global patterns
+    if patterns is not None:
+        return patterns
+
+    # card of each rank and suit
+    cards = numpy.zeros((13, len(SUITS)), dtype=numpy.int64)
+    for card in Deck.get_deck_of_cards():
+        cards[CardService.get_rank_bit(card), SUITS.index(CardService.get_suit_bit(card))] = card
+
+    boards = numpy.array([numpy.bincount(ranks, minlength=13) for ranks in itertools.combinations_with_replacement(range(13), 5)
+                          if max(numpy.bincount(ranks)) <= 4], dtype=numpy.int64)
+
+    # board patterns are sorted by code (counts as digits in base 5) to be found by binary search
+    codes = boards @ 5 ** numpy.arange(13)
+    boards, codes = boards[numpy.argsort(codes)], numpy.sort(codes)
+
+    # evaluate hole ranks on every board pattern with suits dealt in turn (no flush is possible)
+    unsuited = numpy.zeros((len(boards), 13, 13), dtype=numpy.int32)
+    for first, second in itertools.combinations_with_replacement(range(13), 2):
+        counts = boards.copy()
+        counts[:, first] += 1
+        counts[:, second] += 1
+        valid = numpy.nonzero(counts.max(axis=1) <= 4)[0]
+        ranks = (numpy.cumsum(counts[valid], axis=1)[:, None, :] <= numpy.arange(7)[:, None]).sum(axis=2)
+        hands = cards[ranks, numpy.arange(7) % len(SUITS)]
+        unsuited[valid, first, second] = unsuited[valid, second, first] = get_evaluator().evaluate_batch(hands[:, :2], hands[:, 2:])
+
+    flushes = {}
+    for suited in (3, 4, 5):
+        masks = numpy.array([sum(1 << rank for rank in ranks) for ranks in itertools.combinations(range(13), suited)], dtype=numpy.int64)
+        suited_counts = (masks[:, None] >> numpy.arange(13)) & 1
+        others = numpy.array([numpy.bincount(ranks, minlength=13) for ranks in itertools.combinations_with_replacement(range(13), 5 - suited)
+                              if not ranks or max(numpy.bincount(ranks)) <= 3], dtype=numpy.int64).reshape(-1, 13)
+        mask, other = (index.ravel() for index in numpy.meshgrid(numpy.arange(len(masks)), numpy.arange(len(others)), indexing='ij'))
+        board = numpy.searchsorted(codes, (suited_counts[mask] + others[other]) @ 5 ** numpy.arange(13))
+        flushes[suited] = (masks, others, board, mask, other)
+
+    patterns = {'boards': boards, 'unsuited': unsuited, 'flushes': flushes}
+    return patterns
+
+
+def share(ranks, other_ranks):
+    ''' Returns pot share won by hands of ranks against hands of other_ranks (lower ranks are better). '''
+    return numpy.where(ranks < other_ranks, 1.0, numpy.where(ranks == other_ranks, 0.5, 0.0))
+
+
+def head_to_head_equity(hole, other_hole):
+    """
+    Returns exact equity of hole cards against other hole cards all-in before the flop,
+    over the 1,712,304 boards of the 48 cards left.
+
+    Boards are enumerated by pattern of ranks (weighted by the number of boards with those ranks)
+    and evaluated without flushes, then boards with 3 or more cards of a suit are enumerated
+    by suited ranks to correct the outcome of boards on which a player makes a flush.
+    """
+    hands = [list(hole), list(other_hole)]
+    dealt = hands[0] + hands[1]
+    patterns = get_patterns()
+    lookup_flush = get_evaluator().table.get_arrays()[0]
+    unsuited = [patterns['unsuited'][:, CardService.get_rank_bit(hand[0]), CardService.get_rank_bit(hand[1])] for hand in hands]
+
+    # every board by rank pattern, evaluated without flushes
+    removed = numpy.bincount([CardService.get_rank_bit(card) for card in dealt], minlength=13)
+    weights = BINOMIAL[4 - removed, patterns['boards']].prod(axis=1)
+    won = float(weights @ share(*unsuited))
+
+    for suit in SUITS:
+        held = [sum(1 << CardService.get_rank_bit(card) for card in hand if CardService.get_suit_bit(card) == suit) for hand in hands]
+        removed = numpy.bincount([CardService.get_rank_bit(card) for card in dealt if CardService.get_suit_bit(card) != suit],
+                                 minlength=13)
+
+        for suited, (masks, others, board, mask, other) in patterns['flushes'].items():
+            # a flush takes 5 - suited hole cards of suit
+            if max(bin(suit_ranks).count('1') for suit_ranks in held) < 5 - suited:
+                continue
+            weights = ((masks & (held[0] | held[1])) == 0)[mask] * BINOMIAL[3 - removed, others].prod(axis=1)[other]
+            board_ranks = [ranks[board] for ranks in unsuited]
+            flush_ranks = []
+            for suit_ranks, ranks in zip(held, board_ranks):
+                flush = lookup_flush[masks[mask] | suit_ranks]
+                flush_ranks.append(numpy.where((flush > 0) & (flush < ranks), flush, ranks))
+            won += float(weights @ (share(*flush_ranks) - share(*board_ranks)))
+
+    return won / comb(52 - len(dealt), 5)
+
+
+def class_equity(index, other, cache):
+    """
+    Returns exact equity of a starting hand class against another class, averaged over every
+    combo of the other class that does not share a card with a combo of the class (every combo
+    of a class has the same average). Equities are cached by canonical key of the deal.
+    """
+    hole = class_combos(index)[0]
+    equities = []
+    for other_hole in class_combos(other):
+        if set(hole) & set(other_hole):
+            continue
+        key = canonical_key([hole, other_hole], [], [])
+        if key not in cache:
+            cache[key] = head_to_head_equity(*key[0])
+        equities.append(cache[key])
+    return sum(equities) / len(equities)
+
+
+def generate_tables(multiway_samples=1000000, workers=None, seed=0):
+    """
+    Computes preflop equity tables of the 169 starting hand classes.
+
+    Returns a tuple (head_to_head, multiway) where head_to_head[i][j] is the exact equity of
+    class i against class j and multiway[i][n - 2] the equity of class i against n - 1
+    random hands (n from 2 to 9 players, exact for 2 players and sampled otherwise).
+    """
+    rng = numpy.random.default_rng(seed)
+
+    head_to_head = numpy.zeros((NUM_CLASSES, NUM_CLASSES))
+    cache = {}
+    for index in range(NUM_CLASSES):
+        for other in range(index, NUM_CLASSES):
+            equity = class_equity(index, other, cache)
+            head_to_head[index][other] = equity
+            head_to_head[other][index] = 1.0 - equity
+
+    # against a random hand, matchups are weighted by the number of combos of the other class left
+    multiway = numpy.zeros((NUM_CLASSES, MAX_PLAYERS - MIN_PLAYERS + 1))
+    for index in range(NUM_CLASSES):
+        hole = class_combos(index)[0]
+        combos_left = [sum(not set(hole) & set(other_hole) for other_hole in class_combos(other)) for other in range(NUM_CLASSES)]
+        multiway[index][0] = numpy.dot(head_to_head[index], combos_left) / sum(combos_left)
+
+    # every combo of a class has the same equity against random hands
+    for index in range(NUM_CLASSES):
+        hole = class_combos(index)[0]
+        for num_players in range(MIN_PLAYERS + 1, MAX_PLAYERS + 1):
+            equity = estimate_equity(hole, n_opponents=num_players - 1, n_samples=multiway_samples,
+                                     workers=workers, seed=int(rng.integers(2**32)))[0]
+            multiway[index][num_players - MIN_PLAYERS] = equity
+
+    return head_to_head, multiway
+
+
+def save_tables(head_to_head, multiway, head_to_head_samples, multiway_samples, path=TABLES_PATH):
+    ''' Writes preflop equity tables to file (with 0 head_to_head_samples for exact equities). '''
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(TABLES_HEADER.pack(TABLES_MAGIC, TABLES_VERSION, head_to_head_samples, multiway_samples))
+        for table in (head_to_head, multiway):
+            f.write(numpy.round(numpy.asarray(table) * EQUITY_SCALE).astype('<u2').tobytes())
+
+
+def load_tables(path=TABLES_PATH):
+    ''' Returns preflop equity tables (head_to_head, multiway) read from file. '''
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    magic, version, head_to_head_samples, multiway_samples = TABLES_HEADER.unpack_from(data)
+    if magic != TABLES_MAGIC or version != TABLES_VERSION:
+        raise Exception('Preflop equity file was written by another version, generate it again.')
+
+    values = numpy.frombuffer(data, dtype='<u2', offset=TABLES_HEADER.size) / float(EQUITY_SCALE)
+    head_to_head = values[:NUM_CLASSES * NUM_CLASSES].reshape(NUM_CLASSES, NUM_CLASSES)
+    multiway = values[NUM_CLASSES * NUM_CLASSES:].reshape(NUM_CLASSES, MAX_PLAYERS - MIN_PLAYERS + 1)
+    return head_to_head, multiway
+
+
+def get_tables():
+    ''' Returns preflop equity tables shipped with ai_poker (loaded on first use). '''
+    global tables
+    if tables is None:
+        tables = load_tables()
+    return tables
+
+
+def preflop_equity(hole, num_players=2):
+    ''' Returns equity of hole cards against num_players - 1 random hands before the flop. '''
+    if not MIN_PLAYERS <= num_players <= MAX_PLAYERS:
+        raise Exception('Preflop equities are available for 2 to 9 players.')
+    return float(get_tables()[1][hand_class(hole)][num_players - MIN_PLAYERS])
+
+
+def preflop_matchup(hole, other_hole):
+    ''' Returns equity of the starting hand class of hole cards against the class of other hole cards. '''
+    return float(get_tables()[0][hand_class(hole)][hand_class(other_hole)])
+
+
+def main():
+    """
+    Generates preflop equity tables and writes them to the file shipped with ai_poker.
+    """
+    multiway_samples = 1000000
+
+    print('Generating preflop equity tables...')
+    head_to_head, multiway = generate_tables(multiway_samples)
+    save_tables(head_to_head, multiway, 0, multiway_samples)
+    print('Complete.')
+
+
+if __name__ == '__main__':
+    main()
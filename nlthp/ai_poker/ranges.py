@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+import itertools
+import math
+import re
+
+import numpy
+
+from ai_poker.equity import check_cards, get_evaluator
+from ai_poker.evaluator.card_service import CardService
+from ai_poker.evaluator.deck import Deck
+
+# number of boards evaluated together (bounds memory of the batch evaluation)
+BOARD_CHUNK_SIZE = 100
+
+# runouts are enumerated when there are at most this many, sampled otherwise
+MAX_RUNOUTS = 2000
+
+# suit index (0 to 3) of each suit bit
+SUIT_INDEX = numpy.array([0, 0, 1, 0, 2, 0, 0, 0, 3], dtype=numpy.int64)
+
+# range entries: a specific combo (e.g. AsKs) or a hand (e.g. AKs, 76 or QQ) with optional '+' or
+# '-' and a second hand, both with an optional ':weight'
+COMBO_ENTRY = re.compile(r'^([2-9TJQKA][shdc])([2-9TJQKA][shdc])(:[0-9.]+)?$')
+HAND_ENTRY = re.compile(r'^([2-9TJQKA])([2-9TJQKA])([so]?)(\+|-([2-9TJQKA])([2-9TJQKA])([so]?))?(:[0-9.]+)?$')
+
+
+def card_masks(cards):
+    ''' Returns 52-bit masks (one bit per card of the deck) of cards in bitwise evaluation format. '''
+    cards = numpy.asarray(cards, dtype=numpy.int64)
+    index = ((cards >> 8) & 0xF) * 4 + SUIT_INDEX[(cards >> 12) & 0xF]
+    return numpy.left_shift(numpy.uint64(1), index.astype(numpy.uint64))
+
+
+def hand_combos(high, low, suited):
+    ''' Returns combos of a starting hand given ranks (0 to 12) and suitedness ('s', 'o' or '' for both). '''
+    def card(rank, suit):
+        return CardService.create_evaluation(CardService.card_values[rank] + suit)
+
+    if high == low:
+        hands = [(card(high, first), card(low, second)) for first, second in itertools.combinations('shdc', 2)]
+    else:
+        hands = []
+        if suited != 'o':
+            hands += [(card(high, suit), card(low, suit)) for suit in 'shdc']
+        if suited != 's':
+            hands += [(card(high, first), card(low, second)) for first in 'shdc' for second in 'shdc' if first != second]
+    return hands
+
+
+def rank_combos(combos, masks, boards, board_masks):
+    """
+    Returns ranks of every combo on every board as a (boards, combos) array along with
+    the (boards, combos) mask of combos that do not share a card with the board.
+    """
+    dealt = (masks[None, :] & board_masks[:, None]) == 0
+    rows, columns = numpy.nonzero(dealt)
+    ranks = numpy.zeros(dealt.shape, dtype=numpy.int32)
+    ranks[rows, columns] = get_evaluator().evaluate_batch(combos[columns], boards[rows])
+    return ranks, dealt
+
+
+def parse_entry(entry):
+    ''' Returns (combos, weight) of a single range entry (e.g. QQ+, AKs, 76s-54s, AsKs or AKo:0.5). '''
+    # specific combo (e.g. AsKs)
+    match = COMBO_ENTRY.match(entry)
+    if match is not None:
+        first, second, weight = match.groups()
+        if first == second:
+            raise Exception('Invalid range entry: ' + entry)
+        weight = float(weight[1:]) if weight else 1.0
+        return [(CardService.create_evaluation(first), CardService.create_evaluation(second))], weight
+
+    match = HAND_ENTRY.match(entry)
+    if match is None:
+        raise Exception('Invalid range entry: ' + entry)
+    first, second, suited, span, span_high, span_low, span_suited, weight = match.groups()
+    weight = float(weight[1:]) if weight else 1.0
+
+    high, low = CardService.card_value_to_rank[first], CardService.card_value_to_rank[second]
+    if high < low:
+        high, low = low, high
+    if high == low and suited:
+        raise Exception('Pairs cannot be suited or offsuit: ' + entry)
+
+    if span is None:
+        hands = [(high, low)]
+    elif span == '+':
+        # pairs up to aces, other hands up to a kicker one below the high card
+        if high == low:
+            hands = [(rank, rank) for rank in range(high, 13)]
+        else:
+            hands = [(high, kicker) for kicker in range(low, high)]
+    else:
+        other_high = CardService.card_value_to_rank[span_high]
+        other_low = CardService.card_value_to_rank[span_low]
+        if other_high < other_low:
+            other_high, other_low = other_low, other_high
+        if span_suited != suited:
+            raise Exception('Both ends of a range must have the same suitedness: ' + entry)
+
+        if high == low and other_high == other_low:
+            # pairs (e.g. 22-55)
+            hands = [(rank, rank) for rank in range(min(low, other_low), max(high, other_high) + 1)]
+        elif high == other_high:
+            # same high card (e.g. A2s-A5s)
+            hands = [(high, kicker) for kicker in range(min(low, other_low), max(low, other_low) + 1)]
+        elif high - low == other_high - other_low:
+            # same gap (e.g. 76s-54s)
+            gap = high - low
+            hands = [(rank, rank - gap) for rank in range(min(high, other_high), max(high, other_high) + 1)]
+        else:
+            raise Exception('Invalid range entry: ' + entry)
+
+    combos = []
+    for hand_high, hand_low in hands:
+        combos += hand_combos(hand_high, hand_low, suited)
+    return combos, weight
+
+
+def parse_range(text, board=(), dead=()):
+    """
+    Parses a range in standard notation into weighted combos of hole cards.
+
+    Entries are separated by commas, e.g. "QQ+, AKs, AQo:0.5, 76s-54s, AsKs". A weight
+    (0 to 1) can follow an entry after a colon, later entries override earlier ones.
+    Combos sharing a card with the board or dead cards are removed.
+
+    ...
+
+    Parameters
+    ----------
+    text : str
+        range in standard notation
+    board : list
+        community cards (in bitwise evaluation format)
+    dead : list
+        cards known to be out of the deck
+
+    Returns
+    -------
+    tuple
+        (combos as an (N, 2) array of cards in bitwise evaluation format, weights as an (N,) array)
+    """
+
+    weights = {}
+    for entry in text.replace(' ', '').split(','):
+        if not entry:
+            continue
+        combos, weight = parse_entry(entry)
+        for combo in combos:
+            weights[tuple(sorted(combo))] = weight
+
+    blocked = set(board) | set(dead)
+    combos = [combo for combo, weight in weights.items() if weight > 0 and not blocked.intersection(combo)]
+    weights = [weights[combo] for combo in combos]
+    return numpy.array(combos, dtype=numpy.int64).reshape(-1, 2), numpy.array(weights, dtype=numpy.float64)
+
+
+def range_equity(hero_range, villain_range, board=(), dead=(), n_samples=1000, seed=None):
+    """
+    Computes equity of a range against another range, weighting every pair of combos
+    that do not share a card by the product of their weights.
+
+    Runouts of the remaining deck are enumerated when there are at most MAX_RUNOUTS of
+    them (flop, turn and river), otherwise n_samples runouts are sampled. Every combo
+    of both ranges is evaluated on each runout at once and combos are compared through
+    (hero x villain) matrices, with card masks removing combos that share a card.
+
+    ...
+
+    Parameters
+    ----------
+    hero_range : tuple
+        (combos, weights) of the first range (see parse_range)
+    villain_range : tuple
+        (combos, weights) of the second range
+    board : list
+        community cards dealt so far (0, 3, 4 or 5 cards)
+    dead : list
+        cards known to be out of the deck
+    n_samples : int
+        number of runouts sampled when runouts are not enumerated
+    seed : int
+        seed of the random runouts
+
+    Returns
+    -------
+    tuple
+        (equity of the first range, equity of each combo of the first range)
+    """
+
+    board, dead = list(board), list(dead)
+    check_cards(board + dead)
+    if len(board) not in (0, 3, 4, 5):
+        raise Exception('Enter 0, 3, 4 or 5 board cards.')
+
+    hero, hero_weights = numpy.asarray(hero_range[0], dtype=numpy.int64).reshape(-1, 2), numpy.asarray(hero_range[1])
+    villain, villain_weights = numpy.asarray(villain_range[0], dtype=numpy.int64).reshape(-1, 2), numpy.asarray(villain_range[1])
+    hero_masks = card_masks(hero[:, 0]) | card_masks(hero[:, 1])
+    villain_masks = card_masks(villain[:, 0]) | card_masks(villain[:, 1])
+    blocked = numpy.bitwise_or.reduce(card_masks(board + dead), initial=numpy.uint64(0))
+
+    # weight of every pair of combos (zero if the combos share a card or are blocked by the board or dead cards)
+    pair_weights = numpy.outer(hero_weights * ((hero_masks & blocked) == 0),
+                               villain_weights * ((villain_masks & blocked) == 0))
+    pair_weights[(hero_masks[:, None] & villain_masks[None, :]) != 0] = 0.0
+    if not pair_weights.any():
+        raise Exception('Ranges have no combos left that do not share a card.')
+
+    remaining = numpy.array([card for card in Deck.get_deck_of_cards() if card not in board + dead], dtype=numpy.int64)
+    missing = 5 - len(board)
+    num_runouts = math.comb(len(remaining), missing)
+    if num_runouts <= MAX_RUNOUTS:
+        runouts = remaining[numpy.array(list(itertools.combinations(range(len(remaining)), missing)),
+                                        dtype=numpy.intp).reshape(num_runouts, missing)]
+    else:
+        rng = numpy.random.default_rng(seed)
+        runouts = remaining[rng.random((n_samples, len(remaining))).argsort(axis=1)[:, :missing]]
+    boards = numpy.concatenate((numpy.tile(numpy.array(board, dtype=numpy.int64), (len(runouts), 1)), runouts), axis=1)
+    board_masks = numpy.bitwise_or.reduce(card_masks(runouts), axis=1, initial=numpy.uint64(0)) | blocked
+
+    won, total = numpy.zeros(len(hero)), numpy.zeros(len(hero))
+    for start in range(0, len(boards), BOARD_CHUNK_SIZE):
+        chunk, chunk_masks = boards[start:start + BOARD_CHUNK_SIZE], board_masks[start:start + BOARD_CHUNK_SIZE]
+
+        # rank every combo on every board of the chunk in one batch
+        hero_ranks, hero_dealt = rank_combos(hero, hero_masks, chunk, chunk_masks)
+        villain_ranks, villain_dealt = rank_combos(villain, villain_masks, chunk, chunk_masks)
+
+        for i in range(len(chunk)):
+            weights = pair_weights * numpy.outer(hero_dealt[i], villain_dealt[i])
+            share = numpy.where(hero_ranks[i][:, None] < villain_ranks[i][None, :], 1.0,
+                                numpy.where(hero_ranks[i][:, None] == villain_ranks[i][None, :], 0.5, 0.0))
+            won += (weights * share).sum(axis=1)
+            total += weights.sum(axis=1)
+
+    combo_equities = numpy.divide(won, total, out=numpy.full(len(hero), numpy.nan), where=total > 0)
+    return float(won.sum() / total.sum()), combo_equities
@@ -0,0 +1,173 @@
+import numpy
+
+from ai_poker import events
+from ai_poker.features import ACTION_COLUMNS, NUM_ACTION_FEATURES, NUM_GAME_FEATURES, encode_actions, encode_cards
+from ai_poker.tablestate import TableState
+
+# event kinds of decisions of players (actions selected through Player.perform_action)
+DECISION_KINDS = (events.CHECK, events.FOLD, events.CALL, events.ALL_IN_CALL, events.RAISE, events.ALL_IN_RAISE)
+
+# columns of replayed decisions (one row per decision)
+DECISION_COLUMNS = {
+    'hand': numpy.int64,                # index of hand in hand history
+    'seat': numpy.int64,                # seat of player in hand
+    'player': numpy.int64,              # index of player in table players
+    'street': numpy.int64,              # betting round (0 preflop, 1 flop, 2 turn, 3 river)
+    'kind': numpy.int64,                # event kind of action
+    'amount': numpy.int64,              # amount of action (total bet of player for raises)
+    'stack': numpy.int64,               # stack of player before action
+    'to_call': numpy.int64,             # chips player must call to stay in hand
+    'current_bet': numpy.int64,         # chips entered by player in betting round
+    'max_bet': numpy.int64,             # largest bet of betting round
+    'pot': numpy.int64,                 # chips entered by all players in hand
+    'min_raise_amount': numpy.int64,    # minimum raise
+    'end_stack': numpy.int64,           # stack of player at the end of hand
+}
+
+# action of each decision kind (as entered to Player.gen_action_features)
+ACTIONS = {events.CHECK: 'check', events.FOLD: 'fold', events.CALL: 'call', events.ALL_IN_CALL: 'call',
+           events.RAISE: 'raise', events.ALL_IN_RAISE: 'raise'}
+
+
+def replay_decisions(history, visit=None):
+    """
+    Replays every hand of a hand history and reconstructs the TableState of the hand at
+    each decision of a player (check, fold, call or raise), without calling any Player.
+
+    ...
+
+    Parameters
+    ----------
+    history : HandHistory
+        hand history to replay
+    visit : function
+        called as visit(row, action, state) at each decision with the index of the decision,
+        the action (as returned by Player.perform_action) and the TableState before the action
+        (a single TableState is reused, it must not be kept)
+
+    Returns
+    -------
+    dict
+        columns of decisions (see DECISION_COLUMNS) along with 'holes' (hole cards of player)
+        and 'board' (community cards dealt, 0 when not dealt) as (decisions, 2) and (decisions, 5) arrays
+    """
+
+    columns = {name: [] for name in DECISION_COLUMNS}
+    holes, boards = [], []
+    state = TableState([])
+    hand_offset = 0
+
+    for shard in history.shards:
+        big_blind = int(shard['blinds'][1])
+        offsets = shard['action_offsets'].tolist()
+        seats, kinds, amounts, streets = (shard[name].tolist() for name in ('action_seat', 'action_kind', 'action_amount', 'action_street'))
+
+        for hand in range(len(shard['num_players'])):
+            num_players = int(shard['num_players'][hand])
+            players = shard['players'][hand].tolist()
+            stacks = shard['stacks'][hand, :num_players].tolist()
+            hand_holes = shard['holes'][hand].tolist()
+            board = shard['board'][hand].tolist()
+            state.reset(stacks)
+            state.min_raise_amount = 2 * big_blind
+            street, first_row = 0, len(columns['hand'])
+
+            for i in range(offsets[hand], offsets[hand + 1]):
+                seat, kind, amount = seats[i], kinds[i], amounts[i]
+
+                # new betting round (community cards dealt)
+                if streets[i] != street:
+                    state.end_round()
+                    street = streets[i]
+                    state.min_raise_amount = big_blind
+                    state.cards = board[:street + 2]
+
+                if kind in DECISION_KINDS:
+                    state.currently_active = seat
+                    state.to_call = state.max_bet - state.current_bets[seat]
+                    action = (ACTIONS[kind], amount) if kind in (events.RAISE, events.ALL_IN_RAISE) else (ACTIONS[kind],)
+                    if visit is not None:
+                        visit(len(columns['hand']), action, state)
+                    for name, value in (('hand', hand_offset + hand), ('seat', seat), ('player', players[seat]),
+                                        ('street', street), ('kind', kind), ('amount', amount), ('stack', stacks[seat]),
+                                        ('to_call', state.to_call), ('current_bet', state.current_bets[seat]),
+                                        ('max_bet', state.max_bet), ('pot', state.pot),
+                                        ('min_raise_amount', state.min_raise_amount)):
+                        columns[name].append(value)
+                    holes.append(hand_holes[seat])
+                    boards.append(board[:len(state.cards)] + [0] * (5 - len(state.cards)))
+
+                # apply action to table state
+                if kind == events.FOLD:
+                    state.fold(seat)
+                elif kind in (events.SMALL_BLIND, events.BIG_BLIND, events.CALL, events.ALL_IN_CALL):
+                    state.add_bet(seat, amount)
+                    stacks[seat] -= amount
+                elif kind in (events.RAISE, events.ALL_IN_RAISE):
+                    state.min_raise_amount = 2 * amount - state.max_bet
+                    stacks[seat] -= amount - state.current_bets[seat]
+                    state.add_bet(seat, amount - state.current_bets[seat])
+                    state.num_raises[seat] += 1
+                elif kind == events.RETURN:
+                    state.return_bet(seat, amount)
+                    stacks[seat] += amount
+                if kind in (events.ALL_IN_CALL, events.ALL_IN_RAISE):
+                    state.go_all_in(seat)
+
+            # stack of each player at the end of hand
+            winnings = shard['winnings'][hand].tolist()
+            for row in range(first_row, len(columns['hand'])):
+                seat = columns['seat'][row]
+                columns['end_stack'].append(stacks[seat] + winnings[seat])
+
+        hand_offset += len(shard['num_players'])
+
+    decisions = {name: numpy.array(values, dtype=DECISION_COLUMNS[name]) for name, values in columns.items()}
+    decisions['holes'] = numpy.array(holes, dtype=numpy.int64).reshape(-1, 2)
+    decisions['board'] = numpy.array(boards, dtype=numpy.int64).reshape(-1, 5)
+    return decisions
+
+
+def game_features(decisions):
+    ''' Returns game features of every decision as a (decisions, 43) float32 array (see features.GAME_FEATURES). '''
+    features = numpy.zeros((len(decisions['stack']), NUM_GAME_FEATURES), dtype=numpy.float32)
+    encode_cards(features, decisions['holes'], decisions['board'])
+    features[:, NUM_GAME_FEATURES - 1] = decisions['stack']
+    return features
+
+
+def action_features(decisions):
+    ''' Returns action features of every decision as a (decisions, 7) float32 array (see features.ACTION_FEATURES). '''
+    features = numpy.zeros((len(decisions['kind']), NUM_ACTION_FEATURES), dtype=numpy.float32)
+    columns = numpy.array([ACTION_COLUMNS.get(ACTIONS.get(kind), 0) for kind in range(events.HAND_END + 1)])
+    encode_actions(features, columns[decisions['kind']], decisions['amount'], decisions['max_bet'], decisions['pot'])
+    return features
+
+
+def stack_labels(decisions):
+    ''' Returns label of every decision as recorded by Player (change of stack from decision to end of hand). '''
+    return (decisions['end_stack'] - decisions['stack']).astype(numpy.float64)
+
+
+def replay(history, label=stack_labels):
+    """
+    Regenerates features and labels of every decision of a hand history in bulk.
+
+    ...
+
+    Parameters
+    ----------
+    history : HandHistory
+        hand history to replay
+    label : function
+        returns labels of decisions given the replayed decisions (see stack_labels)
+
+    Returns
+    -------
+    tuple
+        (features as a (decisions, 50) float32 array, labels, decisions as returned by replay_decisions)
+    """
+
+    decisions = replay_decisions(history)
+    features = numpy.concatenate((game_features(decisions), action_features(decisions)), axis=1)
+    return features, label(decisions), decisions
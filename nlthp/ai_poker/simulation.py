@@ -1,9 +1,19 @@
 
+import copy
+import random
 
+import numpy
+
+from ai_poker.equity import get_pool
+from ai_poker.history import HistorySink
+from ai_poker.memory import ReplayMemory
 from ai_poker.player import Player
+from ai_poker.table import Table
+from ai_poker.training import BackgroundTraining
 
 
-def simulate(table, num_hands, hands_before_training=0, hands_between_training=0, hands_between_buyin=0, narrate_hands=False):
+def simulate(table, num_hands, hands_before_training=0, hands_between_training=0, hands_between_buyin=0, narrate_hands=False,
+             workers=None, seed=None, history=None, background_training=False):
     """
 
     This is the helper function used for simulating Poker games
@@ -33,8 +43,22 @@ def simulate(table, num_hands, hands_before_training=0, hands_between_training=0
     narrate_hands : bool
         comments of hands simulation are outputted to standard output
         according to this value
+    workers : int
+        number of worker processes playing hands on replicas of the table
+        (hands are played on the table itself if None or 1, or if hands are narrated)
+    seed : int
+        seed of the cards dealt and random actions on table replicas
+    history : str
+        directory of a hand history every simulated hand is appended to (see HandHistory)
+    background_training : bool
+        Agents train in a background thread on a snapshot of their memory while hands keep
+        being simulated with their previous regressor (swapped for the trained one when ready)
     """
 
+    if workers and workers > 1 and not narrate_hands:
+        return simulate_parallel(table, num_hands, hands_before_training, hands_between_training,
+                                 hands_between_buyin, workers, seed, history, background_training)
+
     # hands simulated interval between outputting current number of hands simulated
     PRINT_HANDS_INTERVAL = 200
 
@@ -64,56 +88,219 @@ def simulate(table, num_hands, hands_before_training=0, hands_between_training=0
     # next hand players will buy-in    
     next_buy_in = hands_between_buyin  
    
-    # simulate one hand at a time
-    for hand in range(1, num_hands + 1):
+    # train agents while hands are simulated
+    if background_training:
+        trainer = BackgroundTraining()
 
-        if hand % 200 == 0:
-            print(hand, 'hands simulated.')
+    # record every hand to the hand history
+    if history is not None:
+        sink = HistorySink(table, history)
+        table.add_sink(sink)
 
-        # train agents
-        if hand == next_train:
-            print('Agents are training...')
-            for player in players:
-                player.train_player()
-            next_train = hand + hands_between_training
-            print('Complete.')
+    try:
+        # simulate one hand at a time
+        for hand in range(1, num_hands + 1):
 
-        # let eliminated agents buy-in again
-        if hand == next_buy_in:
-            if narrate_hands:
-                print('Agents are buying in again...')
-            for player in players:
-                player.cash_out()
-                if player.get_stack() < max_buy_in:
-                    player.buy_chips(max_buy_in)
-            next_buy_in = hand + hands_between_buyin
+            if hand % 200 == 0:
+                print(hand, 'hands simulated.')
+
+            # swap in regressors trained in background (between hands only)
+            if background_training:
+                trainer.collect()
+
+            # train agents
+            if hand == next_train:
+                if background_training:
+                    print('Agents are training in background...')
+                    for player in players:
+                        trainer.train(player)
+                else:
+                    print('Agents are training...')
+                    for player in players:
+                        player.train_player()
+                    print('Complete.')
+                next_train = hand + hands_between_training
 
-        if narrate_hands:
-            print('Hand', hand)
+            # let eliminated agents buy-in again
+            if hand == next_buy_in:
+                if narrate_hands:
+                    print('Agents are buying in again...')
+                for player in players:
+                    player.cash_out()
+                    if player.get_stack() < max_buy_in:
+                        player.buy_chips(max_buy_in)
+                next_buy_in = hand + hands_between_buyin
+
+            if narrate_hands:
+                print('Hand', hand)
         
-        # simulate hand between agents
-        played = table.play_hand(narrate_hands=narrate_hands)
-
-        # if all agents but one are eliminated let them buy-in again
-        if not played:
-            if next_buy_in == hand + hands_between_buyin:
-                print('All but one Agent have no chips left.')
-                # agents buy-in and continue simulation
-                break
+            # simulate hand between agents
+            played = table.play_hand(narrate_hands=narrate_hands)
+
+            # if all agents but one are eliminated let them buy-in again
+            if not played:
+                if next_buy_in == hand + hands_between_buyin:
+                    print('All but one Agent have no chips left.')
+                    # agents buy-in and continue simulation
+                    break
                 
-            if narrate_hands:
-                print('Poker Game over.')
-                # find only agent with chips left (winner)
+                if narrate_hands:
+                    print('Poker Game over.')
+                    # find only agent with chips left (winner)
+                    for player in players:
+                        if (player.get_stack() != 0):
+                            print(player.get_name() + " is the winner.")
+                    break
+                next_buy_in = hand
+
+            else:
+                # record chips amount of each player after each hand
+                for i in range(len(players)):
+                    chips_amount[i].append(players[i].get_chips_amount())
+    finally:
+        # close hand history and wait for agents still training (even if a hand failed)
+        if history is not None:
+            table.remove_sink(sink)
+            sink.close()
+        if background_training:
+            trainer.close()
+
+    print('Simulation complete.\n')
+    return chips_amount
+
+
+def play_shard(blinds_and_buyin, players, num_hands, hands_between_buyin, seed, history=None):
+    """
+    Plays hands on a replica of a table in a worker process (seed is a SeedSequence).
+
+    Players are copies of the table players (with frozen regressors and empty memory),
+    which buy in again every hands_between_buyin hands or when a single one has chips left.
+    Returns the features, stacks and labels recorded by each player along with the
+    chips amount of each player after each hand and after cashing out at the end of the
+    shard (both relative to the start of the shard, which players enter cashed out).
+    Hands are appended to the hand history at directory history (if not None).
+    """
+
+    seeds = seed.generate_state(2)
+    random.seed(int(seeds[0]))
+    table = Table(*blinds_and_buyin, seed=int(seeds[1]))
+    start_chips = [player.get_chips_amount() for player in players]
+
+    for player in players:
+        table.add_player(player)
+        player.cash_out()
+        player.buy_chips(blinds_and_buyin[-1])
+
+    if history is not None:
+        sink = HistorySink(table, history)
+        table.add_sink(sink)
+
+    chips_amount = numpy.zeros((num_hands, len(players)), dtype=numpy.int64)
+    try:
+        for hand in range(1, num_hands + 1):
+            if not table.play_hand() or (hands_between_buyin and hand % hands_between_buyin == 0):
                 for player in players:
-                    if (player.get_stack() != 0):
-                        print(player.get_name() + " is the winner.")
-                break
-            next_buy_in = hand
-
-        else:
-            # record chips amount of each player after each hand
-            for i in range(len(players)):
-                chips_amount[i].append(players[i].get_chips_amount())
+                    player.cash_out()
+                    player.buy_chips(blinds_and_buyin[-1])
+            chips_amount[hand - 1] = [player.get_chips_amount() - chips for player, chips in zip(players, start_chips)]
+    finally:
+        if history is not None:
+            sink.close()
+
+    # players leave the replica with their stack
+    for player in players:
+        player.cash_out()
+    final_chips = numpy.array([player.get_chips_amount() - chips for player, chips in zip(players, start_chips)], dtype=numpy.int64)
+
+    memories = [player.replay_memory.ordered() for player in players]
+    return memories, chips_amount, final_chips
+
+
+def simulate_parallel(table, num_hands, hands_before_training, hands_between_training, hands_between_buyin,
+                      workers, seed=None, history=None, background_training=False):
+    """
+    Simulates hands as simulate does, with the hands between two trainings of the Agents
+    split among replicas of the table played in worker processes.
+
+    Each replica has its own seeded cards and random actions and a copy of the players
+    with their current regressors. Features/labels recorded on the replicas are merged
+    into the memory of each player (in order of replica) before players are trained.
+    Replicas append their hands to the hand history at directory history (if not None).
+    With background_training, players train in a background thread while the replicas play
+    the next hands with their previous regressors.
+    """
+
+    print("Poker hands simulation starting...")
+    print(num_hands, 'hands will be simulated between agents on', workers, 'workers.\n')
+
+    players = table.get_players()
+    chips_amount = [[] for player in players]
+    seeds = numpy.random.SeedSequence(seed)
+
+    # players enter replicas cashed out (each replica buys in from chips amount)
+    for player in players:
+        player.cash_out()
+
+    # hands at which agents train
+    next_train = hands_before_training or hands_between_training
+    boundaries = []
+    while next_train and next_train <= num_hands:
+        boundaries.append(next_train)
+        if not hands_between_training:
+            break
+        next_train += hands_between_training
+
+    # train agents while replicas play hands
+    if background_training:
+        trainer = BackgroundTraining()
+
+    try:
+        # hands played between trainings (training happens before the first hand of a segment)
+        start = 1
+        for end in boundaries + [num_hands + 1]:
+            if background_training:
+                trainer.collect()
+            if start in boundaries:
+                if background_training:
+                    print('Agents are training in background...')
+                    for player in players:
+                        trainer.train(player)
+                else:
+                    print('Agents are training...')
+                    for player in players:
+                        player.train_player()
+                    print('Complete.')
+            if end <= start:
+                continue
+
+            # players are copied without their memory (replicas only return the new features/labels)
+            copies = []
+            for player in players:
+                memory = player.replay_memory
+                player.replay_memory = ReplayMemory(player.memory)
+                copies.append(copy.copy(player))
+                player.replay_memory = memory
+
+            num_segment = end - start
+            shards = [num_segment // workers + (i < num_segment % workers) for i in range(workers)]
+            tasks = [(table.get_blinds_and_buyin(), copies, shard, hands_between_buyin, shard_seed, history)
+                     for shard, shard_seed in zip(shards, seeds.spawn(workers)) if shard]
+            results = get_pool(workers).starmap(play_shard, tasks)
+
+            for memories, shard_chips, final_chips in results:
+                for i, player in enumerate(players):
+                    player.remember(*memories[i])
+                    for chips in shard_chips[:, i]:
+                        chips_amount[i].append(player.get_chips_amount() + int(chips))
+                for i, player in enumerate(players):
+                    player.set_chips_amount(player.get_chips_amount() + int(final_chips[i]))
+
+            print(end - 1, 'hands simulated.')
+            start = end
+    finally:
+        # wait for agents still training (even if a replica failed)
+        if background_training:
+            trainer.close()
 
     print('Simulation complete.\n')
     return chips_amount
@@ -1,7 +1,6 @@
 
-from random import shuffle
-
-from .card import Card
+from . import events
+from .evaluator.deck import Shoe
 from .evaluator.evaluator import Evaluator
 from .player import Player
 from .tablestate import TableState
@@ -32,12 +31,26 @@ class Table(object):
         big blind to pay
     max_buy_in : int
         maxium amount of chips allowed for buy in
+    shoe : Shoe
+        block of pre-shuffled decks from which each hand is dealt
+    deck : list
+        deck of current hand (in bitwise evaluation format)
+    deck_position : int
+        index of the next card to deal from deck
+    state : TableState
+        state of current hand (reset before each hand)
+    sinks : list
+        event sinks attached to table (receive events of every hand)
+    narrator : NarratorSink
+        sink narrating hands to standard output (receives events of narrated hands)
+    hand_sinks : list
+        sinks receiving events of current hand (no events are generated if empty)
     """
 
-    def __init__(self, small_bind, big_blind, max_buy_in):
+    def __init__(self, small_bind, big_blind, max_buy_in, seed=None):
         """ 
         Constructor for all the necessary attributes of the Table object.
-        Takes in and sets blinds and max buy in.
+        Takes in and sets blinds and max buy in (seed makes the dealt cards reproducible).
         """
 
         self.players = []
@@ -48,29 +61,47 @@ class Table(object):
         self.small_bind = small_bind
         self.big_blind = big_blind
         self.max_buy_in = max_buy_in
+        self.shoe = Shoe(seed=seed)
+        self.deck = None
+        self.deck_position = 0
+        self.state = TableState(self.active_players)
+        self.sinks = []
+        self.narrator = events.NarratorSink(self)
+        self.hand_sinks = []
 
     def generate_deck(self):
-        ''' Generate the deck of 52 cards.  '''
+        ''' Takes the next shuffled deck of 52 cards (in bitwise evaluation format) from the shoe.  '''
+        self.deck = self.shoe.next_deck()
+        self.deck_position = 0
+
+    def add_sink(self, sink):
+        ''' Attaches an event sink to table (receives events of every hand played). '''
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        ''' Detaches an event sink from table. '''
+        self.sinks.remove(sink)
+
+    def emit(self, kind, seat=-1, amount=0, cards=()):
+        ''' Sends an event of current hand to every sink (callers check hand_sinks first). '''
+        for sink in self.hand_sinks:
+            sink.handle(kind, seat, amount, cards)
 
-        # get every combination of suit and value
-        self.deck = []
-        for s in ['c', 'd', 'h', 's']:
-            for i in range(2, 15):
-                self.deck.append(Card(i, s))
-        shuffle(self.deck)
+    def take_cards(self, n):
+        ''' Returns the next n cards of the deck. '''
+        cards = self.deck[self.deck_position:self.deck_position + n]
+        self.deck_position += n
+        return cards
 
     def deal_private_cards(self):
         """ Deals players private cards at the start of each hand. """
 
         # deal cards until every player at table has 2
-        for player in self.active_players:
-            player.take_hole_cards((self.deck[0], self.deck[1]))
-            if self.narrate_hands:
-                print(player.get_name(
-                ) + '(' + str(player.get_stack()) + ')', 'dealt', self.deck[0], 'and', self.deck[1])
-            self.deck = self.deck[2:]
-        if self.narrate_hands:
-            print()
+        for seat, player in enumerate(self.active_players):
+            cards = self.take_cards(2)
+            player.take_hole_cards(tuple(cards))
+            if self.hand_sinks:
+                self.emit(events.DEAL, seat, player.get_stack(), cards)
 
     def start_hand(self, narrate_hands=False):
         """ 
@@ -100,22 +131,18 @@ class Table(object):
             self.state.currently_active = self.dealer
 
         # enter small blind and big blind
-        self.state.current_bets[sb_position] += self.small_bind
+        self.state.add_bet(sb_position, self.small_bind)
         self.active_players[sb_position].remove_chips(self.small_bind)
-        if self.narrate_hands:
-            print(
-                self.active_players[sb_position].get_name(), 'posts small blind of', self.small_bind)
-        self.state.current_bets[bb_position] += self.big_blind
+        if self.hand_sinks:
+            self.emit(events.SMALL_BLIND, sb_position, self.small_bind)
+        self.state.add_bet(bb_position, self.big_blind)
         self.active_players[bb_position].remove_chips(self.big_blind)
-        if self.narrate_hands:
-            print(
-                self.active_players[bb_position].get_name(), 'posts big blind of', self.big_blind)
+        if self.hand_sinks:
+            self.emit(events.BIG_BLIND, bb_position, self.big_blind)
 
         self.start_betting(narrate_hands)
-
-        # new line for better output layout
-        if self.narrate_hands:
-            print()
+        if self.hand_sinks:
+            self.emit(events.ROUND_END)
 
     def add_player(self, player):
         """ Add Player (Agent or User) to table. """
@@ -134,7 +161,7 @@ class Table(object):
         """
 
         # if only one player still active (all others have folded)
-        if len(self.state.folded) + 1 == self.state.num_active_players:
+        if self.state.num_folded + 1 == self.state.num_active_players:
             # hand is over
             return
 
@@ -142,11 +169,10 @@ class Table(object):
         self.state.min_raise_amount = self.big_blind
 
         # deal community cards
-        self.state.cards += self.deck[:num_cards]
-        if self.narrate_hands:
-            # print to standard output for CLI play
-            print([str(c) for c in self.state.cards])
-        self.deck = self.deck[num_cards:]
+        cards = self.take_cards(num_cards)
+        self.state.cards += cards
+        if self.hand_sinks:
+            self.emit(events.BOARD, cards=cards)
 
         # first player to select action is player following dealer
         self.state.currently_active = (
@@ -154,90 +180,76 @@ class Table(object):
 
         # let betting begin
         self.start_betting(narrate_hands)
-        if self.narrate_hands:
-            # new line for better output layout
-            print()
+        if self.hand_sinks:
+            self.emit(events.ROUND_END)
 
     def pay_winners(self):
-        """ Assignes/Splits the pot to the winner(s). """
+        """ 
+        Assignes/Splits the pot to the winner(s).
 
-        # get hand evaluation of each player still in hand
-        board = [card.to_evaluation_int() for card in self.state.cards]
-        ranks = {}
-        for player in self.active_players:
-            if not board:
-                rank = -1
-            else:
-                rank = self.eval.evaluate(board, [player.show(
-                )[0].to_evaluation_int(), player.show()[1].to_evaluation_int()])
-            ranks[player] = rank
-
-        n = 0
-        # if there is more than one winner split pot
-        while sum(self.state.bets) > 0:
-
-            # get rank of best hand and bet of each player who is eligible to win sub pot
-            min_live_bet = None
-            min_rank = None
-            eligible_winners = []
-            for i in range(self.state.num_active_players):
-                # check hands of players only still active
-                if not i in self.state.folded and self.state.bets[i] != 0:
-                    # assign best hand and associated sub pots
-                    if min_live_bet == None:
-                        min_live_bet = self.state.bets[i]
-                    else:
-                        min_live_bet = min(min_live_bet, self.state.bets[i])
-                    player = self.active_players[i]
-                    eligible_winners.append(player)
-                    if min_rank == None:
-                        min_rank = ranks[player]
-                    else:
-                        min_rank = min(min_rank, ranks[player])
+        Only hands of players still in hand are evaluated (none if a single player is left),
+        and the main pot and side pots are built in one pass over contributions sorted by amount.
+        """
 
-            winners = [
-                player for player in eligible_winners if ranks[player] == min_rank]
-            sub_pot = 0
-            # subtract from main pot amount designated to smaller pots being divided
-            for i in range(self.state.num_active_players):
-                contribution = min(min_live_bet, self.state.bets[i])
-                self.state.bets[i] -= contribution
-                sub_pot += contribution
+        bets = self.state.bets
+        num_players = self.state.num_active_players
+        live = [i for i in range(num_players) if not self.state.is_folded(i)]
+
+        # get hand evaluation of each player still in hand (a single player left wins without showdown)
+        board = self.state.cards
+        ranks = [0] * num_players
+        if len(live) > 1:
+            for i in live:
+                ranks[i] = self.eval.evaluate(board, list(self.active_players[i].show()))
+
+        # contribution levels of players still in hand (each level closes a pot)
+        levels = sorted(set(bets[i] for i in live if bets[i] > 0))
+        live.sort(key=lambda i: bets[i])
+        contributions = sorted(bets)
+
+        # chips of all contributions up to previous level, number and chips of contributions below level
+        capped, below, below_chips, first_live = 0, 0, 0, 0
+        for n, level in enumerate(levels):
+            # chips of all contributions up to level (the last pot takes any chips left)
+            while below < num_players and contributions[below] <= level:
+                below_chips += contributions[below]
+                below += 1
+            level_capped = below_chips + level * (num_players - below)
+            if n == len(levels) - 1:
+                level_capped = sum(contributions)
+            sub_pot = level_capped - capped
+            capped = level_capped
+
+            # players still in hand eligible to win pot (contributed at least level)
+            while bets[live[first_live]] < level:
+                first_live += 1
+            eligible = live[first_live:]
+            min_rank = min(ranks[i] for i in eligible)
+            winners = sorted(i for i in eligible if ranks[i] == min_rank)
 
             # divide pot amongst winners
-            winnings = int(float(sub_pot) / len(winners))
-            for winner in winners:
-                winner.add_chips(winnings)
+            winnings = sub_pot // len(winners)
+            for i in winners:
+                self.active_players[i].add_chips(winnings)
                 sub_pot -= winnings
-                if self.narrate_hands:
-                    # if only one winner
-                    if min_rank == -1:
-                        print(winner.get_name(), 'wins', winnings)
-                    # when more than one winner
+                if self.hand_sinks:
+                    # if no community cards were dealt
+                    if not board:
+                        self.emit(events.WIN, i, winnings)
+                    # winnings of main pot or of side pots
+                    elif n == 0:
+                        self.emit(events.MAIN_POT, i, winnings)
                     else:
-                        # winnings are split
-                        if n == 0:
-                            print(winner.get_name(),
-                                  'wins', winnings, 'from main pot')
-                        if n > 0:
-                            print(winner.get_name(), 'wins',
-                                  winnings, 'from side pot')
-
-            # if pot is odd value
+                        self.emit(events.SIDE_POT, i, winnings)
+
+            # if pot is odd value first winning player after dealer gets the extra chips (usually 1)
             if sub_pot > 0:
-                # first winning player gets the extra chips (usually 1)
-                current_active_player = (self.dealer + 1) % self.state.num_active_players
-                while sub_pot > 0:
-                    player = self.active_players[current_active_player]
-                    if player in winners:
-                        player.add_chips(sub_pot)
-                        if self.narrate_hands:
-                            print(
-                                player.get_name(), 'wins', sub_pot, 'odd chips')
-                        sub_pot = 0
-                    current_active_player = (current_active_player + 1) % self.state.num_active_players
-
-            n += 1
+                i = (self.dealer + 1) % num_players
+                while i not in winners:
+                    i = (i + 1) % num_players
+                self.active_players[i].add_chips(sub_pot)
+                if self.hand_sinks:
+                    self.emit(events.ODD_CHIPS, i, sub_pot)
 
     def start_betting(self, narrate_hands=False):
         """ 
@@ -258,27 +270,22 @@ class Table(object):
             if current_active_player == last_to_play and betting_round > 1:
                 break
 
-            # stop betting if last player to call has been reached
-            not_allin_or_fold = []
-            for i in range(self.state.num_active_players):
-                if i not in self.state.folded and i not in self.state.all_in:
-                    not_allin_or_fold.append(
-                        i)
             # stop betting if all players have folded or are all-in
-            if len(not_allin_or_fold) == 0:
+            num_can_act = self.state.num_can_act()
+            if num_can_act == 0:
                 break
-            if len(not_allin_or_fold) == 1 and self.state.current_bets[not_allin_or_fold[0]] == max(self.state.current_bets):
+            # stop betting if last player to call has been reached
+            if num_can_act == 1 and self.state.current_bets[self.state.last_can_act()] == self.state.max_bet:
                 break
 
             # skip player if player folded or player is all-in already
-            if current_active_player in self.state.folded or current_active_player in self.state.all_in:
+            if not self.state.can_act(current_active_player):
                 self.state.currently_active = (
                     current_active_player + 1) % self.state.num_active_players
                 continue
 
             # caluclate amount player must call to continue hand
-            self.state.to_call = max(
-                self.state.current_bets) - self.state.current_bets[current_active_player]
+            self.state.to_call = self.state.max_bet - self.state.current_bets[current_active_player]
 
             # player takes action
             action = self.active_players[current_active_player].perform_action(
@@ -294,30 +301,21 @@ class Table(object):
                 current_active_player + 1) % self.state.num_active_players  
 
         # assign unmatched chips raise to owner 
-        unique_bets = sorted(set(self.state.current_bets))
-        max_bet = unique_bets[-1]
-        if len(unique_bets) >= 2:
-            below_max = unique_bets[-2]
-        if len([bet for bet in self.state.current_bets if bet == max_bet]) == 1:
-            for i in range(self.state.num_active_players):
-                if self.state.current_bets[i] == max_bet:
-                    self.state.current_bets[i] = below_max
-                    player = self.active_players[i]
-                    player.add_chips(max_bet - below_max)
-                    if self.narrate_hands:
-                        print(
-                            max_bet - below_max, 'uncalled chips return to', player.get_name())
+        max_bet = self.state.max_bet
+        owners = [i for i in range(self.state.num_active_players) if self.state.current_bets[i] == max_bet]
+        if len(owners) == 1:
+            below_max = max(bet for bet in self.state.current_bets if bet != max_bet)
+            self.state.return_bet(owners[0], max_bet - below_max)
+            player = self.active_players[owners[0]]
+            player.add_chips(max_bet - below_max)
+            if self.hand_sinks:
+                self.emit(events.RETURN, owners[0], max_bet - below_max)
 
         # no players to perform actions left
         self.state.currently_active = None 
 
-        for i in range(len(self.state.current_bets)):
-            # add bets of current round to record of bets
-            self.state.bets[i] += self.state.current_bets[i]
-            # initialise current bet to 0 for next round of betting
-            self.state.current_bets[i] = 0
-            # initialise raises to 0 for next round of betting
-            self.state.num_raises[i] = 0
+        # add bets of current round to record of bets and initialise bets and raises for next round of betting
+        self.state.end_round()
 
     def handle_action(self, action):
         """
@@ -332,7 +330,7 @@ class Table(object):
         player = self.active_players[actor]
 
         # maximum bet placed in current betting round
-        maximum = max(self.state.current_bets)
+        maximum = self.state.max_bet
 
         # latest bet amount places by current active player
         current_bet = self.state.current_bets[actor]
@@ -342,32 +340,30 @@ class Table(object):
             if current_bet < maximum:
                 raise Exception(
                     'Player must call to remain in active in current hand.')
-            if self.narrate_hands:
-                print(player.get_name(), 'checks.')
+            if self.hand_sinks:
+                self.emit(events.CHECK, actor)
 
         # player fold (player exits hand)
         elif action[0] == 'fold':
-            self.state.folded.append(actor)
-            if self.narrate_hands:
-                print(player.get_name(), 'folds.')
+            self.state.fold(actor)
+            if self.hand_sinks:
+                self.emit(events.FOLD, actor)
 
         # player call (player matches largest amount bet)
         elif action[0] == 'call':
             to_call = self.state.to_call
             stack = player.get_stack()
             if stack <= to_call: 
-                self.state.current_bets[actor] += stack
+                self.state.add_bet(actor, stack)
                 player.remove_chips(stack)
-                if self.narrate_hands:
-                    print(
-                        player.get_name(), 'all-in calls with', stack)
-                self.state.all_in.append(actor)
+                if self.hand_sinks:
+                    self.emit(events.ALL_IN_CALL, actor, stack)
+                self.state.go_all_in(actor)
             else:
-                self.state.current_bets[actor] = maximum
+                self.state.add_bet(actor, maximum - current_bet)
                 player.remove_chips(maximum - current_bet)
-                if self.narrate_hands:
-                    print(
-                        player.get_name(), 'calls', maximum - current_bet)
+                if self.hand_sinks:
+                    self.emit(events.CALL, actor, maximum - current_bet)
 
         # player raises or bets (player increases largest amount bet)
         elif action[0] == 'raise' or action[0] == 'bet':
@@ -378,22 +374,17 @@ class Table(object):
                     'Raise amount is less than minimum raise.')
             # get minimum amount raise must be
             self.state.min_raise_amount = raise_to + raise_by
-            self.state.current_bets[actor] = raise_to
             # remove amount bet from player stack and add to pot
             player.remove_chips(raise_to - current_bet)
+            self.state.add_bet(actor, raise_to - current_bet)
             self.state.num_raises[actor] += 1
 
             # check if player is all-in
             all_in = player.get_stack() == 0
             if all_in:
-                self.state.all_in.append(actor)
-            if self.narrate_hands:
-                if not all_in:
-                    print(
-                        player.get_name(), 'raises', raise_by, 'to', raise_to)
-                else:
-                    print(player.get_name(), 'raises all-in',
-                          raise_by, 'to', raise_to)
+                self.state.go_all_in(actor)
+            if self.hand_sinks:
+                self.emit(events.ALL_IN_RAISE if all_in else events.RAISE, actor, raise_to)
 
         else:
             raise Exception('Invalid player action.')
@@ -402,11 +393,13 @@ class Table(object):
         """ 
         Simulates/plays hand between players that are part of table.
 
-        Narrates the hand and actions according to narrate_hands value.
+        Narrates the hand and actions according to narrate_hands value
+        (events of the hand are sent to the attached sinks).
         """
 
         # set if hand should be narrated
         self.narrate_hands = narrate_hands
+        self.hand_sinks = self.sinks + [self.narrator] if narrate_hands else self.sinks
 
         # check players that have enough chips to take part in hand
         # (checks eliminated players in case any player has bought in again)
@@ -425,9 +418,11 @@ class Table(object):
             return False
 
         # reset table game state before hand
-        self.state = TableState(self.active_players)
+        self.state.reset(self.active_players)
 
         # simulate hand after all necessary prep
+        if self.hand_sinks:
+            self.emit(events.HAND_START, self.dealer, self.state.num_active_players)
         self.generate_deck()
         self.deal_private_cards()
         self.start_hand(narrate_hands)
@@ -438,6 +433,8 @@ class Table(object):
         # deal river
         self.deal_community_cards(1, narrate_hands)
         self.pay_winners()
+        if self.hand_sinks:
+            self.emit(events.HAND_END)
 
         # discard older (not as effective) strategies for each agent 
         for player in self.active_players:
@@ -461,9 +458,6 @@ class Table(object):
         while self.active_players[self.dealer] != dealer:
             self.dealer = (self.dealer + 1) % self.state.num_active_players
 
-        # print new line for better output formatting
-        if narrate_hands:
-            print()
         return True
 
     # Getters
@@ -1,8 +1,10 @@
-
 class TableState(object):
     """
     A class to represent a the current state of the Poker Game Table.
 
+    A single TableState is reused by a Table for every hand (see reset), with bet lists
+    allocated once and folded/all-in players kept as bitmasks, so that each action only
+    costs O(1) updates (the maximum bet and the pot are kept up to date as bets are made).
     ...
 
     Attributes
@@ -16,41 +18,122 @@ class TableState(object):
     bets : list
         total amount of chips entered by each player in current hand (excluded current betting round)
     current_bets : list
-        total amount of chips entered by each player in current betting round 
-    folded : list
-        indexes of players which have folded current hand
+        total amount of chips entered by each player in current betting round
+    folded : int
+        bitmask of indexes of players which have folded current hand (bit i set if player i folded)
     cards : list
-       community cards dealt 
-    all_in : list
-       indexes of players which are all-in in current hand
+       community cards dealt
+    all_in : int
+       bitmask of indexes of players which are all-in in current hand
     currently_active: int
         index of player performing next move
     num_raises : list
         total number of raises performed by each player
+    max_bet : int
+        largest amount of chips entered by a player in current betting round
+    pot : int
+        total amount of chips entered by all players in current hand
+    num_folded : int
+        number of players which have folded current hand
+    num_all_in : int
+        number of players which are all-in in current hand
     """
 
+    __slots__ = ('num_active_players', 'to_call', 'min_raise_amount', 'bets', 'current_bets', 'folded', 'cards',
+                 'all_in', 'currently_active', 'num_raises', 'max_bet', 'pot', 'num_folded', 'num_all_in')
+
     def __init__(self, players):
+        ''' Allocates bet lists and initialises state for a hand between the entered players. '''
+        self.bets = []
+        self.current_bets = []
+        self.num_raises = []
+        self.reset(players)
+
+    def reset(self, players):
+        ''' Initialises state before a hand between the entered players (bet lists are reused). '''
 
         # get number of players still in hand
         self.num_active_players = len(players)
 
-        # initialise each player contribution to hand to 0
-        self.bets = [0 for p in players]
-
-        # initialise each player contribution to current betting round to 0
-        self.current_bets = [0 for p in players]
-
-        # initialise each player to have raised by 0 when hand starts
-        self.num_raises = [0 for p in players]
+        # initialise each player contribution to hand, to current betting round
+        # and number of raises to 0 (lists are only allocated when the number of players changes)
+        if len(self.bets) != self.num_active_players:
+            self.bets = [0] * self.num_active_players
+            self.current_bets = [0] * self.num_active_players
+            self.num_raises = [0] * self.num_active_players
+        else:
+            for i in range(self.num_active_players):
+                self.bets[i] = 0
+                self.current_bets[i] = 0
+                self.num_raises[i] = 0
 
         self.to_call = None
 
         self.min_raise_amount = None
 
-        self.folded = []
+        self.folded = 0
 
         self.cards = []
 
-        self.all_in = []
+        self.all_in = 0
 
         self.currently_active = None
+
+        self.max_bet = 0
+
+        self.pot = 0
+
+        self.num_folded = 0
+
+        self.num_all_in = 0
+
+    def add_bet(self, i, amount):
+        ''' Adds amount of chips to the bet of player i in current betting round. '''
+        self.current_bets[i] += amount
+        self.pot += amount
+        if self.current_bets[i] > self.max_bet:
+            self.max_bet = self.current_bets[i]
+
+    def return_bet(self, i, amount):
+        ''' Returns amount of chips (uncalled raise) from the bet of player i in current betting round. '''
+        self.current_bets[i] -= amount
+        self.pot -= amount
+        self.max_bet = max(self.current_bets)
+
+    def end_round(self):
+        ''' Adds bets of current betting round to record of bets and initialises next betting round. '''
+        for i in range(self.num_active_players):
+            self.bets[i] += self.current_bets[i]
+            self.current_bets[i] = 0
+            self.num_raises[i] = 0
+        self.max_bet = 0
+
+    def fold(self, i):
+        ''' Records that player i folded current hand. '''
+        self.folded |= 1 << i
+        self.num_folded += 1
+
+    def go_all_in(self, i):
+        ''' Records that player i is all-in in current hand. '''
+        self.all_in |= 1 << i
+        self.num_all_in += 1
+
+    def is_folded(self, i):
+        ''' Returns True if player i folded current hand. '''
+        return (self.folded >> i) & 1 == 1
+
+    def is_all_in(self, i):
+        ''' Returns True if player i is all-in in current hand. '''
+        return (self.all_in >> i) & 1 == 1
+
+    def can_act(self, i):
+        ''' Returns True if player i has neither folded nor is all-in. '''
+        return ((self.folded | self.all_in) >> i) & 1 == 0
+
+    def num_can_act(self):
+        ''' Returns number of players which have neither folded nor are all-in. '''
+        return self.num_active_players - self.num_folded - self.num_all_in
+
+    def last_can_act(self):
+        ''' Returns index of the player with the highest index which has neither folded nor is all-in. '''
+        return (((1 << self.num_active_players) - 1) & ~(self.folded | self.all_in)).bit_length() - 1
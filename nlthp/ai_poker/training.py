@@ -0,0 +1,166 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FullTraining(object):
+    """
+    A class to represent the training of a Player refitting its regressor from scratch on
+    every feature/label of its memory each time the Player trains.
+    """
+
+    def rows(self, memory, regressor=None):
+        ''' Returns (features, labels, full) to train on: every row of memory (views when possible). '''
+        features, labels = memory.view()
+        return features, labels, True
+
+    def fit(self, regressor, features, labels, full):
+        ''' Fits regressor on features/labels. '''
+        regressor.fit(features, labels)
+
+
+class IncrementalTraining(object):
+    """
+    A class to represent the training of a Player updating its regressor with the
+    features/labels recorded since the previous training only.
+
+    Regressors with a partial_fit method (e.g. SGDRegressor or MLPRegressor) are updated
+    with it. Ensembles supporting warm_start (e.g. GradientBoostingRegressor or
+    RandomForestRegressor) are grown by extra_estimators estimators fitted on the newest
+    features/labels. Other regressors are refitted on the whole memory.
+
+    The regressor is refitted from scratch on the whole memory the first time, then after
+    every refit_every incremental updates, which also resets the size of warm started
+    ensembles (at most refit_every * extra_estimators estimators are added). With
+    refit_every None the regressor is never refitted and ensembles keep growing.
+    ...
+
+    Attributes
+    ----------
+    refit_every : int
+        number of incremental updates between two full refits (no full refits if None)
+    extra_estimators : int
+        number of estimators added to warm started ensembles at each update
+    updates : int
+        number of incremental updates since the last full refit
+    trained : int
+        number of labelled rows added to memory at the previous training
+    base_estimators : int
+        number of estimators of warm started ensembles when refitted from scratch
+    """
+
+    # parameters holding the number of estimators of ensembles supporting warm_start
+    estimator_params = ('n_estimators', 'max_iter')
+
+    def __init__(self, refit_every=10, extra_estimators=10):
+        self.refit_every = refit_every
+        self.extra_estimators = extra_estimators
+        self.updates = None
+        self.trained = 0
+        self.base_estimators = None
+
+    def estimator_param(self, regressor):
+        ''' Returns name of the parameter of the number of estimators of a warm startable regressor (None otherwise). '''
+        params = regressor.get_params() if hasattr(regressor, 'get_params') else {}
+        if 'warm_start' not in params:
+            return None
+        for name in IncrementalTraining.estimator_params:
+            if name in params:
+                return name
+        return None
+
+    def incremental(self, regressor):
+        ''' Returns True if regressor can be updated incrementally. '''
+        return hasattr(regressor, 'partial_fit') or self.estimator_param(regressor) is not None
+
+    def rows(self, memory, regressor=None):
+        """
+        Returns (features, labels, full) to train on: every row of memory for a full refit,
+        otherwise copies of the rows added since the previous training.
+        """
+
+        full = (self.updates is None or (self.refit_every is not None and self.updates >= self.refit_every)
+                or (regressor is not None and not self.incremental(regressor)))
+        new_rows = memory.total - self.trained
+        self.trained = memory.total
+
+        if full:
+            self.updates = 0
+            features, labels = memory.view()
+        else:
+            self.updates += 1
+            features, labels = memory.newest(new_rows)
+        return features, labels, full
+
+    def fit(self, regressor, features, labels, full):
+        ''' Refits regressor on features/labels (full) or updates it with them. '''
+        param = self.estimator_param(regressor)
+        if full:
+            # ensembles are refitted with their original number of estimators
+            if param is not None:
+                if self.base_estimators is None:
+                    self.base_estimators = regressor.get_params()[param]
+                regressor.set_params(warm_start=False, **{param: self.base_estimators})
+            regressor.fit(features, labels)
+        elif not len(labels):
+            return
+        elif hasattr(regressor, 'partial_fit'):
+            regressor.partial_fit(features, labels)
+        else:
+            regressor.set_params(warm_start=True, **{param: regressor.get_params()[param] + self.extra_estimators})
+            regressor.fit(features, labels)
+
+
+def fit_snapshot(training, regressor, features, labels, full):
+    ''' Trains a copy of a regressor (as returned by Player.training_snapshot) and returns it. '''
+    training.fit(regressor, features, labels, full)
+    return regressor
+
+
+class BackgroundTraining(object):
+    """
+    A class to represent the training of Players in a thread pool while they keep playing
+    hands with their previous regressor.
+
+    Each Player trains a copy of its regressor on a snapshot (copy) of its features/labels,
+    and the trained copy replaces the regressor of the Player when collected, between two
+    hands. A Player already training when asked to train again is skipped (its newest
+    features/labels are trained on next time).
+    ...
+
+    Attributes
+    ----------
+    executor : ThreadPoolExecutor
+        threads fitting the copies of the regressors
+    pending : dict
+        future of the trained regressor of each Player currently training
+    """
+
+    def __init__(self, workers=1):
+        self.executor = ThreadPoolExecutor(workers)
+        self.pending = {}
+
+    def train(self, player):
+        ''' Starts training player in background (returns False if player is already training or does not train). '''
+        if player in self.pending:
+            return False
+        snapshot = player.training_snapshot()
+        if snapshot is None:
+            return False
+        self.pending[player] = self.executor.submit(fit_snapshot, player.training, *snapshot)
+        return True
+
+    def collect(self, wait=False):
+        ''' Swaps trained regressors into their Players (waiting for every Player training if wait) and returns them. '''
+        trained = []
+        for player, future in list(self.pending.items()):
+            if wait or future.done():
+                del self.pending[player]
+                player.swap_regressor(future.result())
+                trained.append(player)
+        return trained
+
+    def close(self):
+        ''' Waits for every Player training, swaps their regressors and stops threads. '''
+        try:
+            self.collect(wait=True)
+        finally:
+            self.executor.shutdown()
@@ -0,0 +1,464 @@
+import numpy
+
+from .evaluator.deck import Shoe
+from .evaluator.evaluator import Evaluator
+from .features import NUM_ACTION_FEATURES, NUM_FEATURES, NUM_GAME_FEATURES, encode_actions, encode_cards
+from .ladder import bucket_positions, ladder_index
+
+# action codes of the vectorized engine
+FOLD = 0
+CHECK = 1
+CALL = 2
+RAISE = 3
+
+# column (among action features) of each action code
+ACTION_FEATURE_COLUMNS = numpy.array([1, 0, 2, 3])
+
+
+class VectorTable(object):
+    """
+    A class to represent many independent Poker Game Tables played in lockstep.
+
+    Follows the rules of Table (blinds, betting rounds, uncalled bets, side pots and odd
+    chips) but keeps the state of every table in NumPy arrays (one row per table, one
+    column per seat), so each step of a hand is played on every table at once. Players
+    are represented by policies deciding the actions of a seat on many tables at once.
+
+    A policy is an object with a method act(table, tables, seat) returning an array of
+    action codes (FOLD, CHECK, CALL or RAISE) and an array of raise amounts (new total bet
+    of the seat, ignored for other actions) for the entered tables (indexes of rows).
+    ...
+
+    Attributes
+    ----------
+    num_tables : int
+        number of tables played in lockstep
+    num_players : int
+        number of seats at each table
+    small_blind : int
+        small blind to pay
+    big_blind : int
+        big blind to pay
+    max_buy_in : int
+        maxium amount of chips allowed for buy in
+    stacks : ndarray
+        stack of each seat of each table
+    dealer : ndarray
+        seat of dealer chip of each table
+    shoe : Shoe
+        block of pre-shuffled decks from which hands are dealt
+    eval : Evaluator
+        hand evaluator (showdowns of every table are evaluated in one batch)
+    in_hand : ndarray
+        seats taking part in current hand (stack of at least the big blind)
+    holes : ndarray
+        hole cards of each seat (in bitwise evaluation format)
+    board : ndarray
+        community cards of each table (the first num_board are dealt)
+    num_board : int
+        number of community cards dealt
+    bets : ndarray
+        total amount of chips entered by each seat in current hand (excluded current betting round)
+    current_bets : ndarray
+        total amount of chips entered by each seat in current betting round
+    folded : ndarray
+        seats which have folded current hand (or do not take part in it)
+    all_in : ndarray
+        seats which are all-in in current hand
+    min_raise_amount : ndarray
+        minimum raise amount of each table
+    currently_active : ndarray
+        seat performing next move at each table
+    """
+
+    def __init__(self, num_tables, num_players, small_blind, big_blind, max_buy_in, seed=None):
+        """
+        Constructor for all the necessary attributes of the VectorTable object.
+        Every seat starts with max_buy_in chips (seed makes the dealt cards reproducible).
+        """
+
+        self.num_tables = num_tables
+        self.num_players = num_players
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.max_buy_in = max_buy_in
+        self.stacks = numpy.full((num_tables, num_players), max_buy_in, dtype=numpy.int64)
+        self.dealer = numpy.zeros(num_tables, dtype=numpy.int64)
+        self.shoe = Shoe(num_decks=max(num_tables, 1024), seed=seed)
+        self.eval = Evaluator()
+
+    def buy_in(self):
+        ''' Resets stack of every seat to the maximum buy in. '''
+        self.stacks[:] = self.max_buy_in
+
+    def next_seat(self, tables, seats, mask=None):
+        ''' Returns next seat taking part in the hand after each of the entered seats (of the entered tables). '''
+        mask = self.in_hand[tables] if mask is None else mask
+        order = (seats[:, None] + numpy.arange(1, self.num_players + 1)) % self.num_players
+        rows = numpy.arange(len(tables))[:, None]
+        return order[rows[:, 0], numpy.argmax(mask[rows, order], axis=1)]
+
+    def game_features(self, tables, seats):
+        """
+        Returns (tables, 43) array of game features of the entered seats, encoded as in
+        Player.gen_game_features (see features.GAME_FEATURES).
+        """
+
+        features = numpy.zeros((len(tables), NUM_GAME_FEATURES), dtype=numpy.float32)
+        encode_cards(features, self.holes[tables, seats], self.board[tables, :self.num_board])
+        features[:, NUM_GAME_FEATURES - 1] = self.stacks[tables, seats]
+        return features
+
+    def action_features(self, tables, actions, amounts):
+        ''' Returns (tables, 7) array of action features of the entered actions, encoded as in Player.gen_action_features. '''
+        features = numpy.zeros((len(tables), NUM_ACTION_FEATURES), dtype=numpy.float32)
+        pot = self.bets[tables].sum(axis=1) + self.current_bets[tables].sum(axis=1)
+        encode_actions(features, ACTION_FEATURE_COLUMNS[actions], amounts, self.current_bets[tables].max(axis=1), pot)
+        return features
+
+    def deal(self, tables):
+        ''' Deals hole cards and community cards of the entered tables from the shoe. '''
+        decks = self.shoe.next_decks(len(tables))
+
+        # hole cards are dealt to the seats in the hand in seat order, then the board
+        order = numpy.cumsum(self.in_hand[tables], axis=1) - 1
+        rows = numpy.arange(len(tables))[:, None]
+        self.holes[tables, :, 0] = decks[rows, 2 * order]
+        self.holes[tables, :, 1] = decks[rows, 2 * order + 1]
+        num_dealt = 2 * self.in_hand[tables].sum(axis=1)
+        self.board[tables] = decks[rows, num_dealt[:, None] + numpy.arange(5)]
+
+    def post_blinds(self, tables):
+        ''' Enters small blind and big blind and returns the seat of the first player to act on each table. '''
+        dealer = self.dealer[tables]
+        heads_up = self.in_hand[tables].sum(axis=1) == 2
+
+        sb_position = self.next_seat(tables, dealer)
+        bb_position = self.next_seat(tables, sb_position)
+        first = self.next_seat(tables, bb_position)
+
+        # if only 2 players take part in hand the dealer is small blind and first to play
+        sb_position = numpy.where(heads_up, dealer, sb_position)
+        bb_position = numpy.where(heads_up, self.next_seat(tables, dealer), bb_position)
+        first = numpy.where(heads_up, dealer, first)
+
+        self.current_bets[tables, sb_position] += self.small_blind
+        self.stacks[tables, sb_position] -= self.small_blind
+        self.current_bets[tables, bb_position] += self.big_blind
+        self.stacks[tables, bb_position] -= self.big_blind
+        return first
+
+    def start_betting(self, tables, first, policies, record):
+        """
+        Plays a round of betting on the entered tables until no further bets are allowed
+        (as Table.start_betting) and returns recorded decisions of the round.
+        """
+
+        self.currently_active[tables] = first
+        last_to_play = numpy.full(self.num_tables, -1, dtype=numpy.int64)
+        last_to_play[tables] = first
+        started = numpy.zeros(self.num_tables, dtype=bool)
+        decisions = []
+
+        betting = tables
+        while len(betting):
+            seats = self.currently_active[betting]
+            current_bets = self.current_bets[betting]
+            max_bets = current_bets.max(axis=1)
+
+            # stop betting if last player to bet has been reached
+            stop = (seats == last_to_play[betting]) & started[betting]
+
+            # stop betting if all players have folded or are all-in (or the only one left has called)
+            free = ~self.folded[betting] & ~self.all_in[betting]
+            num_free = free.sum(axis=1)
+            only = numpy.argmax(free, axis=1)
+            stop |= (num_free == 0) | ((num_free == 1) &
+                                       (current_bets[numpy.arange(len(betting)), only] == max_bets))
+
+            betting, seats, max_bets = betting[~stop], seats[~stop], max_bets[~stop]
+            started[betting] = True
+
+            # players who folded or are all-in already are skipped
+            acting = ~self.folded[betting, seats] & ~self.all_in[betting, seats]
+            tables_acting, seats_acting = betting[acting], seats[acting]
+            if len(tables_acting):
+                actions, amounts = self.decide(tables_acting, seats_acting, policies)
+                if record:
+                    decisions.append((tables_acting, seats_acting, self.stacks[tables_acting, seats_acting], numpy.concatenate(
+                        (self.game_features(tables_acting, seats_acting),
+                         self.action_features(tables_acting, actions, amounts)), axis=1)))
+                self.handle_actions(tables_acting, seats_acting, actions, amounts, max_bets[acting])
+
+                # if player raises the betting round ends when they are reached again (unless more raises occur)
+                raised = actions == RAISE
+                last_to_play[tables_acting[raised]] = seats_acting[raised]
+
+            # next player is next to take action
+            self.currently_active[betting] = self.next_seat(betting, seats)
+
+        self.end_betting(tables)
+        return decisions
+
+    def decide(self, tables, seats, policies):
+        ''' Returns actions and raise amounts of the players of the entered seats (each policy decides for its seat). '''
+        actions = numpy.zeros(len(tables), dtype=numpy.int64)
+        amounts = numpy.zeros(len(tables), dtype=numpy.int64)
+        for seat in numpy.unique(seats):
+            selected = seats == seat
+            seat_actions, seat_amounts = policies[seat].act(self, tables[selected], seat)
+            actions[selected] = seat_actions
+            amounts[selected] = seat_amounts
+        return actions, amounts
+
+    def handle_actions(self, tables, seats, actions, amounts, max_bets):
+        ''' Updates state of the entered tables with the action of each seat (as Table.handle_action). '''
+        current_bets = self.current_bets[tables, seats]
+        stacks = self.stacks[tables, seats]
+
+        if (actions < FOLD).any() or (actions > RAISE).any():
+            raise Exception('Invalid player action.')
+        if ((actions == CHECK) & (current_bets < max_bets)).any():
+            raise Exception('Player must call to remain in active in current hand.')
+
+        # player fold (player exits hand)
+        self.folded[tables[actions == FOLD], seats[actions == FOLD]] = True
+
+        # player call (player matches largest amount bet, or goes all-in with the whole stack)
+        call = actions == CALL
+        to_call = max_bets - current_bets
+        all_in_call = call & (stacks <= to_call)
+        paid = numpy.where(all_in_call, stacks, to_call)
+
+        # player raises (player increases largest amount bet)
+        raised = actions == RAISE
+        if (raised & (amounts < self.min_raise_amount[tables])).any():
+            raise Exception('Raise amount is less than minimum raise.')
+        if (raised & (amounts - current_bets > stacks)).any():
+            raise Exception('Requested chips is greater than stack size.')
+        paid = numpy.where(raised, amounts - current_bets, numpy.where(call, paid, 0))
+        self.min_raise_amount[tables[raised]] = 2 * amounts[raised] - max_bets[raised]
+
+        self.current_bets[tables, seats] = current_bets + paid
+        self.stacks[tables, seats] = stacks - paid
+        self.all_in[tables[all_in_call], seats[all_in_call]] = True
+        went_all_in = raised & (stacks - paid == 0)
+        self.all_in[tables[went_all_in], seats[went_all_in]] = True
+
+    def end_betting(self, tables):
+        ''' Returns unmatched raises to their owners and adds bets of current round to record of bets. '''
+        current_bets = self.current_bets[tables]
+        max_bets = current_bets.max(axis=1)
+        owner = numpy.argmax(current_bets, axis=1)
+        unmatched = (current_bets == max_bets[:, None]).sum(axis=1) == 1
+        below_max = numpy.where(current_bets < max_bets[:, None], current_bets, 0).max(axis=1)
+
+        returned = tables[unmatched]
+        self.stacks[returned, owner[unmatched]] += (max_bets - below_max)[unmatched]
+        self.current_bets[returned, owner[unmatched]] = below_max[unmatched]
+
+        self.bets[tables] += self.current_bets[tables]
+        self.current_bets[tables] = 0
+
+    def pay_winners(self, tables):
+        ''' Assignes/Splits the pots of the entered tables to the winner(s) (as Table.pay_winners). '''
+        num_tables = len(tables)
+        rows = numpy.arange(num_tables)
+        bets = self.bets[tables]
+        folded = self.folded[tables]
+
+        # rank of each player still in hand (every player ties if the board has not been dealt)
+        ranks = numpy.zeros((num_tables, self.num_players), dtype=numpy.int64)
+        if self.num_board:
+            live_tables, live_seats = numpy.nonzero(~folded)
+            ranks[live_tables, live_seats] = self.eval.evaluate_batch(
+                self.holes[tables[live_tables], live_seats], self.board[tables[live_tables], :self.num_board])
+        ranks[folded] = numpy.iinfo(numpy.int64).max
+
+        # side pots are layers between consecutive contributions of players still in hand
+        levels = numpy.sort(numpy.where(folded, 0, bets), axis=1)
+        winnings = numpy.zeros((num_tables, self.num_players), dtype=numpy.int64)
+        odd_chips_start = self.next_seat(tables, self.dealer[tables])
+        order = (odd_chips_start[:, None] + numpy.arange(self.num_players)) % self.num_players
+        previous = numpy.zeros(num_tables, dtype=numpy.int64)
+        for k in range(self.num_players):
+            level = levels[:, k]
+            sub_pot = (numpy.clip(bets, previous[:, None], level[:, None]) - previous[:, None]).sum(axis=1)
+
+            eligible = ~folded & (bets >= level[:, None]) & (level > previous)[:, None]
+            best = numpy.where(eligible, ranks, numpy.iinfo(numpy.int64).max).min(axis=1)
+            winners = eligible & (ranks == best[:, None])
+            num_winners = numpy.maximum(winners.sum(axis=1), 1)
+
+            # divide pot amongst winners, first winning player after dealer gets the odd chips
+            winnings += winners * (sub_pot // num_winners)[:, None]
+            first = order[rows, numpy.argmax(winners[rows[:, None], order], axis=1)]
+            winnings[rows, first] += numpy.where(winners.any(axis=1), sub_pot % num_winners, 0)
+            previous = level
+
+        self.stacks[tables] += winnings
+        self.bets[tables] = 0
+
+    def play_hands(self, policies, record=False):
+        """
+        Plays one hand on every table with at least 2 seats with a stack of at least the
+        big blind, then moves each dealer chip to the next seat able to play.
+
+        ...
+
+        Parameters
+        ----------
+        policies : list
+            policy deciding the actions of each seat
+        record : bool
+            if True decisions are recorded as training data
+
+        Returns
+        -------
+        ndarray or tuple
+            (tables, seats) array of chips won or lost in the hand, along with
+            (features, labels, tables, seats) of every decision if record is True
+            (features are encoded as in Player, labels are the change in stack
+            from the decision to the end of the hand)
+        """
+
+        start_stacks = self.stacks.copy()
+        self.in_hand = self.stacks >= self.big_blind
+        tables = numpy.nonzero(self.in_hand.sum(axis=1) >= 2)[0]
+
+        # reset table game state before hand
+        self.holes = numpy.zeros((self.num_tables, self.num_players, 2), dtype=numpy.int64)
+        self.board = numpy.zeros((self.num_tables, 5), dtype=numpy.int64)
+        self.num_board = 0
+        self.bets = numpy.zeros((self.num_tables, self.num_players), dtype=numpy.int64)
+        self.current_bets = numpy.zeros((self.num_tables, self.num_players), dtype=numpy.int64)
+        self.folded = ~self.in_hand
+        self.all_in = numpy.zeros((self.num_tables, self.num_players), dtype=bool)
+        self.min_raise_amount = numpy.zeros(self.num_tables, dtype=numpy.int64)
+        self.currently_active = numpy.zeros(self.num_tables, dtype=numpy.int64)
+
+        # dealer chip must be at a seat taking part in the hand
+        dealer = self.dealer[tables]
+        away = ~self.in_hand[tables, dealer]
+        self.dealer[tables[away]] = self.next_seat(tables[away], dealer[away])
+
+        self.deal(tables)
+        self.min_raise_amount[tables] = 2 * self.big_blind
+        first = self.post_blinds(tables)
+        decisions = self.start_betting(tables, first, policies, record)
+
+        # deal flop, turn and river while more than one player is still in hand
+        for num_cards in (3, 1, 1):
+            tables = tables[(~self.folded[tables]).sum(axis=1) > 1]
+            self.num_board += num_cards
+            self.min_raise_amount[tables] = self.big_blind
+            first = self.next_seat(tables, self.dealer[tables])
+            decisions += self.start_betting(tables, first, policies, record)
+
+        # pay winners of every table (hands still contested went to showdown on the river,
+        # other hands are won by the only player left whatever the board)
+        played = numpy.nonzero(self.in_hand.sum(axis=1) >= 2)[0]
+        contested = (~self.folded[played]).sum(axis=1) > 1
+        self.num_board = 0
+        self.pay_winners(played[~contested])
+        self.num_board = 5
+        self.pay_winners(played[contested])
+
+        # determine next dealer at each table (next seat with enough chips to play)
+        able = self.stacks[played] >= self.big_blind
+        self.dealer[played] = self.next_seat(played, self.dealer[played], able)
+
+        results = self.stacks - start_stacks
+        if not record:
+            return results
+
+        if not decisions:
+            return results, numpy.zeros((0, NUM_FEATURES), dtype=numpy.float32), numpy.zeros(0), \
+                numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64)
+        decision_tables = numpy.concatenate([decision[0] for decision in decisions])
+        decision_seats = numpy.concatenate([decision[1] for decision in decisions])
+        decision_stacks = numpy.concatenate([decision[2] for decision in decisions])
+        features = numpy.concatenate([decision[3] for decision in decisions])
+
+        # labels are computed from stacks (as Player.replay_memory) rather than from float32 stack features
+        labels = (self.stacks[decision_tables, decision_seats] - decision_stacks).astype(numpy.float64)
+        return results, features, labels, decision_tables, decision_seats
+
+
+class PlayerPolicy(object):
+    """
+    A class to represent a policy of a VectorTable seat that acts as a Player.
+
+    Candidate actions are those of Player.all_actions. Until the regressor of the Player
+    has been fit a random action is selected, then the action with the highest predicted
+    gain, with the candidate actions of every table predicted in one batch.
+    ...
+
+    Attributes
+    ----------
+    player : Player
+        player whose raise choices and regressor are used
+    ladder : ndarray
+        sorted raise choices of the player (fractions of stack)
+    rng : Generator
+        random generator of the random actions
+    """
+
+    def __init__(self, player, seed=None):
+        ''' Initialises policy of the entered Player. '''
+        self.player = player
+        self.ladder = player.ladder.fractions
+        self.rng = numpy.random.default_rng(seed)
+
+    def candidates(self, table, tables, seat):
+        """
+        Returns candidate actions of the seat on each of the entered tables as flat arrays
+        (index of table in tables, action code, raise amount) along with the number of
+        candidates of each table (raises first, then check or call and fold).
+        """
+
+        stacks = table.stacks[tables, seat]
+        current_bets = table.current_bets[tables]
+        to_call = current_bets.max(axis=1) - current_bets[:, seat]
+        min_raise_amount = table.min_raise_amount[tables]
+        max_bet = (stacks + current_bets[:, seat]) // 5
+
+        # raises are the raise choices within the minimum raise and maximum bet
+        short = to_call > stacks
+        can_raise = ~short & (max_bet >= min_raise_amount)
+        low = ladder_index(self.ladder, stacks, min_raise_amount)
+        high = ladder_index(self.ladder, stacks, max_bet + 1)
+        window = numpy.maximum(high - low, 0)
+        buckets = self.player.ladder.buckets
+        num_raises = numpy.where(can_raise, window if buckets is None else numpy.minimum(window, buckets), 0)
+        check = ~short & (to_call == 0)
+        counts = num_raises + numpy.where(check, 1, 2)
+
+        rows = numpy.repeat(numpy.arange(len(tables)), counts)
+        position = numpy.arange(len(rows)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        raised = position < num_raises[rows]
+        offset = position if buckets is None else bucket_positions(position, window[rows], buckets)
+        ladder_position = numpy.minimum(low[rows] + offset, len(self.ladder) - 1)
+        amounts = numpy.where(raised, (stacks[rows] * self.ladder[ladder_position]).astype(numpy.int64), 0)
+
+        other = position - num_raises[rows]
+        actions = numpy.where(raised, RAISE, numpy.where(check[rows], CHECK, numpy.where(other == 0, CALL, FOLD)))
+        return rows, actions, amounts, counts
+
+    def act(self, table, tables, seat):
+        ''' Returns actions and raise amounts of the seat on each of the entered tables. '''
+        rows, actions, amounts, counts = self.candidates(table, tables, seat)
+        starts = numpy.cumsum(counts) - counts
+
+        # select random action if agent has not been trained yet
+        if not self.player.fit:
+            selected = starts + (self.rng.random(len(tables)) * counts).astype(numpy.int64)
+            return actions[selected], amounts[selected]
+
+        # otherwise select action with the highest predicted gain (first one in case of a tie)
+        seats = numpy.full(len(tables), seat)
+        features = numpy.concatenate((table.game_features(tables, seats)[rows],
+                                      table.action_features(tables[rows], actions, amounts)), axis=1)
+        predicted_gain = numpy.asarray(self.player.regressor.predict(features))
+        selected = numpy.lexsort((-predicted_gain, rows))[starts]
+        return actions[selected], amounts[selected]
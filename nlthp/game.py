@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import os
+
 from sklearn.ensemble import GradientBoostingRegressor
 
 from ai_poker.player import Player
@@ -21,6 +23,9 @@ def main():
     # set number of agent players at table
     NUM_AGENT_PLAYERS = 5
 
+    # number of worker processes simulating training hands
+    WORKERS = os.cpu_count()
+
     # create GradientBoostingRegressor for machine learning model for each player
     regressor = GradientBoostingRegressor()
 
@@ -54,22 +59,22 @@ def main():
     # if difficulty "Beginner" train agents with 10000 simulated hands
     if ai_difficulty == 1:
         simulate(pokerTable, num_hands=10000,
-                 hands_before_training=2000, hands_between_training=1000, hands_between_buyin=10)
+                 hands_before_training=2000, hands_between_training=1000, hands_between_buyin=10, workers=WORKERS)
     # if difficulty "Intermediate" train agents with 50000 simulated hands
     elif ai_difficulty == 2:
         simulate(pokerTable, num_hands=50000,
-                 hands_before_training=2000, hands_between_training=1000, hands_between_buyin=10)
+                 hands_before_training=2000, hands_between_training=1000, hands_between_buyin=10, workers=WORKERS)
     # if difficulty "Expert" train agents with 100000 simulated hands
     elif ai_difficulty == 3:
         simulate(pokerTable, num_hands=100000,
-                 hands_before_training=2000, hands_between_training=1000, hands_between_buyin=10)
+                 hands_before_training=2000, hands_between_training=1000, hands_between_buyin=10, workers=WORKERS)
     # if difficulty "Ultimate Poker Pro" train agents with 250000 simulated hands
     elif ai_difficulty == 4:
         simulate(pokerTable, num_hands=250000, hands_before_training=2000,
-                 hands_between_training=1000, hands_between_buyin=10)
+                 hands_between_training=1000, hands_between_buyin=10, workers=WORKERS)
     else:
         simulate(pokerTable, num_hands=100000, hands_before_training=2000,
-                 hands_between_training=1000, hands_between_buyin=10)
+                 hands_between_training=1000, hands_between_buyin=10, workers=WORKERS)
 
     # narrate 10000 simulated training hands
     simulate(pokerTable, num_hands=10000,
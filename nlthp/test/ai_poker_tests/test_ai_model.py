@@ -85,6 +85,40 @@ class TestAIModel(unittest.TestCase):
     def test_ai_game_simulation(self):
         ''' Test that AI game simulation executes as expected'''
         self.assertNotEqual(simulate(self.table, num_hands=5, hands_before_training=5, hands_between_training=5, hands_between_buyin=5), None)
+
+    def test_parallel_game_simulation(self):
+        ''' Test that hands simulated on worker processes are merged into the players memory'''
+        players = self.table.get_players()
+        chips_amount = simulate(self.table, num_hands=40, hands_before_training=20, hands_between_training=20,
+                                hands_between_buyin=5, workers=2, seed=0)
+
+        # every hand is recorded and players learn from the decisions of both workers
+        self.assertEqual([len(chips) for chips in chips_amount], [40] * len(players))
+        for player in players:
+            self.assertTrue(player.fit)
+            self.assertEqual(len(player.get_features()), len(player.get_labels()))
+            self.assertTrue(player.get_features())
+
+    def test_parallel_chips_conserved(self):
+        ''' Test that no chips are created or lost when hands are simulated on worker processes'''
+        players = self.table.get_players()
+        total = sum(player.get_chips_amount() + player.get_stack() for player in players)
+        simulate(self.table, num_hands=60, hands_before_training=20, hands_between_training=20,
+                 hands_between_buyin=10, workers=3, seed=1)
+        self.assertEqual(sum(player.get_chips_amount() + player.get_stack() for player in players), total)
+
+    def test_background_game_simulation(self):
+        ''' Test that players trained in background end the simulation with their trained regressors'''
+        players = self.table.get_players()
+        regressors = [player.regressor for player in players]
+        chips_amount = simulate(self.table, num_hands=40, hands_before_training=20, hands_between_training=10,
+                                hands_between_buyin=5, background_training=True)
+
+        self.assertEqual([len(chips) for chips in chips_amount], [40] * len(players))
+        for player, regressor in zip(players, regressors):
+            self.assertTrue(player.fit)
+            self.assertIsNot(player.regressor, regressor)
+            self.assertTrue(hasattr(player.regressor, 'estimators_'))
     
 
 def main():
@@ -93,6 +127,11 @@ def main():
     test.test_table_creation()
     test.test_players_added()
     test.test_ai_game_simulation()
+    test.test_parallel_game_simulation()
+    test.setUp()
+    test.test_parallel_chips_conserved()
+    test.setUp()
+    test.test_background_game_simulation()
 
 if __name__ == "__main__":
     main()
@@ -4,6 +4,7 @@ import unittest
 import sys
 sys.path.append("..")                                   # allows imports from parent directories
 from ai_poker.card import Card
+from ai_poker.evaluator.card_service import CardService
 
 
 class TestCard(unittest.TestCase):
@@ -43,12 +44,36 @@ class TestCard(unittest.TestCase):
 
 		self.assertEqual(self.card._suit, 'c')
 
+	def test_evaluation_int(self):
+		''' Test that cards are converted to and from bitwise evaluations '''
+		for card in self.deck:
+			evaluation = card.to_evaluation_int()
+			self.assertEqual(evaluation, CardService.create_evaluation(str(card)))
+			self.assertEqual(str(Card.from_evaluation_int(evaluation)), str(card))
+
+
+	def test_interned_cards(self):
+		''' Test that cards are immutable singletons ordered by value '''
+		self.assertIs(Card(10, 'c'), self.card)
+		self.assertIs(Card('t', 'C'), self.card)
+		self.assertIs(Card.from_evaluation_int(self.card.to_evaluation_int()), self.card)
+		self.assertEqual(len(Card.deck), 52)
+
+		with self.assertRaises(Exception):
+			self.card._suit = 'd'
+
+		cards = sorted([Card('A', 's'), Card(2, 'h'), Card(10, 'd')])
+		self.assertEqual([card.get_card_num() for card in cards], [2, 10, 14])
+		self.assertEqual([card.get_suit_index() for card in cards], [3, 1, 2])
+
 
 def main():
 	test = TestCard()
 	test.setUp()
 	test.test_deck_of_cards()
 	test.test_card_num()
+	test.test_evaluation_int()
+	test.test_interned_cards()
 
 if __name__ == "__main__":
 	main()
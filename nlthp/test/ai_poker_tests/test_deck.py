@@ -6,7 +6,7 @@ import sys
 sys.path.append("..")											# allows imports from parent directories
 from ai_poker.player import Player
 from ai_poker.evaluator.evaluator import Evaluator
-from ai_poker.evaluator.deck import Deck 
+from ai_poker.evaluator.deck import Deck, Shoe
 
 
 class TestDeck(unittest.TestCase):
@@ -48,12 +48,44 @@ class TestDeck(unittest.TestCase):
 		cards = Deck.get_deck_of_cards()
 		self.assertEqual(len(cards), 52)
 
+	def test_take_card(self):
+		''' Test that cards are taken from the top of a Deck '''
+		deck = Deck()
+		cards = list(deck.cards)
+		self.assertEqual(deck.take_card(), cards[0])
+		self.assertEqual(deck.take_card(3), cards[1:4])
+		self.assertEqual(deck.take_card(48), cards[4:])
+
+		with self.assertRaises(Exception):
+			deck.take_card()
+
+		deck.shuffle()
+		self.assertEqual(len(deck.take_card(52)), 52)
+
+	def test_shoe(self):
+		''' Test that a Shoe deals shuffled decks reproducibly '''
+		shoe = Shoe(num_decks=8, seed=1)
+		decks = [shoe.next_deck() for i in range(20)]
+		for deck in decks:
+			self.assertEqual(sorted(deck), sorted(self.cards))
+		self.assertNotEqual(decks[0], decks[1])
+
+		other = Shoe(num_decks=8, seed=1)
+		self.assertEqual([other.next_deck() for i in range(20)], decks)
+
+		block = Shoe(num_decks=8, seed=1).next_decks(20)
+		self.assertEqual(block.shape, (20, 52))
+		self.assertEqual(block.tolist(), decks)
+
+
 def main():
 	test = TestDeck()
 	test.setUp()
 	test.test_shuffle()
 	test.test_pick()
 	test.test_get_complete_deck()
+	test.test_take_card()
+	test.test_shoe()
 
 
 if __name__ == "__main__":
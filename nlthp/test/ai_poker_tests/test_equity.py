@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+import unittest
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker.equity import canonical_key, enumerate_equity, estimate_equity, exact_cache
+from ai_poker.evaluator.card_service import CardService
+
+
+def cards(*names):
+	''' Returns bitwise evaluations of the entered cards '''
+	return [CardService.create_evaluation(name) for name in names]
+
+
+class TestEquity(unittest.TestCase):
+	''' Class for running unittests on functionalities of equity.py '''
+
+	def test_pair_of_aces(self):
+		''' Test that equity of a pair of aces against a random hand is close to 85% '''
+		equity, margin, samples = estimate_equity(cards('As', 'Ah'), n_opponents=1, n_samples=20000, seed=1)
+		self.assertEqual(samples, 20000)
+		self.assertAlmostEqual(equity, 0.852, delta=0.015)
+		self.assertLess(margin, 0.01)
+
+	def test_known_opponent(self):
+		''' Test equity against an opponent with known hole cards '''
+		equity, margin, samples = estimate_equity(cards('As', 'Ah'), n_opponents=0, opponents=[cards('Ks', 'Kh')],
+			n_samples=20000, seed=1)
+		self.assertAlmostEqual(equity, 0.82, delta=0.015)
+
+		# with a complete board the result is known
+		equity, margin, samples = estimate_equity(cards('As', 'Ah'), cards('Kd', 'Kc', '2s', '3h', '9d'), n_opponents=0,
+			opponents=[cards('Ks', 'Kh')], n_samples=20000, margin=0.01)
+		self.assertEqual(equity, 0.0)
+		self.assertLess(samples, 20000)
+
+	def test_split_pot(self):
+		''' Test that a board playing for every player splits the pot '''
+		equity, margin, samples = estimate_equity(cards('2s', '3h'), cards('Ad', 'Kd', 'Qd', 'Jd', 'Td'), n_opponents=2,
+			n_samples=1000)
+		self.assertAlmostEqual(equity, 1.0 / 3)
+
+	def test_early_stop(self):
+		''' Test that sampling stops once the confidence interval is reached '''
+		equity, margin, samples = estimate_equity(cards('7s', '2h'), n_opponents=2, n_samples=100000, margin=0.02, seed=2)
+		self.assertLessEqual(margin, 0.02)
+		self.assertLess(samples, 100000)
+
+	def test_workers(self):
+		''' Test that runouts can be sampled by worker processes '''
+		equity, margin, samples = estimate_equity(cards('As', 'Ah'), n_opponents=1, n_samples=20000, workers=2, seed=1)
+		self.assertEqual(samples, 20000)
+		self.assertAlmostEqual(equity, 0.852, delta=0.015)
+
+	def test_enumerate_equity(self):
+		''' Test exact equities of players all-in on the flop '''
+		equities = enumerate_equity([cards('As', 'Kh'), cards('Qs', 'Jh')], cards('2c', '7s', '9d'))
+
+		# 990 runouts of turn and river, AK wins 749 of them
+		self.assertAlmostEqual(equities[0][0], 749 / 990.0)
+		for win, tie, equity in equities:
+			self.assertEqual(tie, 0.0)
+			self.assertEqual(win, equity)
+		self.assertAlmostEqual(equities[0][2] + equities[1][2], 1.0)
+
+		# same results when enumerated by worker processes (isomorphic deal is cached)
+		exact_cache.clear()
+		self.assertEqual(enumerate_equity([cards('As', 'Kh'), cards('Qs', 'Jh')], cards('2c', '7s', '9d'), workers=2), equities)
+		self.assertEqual(enumerate_equity([cards('Ad', 'Kc'), cards('Qd', 'Jc')], cards('2h', '7d', '9s'), workers=2), equities)
+
+	def test_enumerate_split_pot(self):
+		''' Test that a board playing for every player is a tie '''
+		equities = enumerate_equity([cards('2s', '3h'), cards('2h', '3s')], cards('Ad', 'Kd', 'Qd', 'Jd', 'Td'))
+		self.assertEqual(equities, [(0.0, 1.0, 0.5), (0.0, 1.0, 0.5)])
+
+	def test_canonical_key(self):
+		''' Test that deals differing by a permutation of suits have the same key '''
+		key = canonical_key([cards('As', 'Kh'), cards('Qs', 'Jh')], cards('2c', '7s', '9d'), [])
+		self.assertEqual(canonical_key([cards('Kd', 'Ac'), cards('Qc', 'Jd')], cards('9h', '2s', '7c'), []), key)
+		self.assertNotEqual(canonical_key([cards('As', 'Ks'), cards('Qs', 'Jh')], cards('2c', '7s', '9d'), []), key)
+
+	def test_invalid_cards(self):
+		''' Test that cards cannot be entered twice '''
+		with self.assertRaises(Exception):
+			estimate_equity(cards('As', 'As'))
+
+	def test_invalid_samples(self):
+		''' Test that at least one runout must be sampled '''
+		for n_samples in (0, -1):
+			with self.assertRaises(Exception):
+				estimate_equity(cards('As', 'Ah'), n_samples=n_samples)
+
+	def test_too_many_opponents(self):
+		''' Test that random opponents and runouts must fit in the deck '''
+		with self.assertRaises(Exception):
+			estimate_equity(cards('As', 'Ah'), n_opponents=30)
+		with self.assertRaises(Exception):
+			estimate_equity(cards('As', 'Ah'), n_opponents=22, opponents=[cards('Kd', 'Kc')])
+
+		# every card left is dealt
+		equity, margin, samples = estimate_equity(cards('As', 'Ah'), n_opponents=22, n_samples=100, seed=1)
+		self.assertEqual(samples, 100)
+
+
+def main():
+	test = TestEquity()
+	test.test_pair_of_aces()
+	test.test_known_opponent()
+	test.test_split_pot()
+	test.test_early_stop()
+	test.test_workers()
+	test.test_enumerate_equity()
+	test.test_enumerate_split_pot()
+	test.test_canonical_key()
+	test.test_invalid_cards()
+	test.test_invalid_samples()
+	test.test_too_many_opponents()
+
+
+if __name__ == "__main__":
+	main()
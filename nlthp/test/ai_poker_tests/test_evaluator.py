@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 
+import itertools
+import random
 import unittest
+import numpy
 import sys
 sys.path.append("..")											# allows imports from parent directories
 from ai_poker.player import Player
 from ai_poker.evaluator.evaluator import Evaluator
 from ai_poker.evaluator.deck import Deck 
+from ai_poker.evaluator.card_service import CardService
 from sklearn.ensemble import GradientBoostingRegressor
 
 
@@ -73,11 +77,55 @@ class TestEvaluator(unittest.TestCase):
 		self.assertEqual(line_length, 10)
 		self.assertEqual(best_rank, curr_best_rank)
 
+	def test_direct_evaluation(self):
+		''' Test that 6 and 7 card hands match the best of their 5 card combinations '''
+		random.seed(7)
+		for i in range(2000):
+			cards = random.sample(self.cards, 7)
+			for num_cards in (6, 7):
+				hand = cards[:num_cards]
+				best = min(self.eval.evaluate_five_cards(combo) for combo in itertools.combinations(hand, 5))
+				self.assertEqual(self.eval.evaluate(hand[:2], hand[2:]), best)
+
+	def test_direct_evaluation_flushes(self):
+		''' Test that flushes are found by the direct evaluation '''
+		royal_flush = [CardService.create_evaluation(card) for card in ['As', 'Ks', 'Qs', 'Js', 'Ts', '2h', '2d']]
+		self.assertEqual(self.eval.evaluate(royal_flush[:2], royal_flush[2:]), 1)
+
+		# six spades with a pair on board (flush beats the pair)
+		flush = [CardService.create_evaluation(card) for card in ['As', '9s', '7s', '5s', '3s', '2s', '3h']]
+		self.assertEqual(self.eval.get_hand_rank(self.eval.evaluate(flush[:2], flush[2:])), 4)
+
+		# flush beats three of a kind
+		three_kind = [CardService.create_evaluation(card) for card in ['As', '9s', '7s', '5s', '3s', '3h', '3d']]
+		self.assertEqual(self.eval.get_hand_rank(self.eval.evaluate(three_kind[:2], three_kind[2:])), 4)
+
+		# four of a kind beats the straight
+		four_kind = [CardService.create_evaluation(card) for card in ['9s', '9h', '9d', '9c', 'Ts', 'Jh', 'Qd']]
+		self.assertEqual(self.eval.get_hand_rank(self.eval.evaluate(four_kind[:2], four_kind[2:])), 2)
+
+	def test_evaluate_batch(self):
+		''' Test that batch evaluation matches evaluating each hand '''
+		random.seed(11)
+		for num_board_cards in (3, 4, 5):
+			hands = [random.sample(self.cards, 2 + num_board_cards) for i in range(500)]
+			cards = numpy.array(hands)
+			ranks = self.eval.evaluate_batch(cards[:, :2], cards[:, 2:])
+			self.assertEqual(ranks.shape, (500,))
+			self.assertEqual(ranks.tolist(), [self.eval.evaluate(hand[:2], hand[2:]) for hand in hands])
+
+		# boards must have between 3 and 5 cards
+		with self.assertRaises(Exception):
+			self.eval.evaluate_batch(cards[:, :2], cards[:, 2:4])
+
 def main():
 	test = TestEvaluator()
 	test.setUp()
 	test.test_evaluate()
 	test.test_hand_summary()
+	test.test_direct_evaluation()
+	test.test_direct_evaluation_flushes()
+	test.test_evaluate_batch()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker import events
+from ai_poker.events import BinarySink, ListSink, read_events
+from ai_poker.player import Player
+from ai_poker.table import Table
+
+
+class StackSink(events.EventSink):
+	''' Sink recording stacks of the players of each hand at the end of the hand '''
+
+	def __init__(self, table):
+		self.table = table
+		self.stacks = []
+
+	def handle(self, kind, seat, amount, cards):
+		if kind == events.HAND_END:
+			self.stacks.append([player.get_stack() for player in self.table.get_active_players()])
+
+
+class TestEvents(unittest.TestCase):
+	''' Class for running unittests on functionalities of events.py '''
+
+	def setUp(self):
+		''' SetUp Table with Players taking random actions '''
+		random.seed(0)
+		self.table = Table(small_bind=10, big_blind=20, max_buy_in=200, seed=0)
+		self.players = [Player('Player ' + str(i), 10**4, 50, 10**3, raise_increase=0.7) for i in range(4)]
+		for player in self.players:
+			self.table.add_player(player)
+			player.buy_chips(200)
+
+	def play_hands(self, num_hands):
+		''' Plays hands (silencing output of players) '''
+		with contextlib.redirect_stdout(io.StringIO()):
+			for hand in range(num_hands):
+				if not self.table.play_hand():
+					break
+
+	def test_events_account_for_chips(self):
+		''' Test that stacks after each hand follow from the stacks dealt and the chips moved by events '''
+		sink = ListSink()
+		self.table.add_sink(sink)
+		stack_sink = StackSink(self.table)
+		self.table.add_sink(stack_sink)
+		self.play_hands(50)
+
+		hands, hand = [], None
+		for kind, seat, amount, cards in sink.events:
+			if kind == events.HAND_START:
+				hand = {'stacks': [0] * amount, 'bets': [0] * amount}
+			elif kind == events.DEAL:
+				self.assertEqual(len(cards), 2)
+				hand['stacks'][seat] = amount
+			elif kind in (events.SMALL_BLIND, events.BIG_BLIND, events.CALL, events.ALL_IN_CALL):
+				hand['stacks'][seat] -= amount
+				hand['bets'][seat] += amount
+			elif kind in (events.RAISE, events.ALL_IN_RAISE):
+				hand['stacks'][seat] -= amount - hand['bets'][seat]
+				hand['bets'][seat] = amount
+			elif kind == events.ROUND_END:
+				hand['bets'] = [0] * len(hand['bets'])
+			elif kind in (events.RETURN, events.WIN, events.MAIN_POT, events.SIDE_POT, events.ODD_CHIPS):
+				hand['stacks'][seat] += amount
+			elif kind == events.HAND_END:
+				hands.append(hand['stacks'])
+
+		self.assertEqual(hands, stack_sink.stacks)
+
+	def test_binary_sink(self):
+		''' Test that events written by BinarySink are read back as received '''
+		sink = ListSink()
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, 'events.bin')
+			binary_sink = BinarySink(path)
+			self.table.add_sink(sink)
+			self.table.add_sink(binary_sink)
+			self.play_hands(10)
+			binary_sink.close()
+			records = read_events(path)
+
+		self.assertEqual(len(records), len(sink.events))
+		for record, (kind, seat, amount, cards) in zip(records, sink.events):
+			self.assertEqual((record['kind'], record['seat'], record['amount']), (kind, seat, amount))
+			self.assertEqual([card for card in record['cards'] if card], list(cards))
+
+	def test_narrator_sink(self):
+		''' Test that narrated hands are printed and that no events are generated without sinks '''
+		output = io.StringIO()
+		with contextlib.redirect_stdout(output):
+			self.table.play_hand(narrate_hands=True)
+		self.assertIn('posts small blind of 10', output.getvalue())
+		self.assertIn('posts big blind of 20', output.getvalue())
+
+		self.play_hands(1)
+		self.assertEqual(self.table.hand_sinks, [])
+
+
+def main():
+	test = TestEvents()
+	test.setUp()
+	test.test_events_account_for_chips()
+	test.setUp()
+	test.test_binary_sink()
+	test.setUp()
+	test.test_narrator_sink()
+
+if __name__ == "__main__":
+	main()
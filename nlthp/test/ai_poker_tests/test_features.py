@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import unittest
+import numpy
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker.evaluator.card_service import CardService
+from ai_poker.features import FEATURES, NUM_FEATURES, NUM_GAME_FEATURES, FeatureEncoder, encode_cards
+
+
+def cards(text):
+	''' Returns cards in bitwise evaluation format of a string (e.g. "As Kd") '''
+	return [CardService.create_evaluation(card) for card in text.split()]
+
+
+class TestFeatures(unittest.TestCase):
+	''' Class for running unittests on functionalities of features.py '''
+
+	def setUp(self):
+		''' SetUp FeatureEncoder with game features of a decision on the turn '''
+		self.encoder = FeatureEncoder(capacity=2)
+		self.game = self.encoder.encode_game(cards('Kh 3c'), cards('9s 2d 9c Ah'), 500).copy()
+
+	def test_game_features(self):
+		''' Test that cards are sorted by number and encoded as number and suit '''
+		self.assertEqual(len(FEATURES), NUM_FEATURES)
+		self.assertEqual(list(self.game[:6]), [1, 3, 1, 0, 0, 0])
+		self.assertEqual(list(self.game[6:12]), [1, 13, 0, 0, 0, 1])
+		self.assertEqual(list(self.game[12:18]), [1, 2, 0, 1, 0, 0])
+		# cards with the same number keep the order they were dealt in
+		self.assertEqual(list(self.game[18:30]), [1, 9, 0, 0, 1, 0, 1, 9, 1, 0, 0, 0])
+		self.assertEqual(list(self.game[36:42]), [0] * 6)
+		self.assertEqual(self.game[42], 500)
+
+		# bulk encoding gives the same features
+		features = numpy.zeros((1, NUM_GAME_FEATURES))
+		encode_cards(features, numpy.array([cards('Kh 3c')]), numpy.array([cards('9s 2d 9c Ah') + [0]]))
+		self.assertTrue((features[0, :42] == self.game[:42]).all())
+
+	def test_design_matrix(self):
+		''' Test that each row of the design matrix is the row of the action encoded on its own '''
+		raise_amounts = numpy.array([100, 150, 300])
+		others = (('call',), ('fold',))
+		matrix = self.encoder.design_matrix(raise_amounts, others, 40, 120).copy()
+		self.assertEqual(matrix.shape, (5, NUM_FEATURES))
+		actions = [('raise', amount) for amount in raise_amounts] + list(others)
+		for row, action in zip(matrix, actions):
+			self.assertTrue((self.encoder.encode_action(action, 40, 120) == row).all())
+		self.assertEqual(list(matrix[1, NUM_GAME_FEATURES:]), list(numpy.float32([0, 0, 0, 1, 150, 110, 110 / 120])))
+
+
+def main():
+	test = TestFeatures()
+	test.setUp()
+	test.test_game_features()
+	test.setUp()
+	test.test_design_matrix()
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import random
+import unittest
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker.evaluator.evaluator import Evaluator
+from ai_poker.evaluator.deck import Deck 
+
+
+class TestHandState(unittest.TestCase):
+	''' Class for running unittests on functionalities of hand_state.py '''
+
+	def setUp(self):
+		''' SetUp Evaluator object '''
+		self.eval = Evaluator()
+		self.cards = Deck.get_deck_of_cards()
+
+	def test_street_by_street(self):
+		''' Test that the hand state evaluates every street like the Evaluator '''
+		random.seed(3)
+		for i in range(1000):
+			cards = random.sample(self.cards, 7)
+			hand = self.eval.start(cards[:2])
+			hand.extend(cards[2:5])
+			self.assertEqual(hand.rank(), self.eval.evaluate(cards[:2], cards[2:5]))
+			hand.add(cards[5])
+			self.assertEqual(hand.rank(), self.eval.evaluate(cards[:2], cards[2:6]))
+			hand.add(cards[6])
+			self.assertEqual(hand.rank(), self.eval.evaluate(cards[:2], cards[2:7]))
+
+	def test_copy(self):
+		''' Test that copies of a hand state do not share cards '''
+		cards = random.sample(self.cards, 7)
+		flop = self.eval.start(cards[:2]).extend(cards[2:5])
+		turn = flop.copy().add(cards[5])
+		self.assertEqual(len(flop), 5)
+		self.assertEqual(len(turn), 6)
+		self.assertEqual(flop.rank(), self.eval.evaluate(cards[:2], cards[2:5]))
+
+	def test_too_few_cards(self):
+		''' Test that hands with less than 5 cards cannot be evaluated '''
+		hand = self.eval.start(self.cards[:2])
+		with self.assertRaises(Exception):
+			hand.rank()
+
+
+def main():
+	test = TestHandState()
+	test.setUp()
+	test.test_street_by_street()
+	test.test_copy()
+	test.test_too_few_cards()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import numpy
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker import events
+from ai_poker.events import ListSink
+from ai_poker.history import HistorySink, HandHistory, publish_shard
+from ai_poker.player import Player
+from ai_poker.simulation import simulate
+from ai_poker.table import Table
+
+
+class TestHistory(unittest.TestCase):
+	''' Class for running unittests on functionalities of history.py '''
+
+	def setUp(self):
+		''' SetUp Table with Players taking random actions '''
+		random.seed(0)
+		self.table = Table(small_bind=10, big_blind=20, max_buy_in=200, seed=0)
+		self.players = [Player('Player ' + str(i), 10**4, 50, 10**3, raise_increase=0.7) for i in range(4)]
+		for player in self.players:
+			self.table.add_player(player)
+			player.buy_chips(200)
+
+	def play_hands(self, num_hands):
+		''' Plays hands (silencing output of players), players buy in again when a single one has chips left '''
+		with contextlib.redirect_stdout(io.StringIO()):
+			while num_hands > 0:
+				if self.table.play_hand():
+					num_hands -= 1
+				else:
+					for player in self.players:
+						player.cash_out()
+						player.buy_chips(200)
+
+	def test_history_columns(self):
+		''' Test that hands read back from a hand history match the events of the hands '''
+		path = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, path)
+		sink, history_sink = ListSink(), HistorySink(self.table, path, shard_size=7)
+		self.table.add_sink(sink)
+		self.table.add_sink(history_sink)
+		self.play_hands(20)
+		history_sink.close()
+
+		history = HandHistory(path)
+		self.assertEqual(history.num_hands, 20)
+		self.assertEqual(len(history.shards), 3)
+		self.assertIsInstance(history.shards[0]['stacks'], numpy.memmap)
+
+		stacks, holes, board, winnings = history.column('stacks'), history.column('holes'), history.column('board'), history.column('winnings')
+		offsets, kinds, amounts = history.column('action_offsets'), history.column('action_kind'), history.column('action_amount')
+		hand, actions = -1, []
+		for kind, seat, amount, cards in sink.events:
+			if kind == events.HAND_START:
+				hand += 1
+				self.assertEqual(history.column('num_players')[hand], amount)
+				num_cards, won = 0, numpy.zeros(len(winnings[hand]), dtype=numpy.int64)
+			elif kind == events.DEAL:
+				self.assertEqual(stacks[hand, seat], amount)
+				self.assertEqual(list(holes[hand, seat]), list(cards))
+			elif kind == events.BOARD:
+				self.assertEqual(list(board[hand, num_cards:num_cards + len(cards)]), list(cards))
+				num_cards += len(cards)
+			elif kind in (events.WIN, events.MAIN_POT, events.SIDE_POT, events.ODD_CHIPS):
+				won[seat] += amount
+			elif kind == events.HAND_END:
+				self.assertEqual(list(winnings[hand]), list(won))
+				self.assertEqual(offsets[hand + 1] - offsets[hand], len(actions))
+				self.assertEqual(list(kinds[offsets[hand]:offsets[hand + 1]]), [action[0] for action in actions])
+				self.assertEqual(list(amounts[offsets[hand]:offsets[hand + 1]]), [action[1] for action in actions])
+				actions = []
+			elif kind != events.ROUND_END:
+				actions.append((kind, amount))
+
+	def test_compressed_history(self):
+		''' Test that compressed shards are appended to and read back as uncompressed shards '''
+		path = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, path)
+		self.table.add_sink(HistorySink(self.table, path))
+		self.play_hands(10)
+		self.table.sinks[0].close()
+
+		self.setUp()
+		self.table.add_sink(HistorySink(self.table, path, compress=True))
+		self.play_hands(10)
+		self.table.sinks[0].close()
+
+		history = HandHistory(path)
+		self.assertEqual(len(history.shards), 2)
+		self.assertTrue(os.path.exists(os.path.join(path, 'shard_000001', 'columns.npz')))
+		for name in history.shards[0]:
+			self.assertEqual(history.shards[0][name].shape, history.shards[1][name].shape)
+			self.assertTrue((history.shards[0][name] == history.shards[1][name]).all())
+
+	def test_partial_shards(self):
+		''' Test that shards being written are not read and that published shards never overwrite others '''
+		path = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, path)
+		self.table.add_sink(HistorySink(self.table, path))
+		self.play_hands(10)
+		self.table.sinks[0].close()
+
+		# a shard still being written by another process
+		os.mkdir(os.path.join(path, '.writing_other'))
+		numpy.save(os.path.join(path, '.writing_other', 'stacks.npy'), numpy.zeros(3))
+		self.assertEqual(HandHistory(path).num_hands, 10)
+
+		# a shard published by another process after the free shard was found
+		os.rename(os.path.join(path, 'shard_000000'), os.path.join(path, 'shard_000001'))
+		written = os.path.join(path, '.writing_copy')
+		shutil.copytree(os.path.join(path, 'shard_000001'), written)
+		self.assertEqual(publish_shard(path, written), os.path.join(path, 'shard_000002'))
+		self.assertEqual(HandHistory(path).num_hands, 20)
+
+		# published shards are as readable as the hand history
+		os.chmod(path, 0o755)
+		self.table.add_sink(HistorySink(self.table, path))
+		self.play_hands(1)
+		self.table.sinks[-1].close()
+		self.assertEqual(os.stat(os.path.join(path, 'shard_000003')).st_mode & 0o777, 0o755)
+
+	def test_simulation_history(self):
+		''' Test that every hand simulated is appended to the hand history '''
+		path = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, path)
+		with contextlib.redirect_stdout(io.StringIO()):
+			simulate(self.table, 30, hands_between_buyin=10, history=path)
+		history = HandHistory(path)
+		self.assertEqual(history.num_hands, 30)
+		self.assertEqual(list(history.shards[0]['names']), [player.get_name() for player in self.players])
+
+
+def main():
+	test = TestHistory()
+	test.setUp()
+	test.test_history_columns()
+	test.doCleanups()
+	test.setUp()
+	test.test_compressed_history()
+	test.doCleanups()
+	test.setUp()
+	test.test_partial_shards()
+	test.doCleanups()
+	test.setUp()
+	test.test_simulation_history()
+	test.doCleanups()
+
+if __name__ == "__main__":
+	main()
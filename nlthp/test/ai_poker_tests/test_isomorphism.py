@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import itertools
+import random
+import unittest
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker.evaluator.card_service import CardService
+from ai_poker.evaluator.deck import Deck
+from ai_poker.evaluator.isomorphism import HandIndexer
+
+
+def permute_suits(cards, permutation):
+	''' Returns cards with suit bits replaced through the entered permutation '''
+	return [(card & ~0xF000) | (permutation[(card >> 12) & 0xF] << 12) for card in cards]
+
+
+class TestIsomorphism(unittest.TestCase):
+	''' Class for running unittests on functionalities of isomorphism.py '''
+
+	def test_indexer_sizes(self):
+		''' Test number of isomorphic classes of each street '''
+		self.assertEqual(HandIndexer((2,)).size, 169)
+		self.assertEqual(HandIndexer((2, 3)).size, 1286792)
+		self.assertEqual(HandIndexer((2, 4)).size, 13960050)
+		self.assertEqual(HandIndexer((2, 5)).size, 123156254)
+
+		# every combo of hole cards maps to one of 169 indexes
+		indexes = set(CardService.canonicalize(hole) for hole in itertools.combinations(Deck.get_deck_of_cards(), 2))
+		self.assertEqual(indexes, set(range(169)))
+
+	def test_canonicalize(self):
+		''' Test that isomorphic hands get the same index '''
+		deck = Deck.get_deck_of_cards()
+		rng = random.Random(0)
+		for num_board_cards in (0, 3, 4, 5):
+			for i in range(200):
+				cards = rng.sample(deck, 2 + num_board_cards)
+				permutation = dict(zip(HandIndexer.suits, rng.sample(HandIndexer.suits, 4)))
+				permuted = permute_suits(cards, permutation)
+				self.assertEqual(CardService.canonicalize(cards[:2], cards[2:]),
+								 CardService.canonicalize(permuted[1::-1], permuted[:1:-1]))
+
+		hole = [CardService.create_evaluation('As'), CardService.create_evaluation('Ks')]
+		other = [CardService.create_evaluation('Ah'), CardService.create_evaluation('Kd')]
+		self.assertNotEqual(CardService.canonicalize(hole), CardService.canonicalize(other))
+
+		with self.assertRaises(Exception):
+			CardService.canonicalize(hole, deck[:2])
+
+	def test_unindex(self):
+		''' Test that unindex returns a hand of the entered index '''
+		rng = random.Random(0)
+		for rounds in ((2,), (2, 3), (2, 4), (2, 5)):
+			indexer = HandIndexer(rounds)
+			for index in [0, indexer.size - 1] + [rng.randrange(indexer.size) for i in range(200)]:
+				self.assertEqual(indexer.index(indexer.unindex(index)), index)
+
+
+def main():
+	test = TestIsomorphism()
+	test.test_indexer_sizes()
+	test.test_canonicalize()
+	test.test_unindex()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import random
+import unittest
+import numpy
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker.ladder import RaiseLadder, ladder_index
+from ai_poker.player import Player
+from ai_poker.tablestate import TableState
+
+
+def scanned_raises(raise_choices, raise_increase, stack, min_raise_amount, max_bet):
+	''' Returns raise amounts found by scanning every raise choice (built by prepending each choice) '''
+	choices = [1]
+	for i in range(raise_choices - 1):
+		choices = [choices[0] * raise_increase] + choices
+	amounts = [int(stack * r) for r in choices]
+	return [amount for amount in amounts if amount >= min_raise_amount and amount <= max_bet]
+
+
+class TestLadder(unittest.TestCase):
+	''' Class for running unittests on functionalities of ladder.py '''
+
+	def test_raises_as_scanned(self):
+		''' Test that raises found by binary search are the raises found by scanning every raise choice '''
+		random.seed(0)
+		for raise_choices, raise_increase in ((1000, 0.99), (200, 0.7), (1, None)):
+			ladder = RaiseLadder(raise_choices, raise_increase)
+			for i in range(300):
+				stack = random.randint(1, 10**5)
+				min_raise_amount = random.randint(1, stack)
+				max_bet = random.randint(0, stack)
+				self.assertEqual(ladder.raises(stack, min_raise_amount, max_bet).tolist(),
+								 scanned_raises(raise_choices, raise_increase, stack, min_raise_amount, max_bet))
+
+				# vectorized search finds the same window
+				stacks = numpy.array([stack, stack])
+				index = ladder_index(ladder.fractions, stacks, numpy.array([min_raise_amount, max_bet + 1]))
+				self.assertEqual(index.tolist(), [ladder.index(stack, min_raise_amount), ladder.index(stack, max_bet + 1)])
+
+	def test_raise_buckets(self):
+		''' Test that raises are capped to buckets spread from the smallest to the largest valid raise '''
+		ladder = RaiseLadder(20000, 0.9995, buckets=10)
+		raises = ladder.raises(10000, 40, 2000).tolist()
+		valid = RaiseLadder(20000, 0.9995).raises(10000, 40, 2000).tolist()
+		self.assertEqual(len(raises), 10)
+		self.assertEqual((raises[0], raises[-1]), (valid[0], valid[-1]))
+		self.assertTrue(set(raises) <= set(valid))
+		self.assertEqual(raises, sorted(raises))
+
+		# players pick from bucketed raises
+		player = Player('Player', 10**5, 20000, 10, raise_increase=0.9995, raise_buckets=10)
+		player.buy_chips(10000)
+		state = TableState([player, player])
+		state.add_bet(0, 20)
+		state.currently_active, state.to_call, state.min_raise_amount = 1, 20, 40
+		self.assertEqual([action[1] for action in player.all_actions(state)[:-2]], ladder.raises(10000, 40, 2000).tolist())
+
+
+def main():
+	test = TestLadder()
+	test.test_raises_as_scanned()
+	test.test_raise_buckets()
+
+if __name__ == "__main__":
+	main()
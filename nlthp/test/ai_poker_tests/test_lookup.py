@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 
 from random import shuffle
+import itertools
+import os
+import tempfile
 import unittest
 import sys
 sys.path.append("..")											# allows imports from parent directories
@@ -99,12 +102,59 @@ class TestLookUp(unittest.TestCase):
 		self.assertEqual(rank, expectedFlushRank)
 		
 
+	def test_unsuited_index(self):
+		''' Test that every 5, 6 and 7 card rank combination has its own unsuited index ''' 
+		table = LookupTable()
+
+		indexes = set()
+		for num_cards in (5, 6, 7):
+			for rankings in itertools.combinations_with_replacement(CardService.card_rankings, num_cards):
+				if max(rankings.count(ranking) for ranking in rankings) <= 4:
+					indexes.add(table.unsuited_index(rankings))
+
+		self.assertEqual(indexes, set(range(len(table.lookup_unsuited))))
+		self.assertEqual(len(table.lookup_unsuited), 73775)
+
+		# every index has been given a hand ranking
+		self.assertEqual(min(table.lookup_unsuited), 11)
+		self.assertEqual(max(table.lookup_unsuited), LookupTable.possible_high_card)
+
+	def test_cache_file(self):
+		''' Test that LookupTable is saved to and loaded back from the cache file ''' 
+		table = LookupTable()
+
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, 'lookup_table.bin')
+			table.save(path)
+			loaded = LookupTable.read(path)
+
+			self.assertEqual(loaded.lookup_flush.tolist(), table.lookup_flush.tolist())
+			self.assertEqual(loaded.lookup_unsuited.tolist(), table.lookup_unsuited.tolist())
+			for loaded_array, array in zip(loaded.get_arrays(), table.get_arrays()):
+				self.assertEqual(loaded_array.tolist(), array.tolist())
+
+			# tables are only loaded once per process
+			self.assertIs(LookupTable.load(path), LookupTable.load(path))
+			del LookupTable.loaded[path]
+			del loaded
+
+	def test_cache_file_version(self):
+		''' Test that cache files written by another version are not read ''' 
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, 'lookup_table.bin')
+			with open(path, 'wb') as f:
+				f.write(LookupTable.cache_header.pack(LookupTable.cache_magic, LookupTable.cache_version + 1, 0, 0, 0, 0))
+			self.assertEqual(LookupTable.read(path), None)
+
 def main():
 	test = TestLookUp()
 	test.setUp()
 	test.test_rank_strings()
 	test.test_hand_rank()
 	test.test_flushes_lookup()
+	test.test_unsuited_index()
+	test.test_cache_file()
+	test.test_cache_file_version()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import random
+import unittest
+import numpy
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker.memory import ReplayMemory
+
+
+class TestMemory(unittest.TestCase):
+	''' Class for running unittests on functionalities of memory.py '''
+
+	def test_same_rows_as_sliced_lists(self):
+		''' Test that the memory keeps the rows and labels kept by appending to lists and slicing the last rows '''
+		random.seed(0)
+		capacity = 50
+		memory = ReplayMemory(capacity, num_features=3, initial_size=4)
+		features, stacks, labels = [], [], []
+
+		for hand in range(300):
+			if random.random() < 0.1:
+				# labelled rows recorded elsewhere
+				rows = [[random.random() for i in range(3)] for j in range(random.randint(0, 80))]
+				row_stacks = [random.randint(0, 100) for row in rows]
+				row_labels = [random.randint(-100, 100) for row in rows]
+				memory.extend(numpy.array(rows).reshape(-1, 3), numpy.array(row_stacks), numpy.array(row_labels))
+				features, stacks, labels = features + rows, stacks + row_stacks, labels + row_labels
+			else:
+				# decisions of a hand labelled at the end of the hand
+				for decision in range(random.randint(0, 8)):
+					row, stack = [random.random() for i in range(3)], random.randint(0, 100)
+					memory.append(row, stack)
+					features.append(row)
+					stacks.append(stack)
+				end_stack = random.randint(0, 100)
+				memory.label(end_stack)
+				labels += [end_stack - stack for stack in stacks[len(labels):]]
+
+			features, stacks, labels = features[-capacity:], stacks[-capacity:], labels[-capacity:]
+			kept_features, kept_stacks, kept_labels = memory.ordered()
+			self.assertTrue(numpy.allclose(kept_features, numpy.array(features, dtype=numpy.float32).reshape(-1, 3)))
+			self.assertEqual(kept_stacks.tolist(), stacks)
+			self.assertEqual(kept_labels.tolist(), labels)
+
+			# rows to fit are the same rows (in any order)
+			view_features, view_labels = memory.view()
+			self.assertEqual(sorted(view_labels.tolist()), sorted(labels))
+			self.assertEqual(len(view_features), len(labels))
+
+	def test_view_without_copy(self):
+		''' Test that rows to fit are views of the memory once full '''
+		memory = ReplayMemory(10, num_features=2, initial_size=4)
+		for i in range(25):
+			memory.append([i, i], 0)
+			memory.label(i)
+		self.assertEqual(len(memory), 10)
+		self.assertEqual(len(memory.features), 10)
+		features, labels = memory.view()
+		self.assertTrue(numpy.shares_memory(features, memory.features))
+		self.assertTrue(numpy.shares_memory(labels, memory.labels))
+		self.assertEqual(sorted(features[:, 0].tolist()), list(range(15, 25)))
+
+
+def main():
+	test = TestMemory()
+	test.test_same_rows_as_sliced_lists()
+	test.test_view_without_copy()
+
+if __name__ == "__main__":
+	main()
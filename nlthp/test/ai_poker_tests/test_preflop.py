@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+import numpy
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker import preflop
+from ai_poker.equity import enumerate_equity
+from ai_poker.evaluator.card_service import CardService
+from ai_poker.evaluator.deck import Deck
+
+
+def cards(*names):
+	''' Returns bitwise evaluations of the entered cards '''
+	return [CardService.create_evaluation(name) for name in names]
+
+
+class TestPreflop(unittest.TestCase):
+	''' Class for running unittests on functionalities of preflop.py '''
+
+	def test_hand_classes(self):
+		''' Test that the 1326 combos of hole cards fall into 169 classes '''
+		deck = Deck.get_deck_of_cards()
+		classes = set()
+		for i in range(len(deck)):
+			for j in range(i + 1, len(deck)):
+				classes.add(preflop.hand_class((deck[i], deck[j])))
+		self.assertEqual(classes, set(range(preflop.NUM_CLASSES)))
+
+		self.assertEqual(preflop.class_name(preflop.hand_class(cards('As', 'Ah'))), 'AA')
+		self.assertEqual(preflop.class_name(preflop.hand_class(cards('Kd', 'Ad'))), 'AKs')
+		self.assertEqual(preflop.class_name(preflop.hand_class(cards('7c', '2h'))), '72o')
+		self.assertEqual(len(preflop.class_combos(preflop.hand_class(cards('7c', '2h')))), 12)
+
+	def test_shipped_tables(self):
+		''' Test lookups in the preflop equity tables shipped with ai_poker '''
+		self.assertAlmostEqual(preflop.preflop_equity(cards('As', 'Ah')), 0.852, delta=0.01)
+		self.assertAlmostEqual(preflop.preflop_equity(cards('As', 'Ah'), num_players=9), 0.35, delta=0.02)
+		self.assertLess(preflop.preflop_equity(cards('7c', '2h'), num_players=3), preflop.preflop_equity(cards('7c', '2h')))
+		self.assertAlmostEqual(preflop.preflop_matchup(cards('As', 'Ah'), cards('Ks', 'Kh')), 0.82, delta=0.02)
+
+		# matchups are symmetric
+		head_to_head = preflop.get_tables()[0]
+		self.assertTrue(numpy.allclose(head_to_head + head_to_head.T, 1.0, atol=1e-4))
+
+		with self.assertRaises(Exception):
+			preflop.preflop_equity(cards('As', 'Ah'), num_players=10)
+
+	def test_exact_matchups(self):
+		''' Test that head-to-head equities match the exact enumeration of every board '''
+		for hole, other_hole in ((cards('Jh', 'Td'), cards('Qs', '8s')), (cards('As', 'Ks'), cards('Qs', 'Js')),
+								 (cards('7c', '7d'), cards('8c', '6c')), (cards('Ah', '2d'), cards('Ac', '2s'))):
+			self.assertAlmostEqual(preflop.head_to_head_equity(hole, other_hole), enumerate_equity([hole, other_hole])[0][2], places=9)
+
+		# shipped matchups are the exact class equities
+		cache = {}
+		for hole, other_hole in ((cards('Jh', 'Td'), cards('Qs', '8s')), (cards('Ah', 'Jh'), cards('Jd', '2c'))):
+			index, other = preflop.hand_class(hole), preflop.hand_class(other_hole)
+			self.assertAlmostEqual(preflop.preflop_matchup(hole, other_hole), preflop.class_equity(index, other, cache),
+								   delta=1.0 / preflop.EQUITY_SCALE)
+
+	def test_tables_file(self):
+		''' Test that preflop tables are written to and read back from file '''
+		head_to_head = numpy.full((preflop.NUM_CLASSES, preflop.NUM_CLASSES), 0.5)
+		multiway = numpy.linspace(0, 1, preflop.NUM_CLASSES * 8).reshape(preflop.NUM_CLASSES, 8)
+
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, 'preflop_equity.bin')
+			preflop.save_tables(head_to_head, multiway, 1, 1, path)
+			self.assertEqual(os.path.getsize(path), preflop.TABLES_HEADER.size + 2 * preflop.NUM_CLASSES * (preflop.NUM_CLASSES + 8))
+			loaded_head_to_head, loaded_multiway = preflop.load_tables(path)
+
+		self.assertTrue(numpy.allclose(loaded_head_to_head, head_to_head, atol=1e-4))
+		self.assertTrue(numpy.allclose(loaded_multiway, multiway, atol=1e-4))
+
+
+def main():
+	test = TestPreflop()
+	test.test_hand_classes()
+	test.test_shipped_tables()
+	test.test_exact_matchups()
+	test.test_tables_file()
+
+
+if __name__ == "__main__":
+	main()
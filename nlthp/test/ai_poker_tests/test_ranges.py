@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import unittest
+import numpy
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker.equity import enumerate_equity
+from ai_poker.ranges import parse_range, range_equity
+from ai_poker.evaluator.card_service import CardService
+
+
+def cards(*names):
+	''' Returns bitwise evaluations of the entered cards '''
+	return [CardService.create_evaluation(name) for name in names]
+
+
+class TestRanges(unittest.TestCase):
+	''' Class for running unittests on functionalities of ranges.py '''
+
+	def test_parse_range(self):
+		''' Test that ranges in standard notation are parsed into weighted combos '''
+		self.assertEqual(len(parse_range('QQ+')[0]), 18)
+		self.assertEqual(len(parse_range('AKs')[0]), 4)
+		self.assertEqual(len(parse_range('AKo')[0]), 12)
+		self.assertEqual(len(parse_range('AK')[0]), 16)
+		self.assertEqual(len(parse_range('ATs+')[0]), 16)
+		self.assertEqual(len(parse_range('76s-54s')[0]), 12)
+		self.assertEqual(len(parse_range('22-44, A2s-A5s')[0]), 34)
+		self.assertEqual(parse_range('AsKs')[0].tolist(), [sorted(cards('As', 'Ks'))])
+
+		# weights and combos removed by later entries
+		combos, weights = parse_range('AA, KK:0.5, KsKh:0')
+		self.assertEqual(len(combos), 11)
+		self.assertEqual(weights.sum(), 8.5)
+
+		# combos sharing a card with the board or dead cards
+		self.assertEqual(len(parse_range('AA, KK', board=cards('As', '2d', '3h'), dead=cards('Kc'))[0]), 6)
+
+		with self.assertRaises(Exception):
+			parse_range('AKx')
+		with self.assertRaises(Exception):
+			parse_range('AKs-QJo')
+
+	def test_range_equity(self):
+		''' Test range versus range equity against exact enumeration '''
+		board = cards('2c', '7s', '9d')
+		equity, combo_equities = range_equity(parse_range('AsKs'), parse_range('QhQd'), board=board)
+		self.assertAlmostEqual(equity, enumerate_equity([cards('As', 'Ks'), cards('Qh', 'Qd')], board)[0][2])
+		self.assertEqual(combo_equities.tolist(), [equity])
+
+		# combos blocked by the board have no equity
+		equity, combo_equities = range_equity(parse_range('AA, KK'), parse_range('QQ, JJ'), board=cards('As', '7s', '9d', 'Th'))
+		self.assertTrue(numpy.isnan(combo_equities).sum() == 3)
+		self.assertGreater(equity, 0.9)
+
+		# a range against itself splits on average
+		equity = range_equity(parse_range('QQ+, AK'), parse_range('QQ+, AK'), n_samples=200, seed=1)[0]
+		self.assertAlmostEqual(equity, 0.5)
+
+		equity = range_equity(parse_range('AA'), parse_range('KK'), n_samples=2000, seed=1)[0]
+		self.assertAlmostEqual(equity, 0.82, delta=0.02)
+
+		with self.assertRaises(Exception):
+			range_equity(parse_range('AsKs'), parse_range('AsKs'))
+
+
+def main():
+	test = TestRanges()
+	test.test_parse_range()
+	test.test_range_equity()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import random
+import shutil
+import tempfile
+import unittest
+import numpy
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker.history import HandHistory, HistorySink
+from ai_poker.player import Player
+from ai_poker.replay import replay, replay_decisions
+from ai_poker.table import Table
+
+
+class TestReplay(unittest.TestCase):
+	''' Class for running unittests on functionalities of replay.py '''
+
+	def setUp(self):
+		''' Simulates hands between Players taking random actions and records them to a hand history '''
+		random.seed(0)
+		self.table = Table(small_bind=10, big_blind=20, max_buy_in=200, seed=0)
+		self.players = [Player('Player ' + str(i), 10**5, 50, 10**5, raise_increase=0.7) for i in range(4)]
+		for player in self.players:
+			self.table.add_player(player)
+			player.buy_chips(200)
+
+		self.path = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, self.path)
+		sink = HistorySink(self.table, self.path, shard_size=64)
+		self.table.add_sink(sink)
+		with contextlib.redirect_stdout(io.StringIO()):
+			num_hands = 200
+			while num_hands > 0:
+				if self.table.play_hand():
+					num_hands -= 1
+				else:
+					# players buy in again when a single one has chips left
+					for player in self.players:
+						player.cash_out()
+						player.buy_chips(200)
+		sink.close()
+		self.history = HandHistory(self.path)
+
+	def test_replay_features_and_labels(self):
+		''' Test that replayed features/labels of each player are the features/labels recorded by the player '''
+		features, labels, decisions = replay(self.history)
+		self.assertEqual(features.shape, (len(labels), 50))
+		self.assertEqual(features.dtype, numpy.float32)
+		for i, player in enumerate(self.players):
+			rows = decisions['player'] == i
+			self.assertTrue(rows.any())
+			self.assertTrue(numpy.array_equal(features[rows], numpy.array(player.get_features(), dtype=numpy.float32)))
+			self.assertEqual(list(labels[rows]), player.get_labels())
+
+	def test_replay_table_states(self):
+		''' Test that reconstructed table states are consistent at every decision '''
+		states = []
+
+		def visit(row, action, state):
+			states.append((row, action, state.to_call, state.pot, sum(state.bets) + sum(state.current_bets)))
+
+		decisions = replay_decisions(self.history, visit)
+		self.assertEqual(len(states), len(decisions['hand']))
+		for row, action, to_call, pot, bets in states:
+			self.assertEqual(pot, bets)
+			self.assertEqual(decisions['to_call'][row], to_call)
+			if action[0] == 'check':
+				self.assertEqual(to_call, 0)
+
+
+def main():
+	test = TestReplay()
+	test.setUp()
+	test.test_replay_features_and_labels()
+	test.doCleanups()
+	test.setUp()
+	test.test_replay_table_states()
+	test.doCleanups()
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import unittest
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker.evaluator.card_service import CardService
+from ai_poker.player import Player
+from ai_poker.table import Table
+
+
+def cards(text):
+	''' Returns cards in bitwise evaluation format of a string (e.g. "As Kd") '''
+	return [CardService.create_evaluation(card) for card in text.split()]
+
+
+class NoEvaluator(object):
+	''' Evaluator failing if any hand is evaluated '''
+
+	def evaluate(self, board, hole):
+		raise Exception('No hand should be evaluated.')
+
+
+class TestTable(unittest.TestCase):
+	''' Class for running unittests on functionalities of table.py '''
+
+	def setUp(self):
+		''' SetUp Table in a state where hand is over (bets entered, community cards dealt) '''
+		self.table = Table(small_bind=10, big_blind=20, max_buy_in=200)
+		self.players = [Player('Player ' + str(i), 0, 1, 1, raise_increase=0.5) for i in range(4)]
+		self.table.active_players = self.players
+		self.table.state.reset(self.players)
+		self.table.state.cards = cards('2c 7d 9h Js 3s')
+		for player, hole in zip(self.players, ['Ah As', 'Kh Ks', 'Qh Qd', 'Ac Ad']):
+			player.take_hole_cards(tuple(cards(hole)))
+
+	def test_side_pots(self):
+		''' Test that a short all-in best hand only wins the main pot and folded players do not win '''
+		for i, bet in enumerate([50, 100, 100, 20]):
+			self.table.state.bets[i] = bet
+		self.table.state.fold(3)
+		self.table.pay_winners()
+		self.assertEqual([player.get_stack() for player in self.players], [170, 100, 0, 0])
+
+	def test_split_pot(self):
+		''' Test that a split pot gives odd chips to the first winner after dealer '''
+		self.players[1].take_hole_cards(tuple(cards('Ac Ad')))
+		for i, bet in enumerate([45, 45, 45, 0]):
+			self.table.state.bets[i] = bet
+		self.table.state.fold(3)
+		self.table.dealer = 0
+		self.table.pay_winners()
+		self.assertEqual([player.get_stack() for player in self.players], [67, 68, 0, 0])
+
+	def test_single_player_left(self):
+		''' Test that a single player left wins the pot without any hand being evaluated '''
+		self.table.eval = NoEvaluator()
+		for i, bet in enumerate([20, 60, 40, 10]):
+			self.table.state.bets[i] = bet
+		for i in (0, 2, 3):
+			self.table.state.fold(i)
+		self.table.pay_winners()
+		self.assertEqual([player.get_stack() for player in self.players], [0, 130, 0, 0])
+
+
+def main():
+	test = TestTable()
+	test.setUp()
+	test.test_side_pots()
+	test.setUp()
+	test.test_split_pot()
+	test.setUp()
+	test.test_single_player_left()
+
+if __name__ == "__main__":
+	main()
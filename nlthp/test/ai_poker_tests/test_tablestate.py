@@ -44,11 +44,41 @@ class TestTableState(unittest.TestCase):
 		self.assertFalse(self.tablestate.cards) 
 		self.assertFalse(self.tablestate.currently_active) 
 
+	def test_tablestate_reset(self):
+		''' Test that bets, folded and all-in players are tracked and cleared by reset (bet lists are reused) '''
+
+		bets = self.tablestate.bets
+		self.tablestate.add_bet(0, 10)
+		self.tablestate.add_bet(1, 20)
+		self.tablestate.fold(0)
+		self.tablestate.go_all_in(1)
+		self.assertEqual(self.tablestate.max_bet, 20)
+		self.assertEqual(self.tablestate.pot, 30)
+		self.assertTrue(self.tablestate.is_folded(0))
+		self.assertTrue(self.tablestate.is_all_in(1))
+		self.assertEqual(self.tablestate.num_can_act(), len(self.players) - 2)
+		self.assertEqual(self.tablestate.last_can_act(), len(self.players) - 1)
+
+		self.tablestate.end_round()
+		self.assertEqual(self.tablestate.bets[:2], [10, 20])
+		self.assertEqual(self.tablestate.max_bet, 0)
+		self.assertEqual(self.tablestate.pot, 30)
+
+		self.tablestate.reset(self.players)
+		self.assertIs(self.tablestate.bets, bets)
+		self.assertEqual(self.tablestate.bets, [0] * len(self.players))
+		self.assertEqual(self.tablestate.pot, 0)
+		self.assertFalse(self.tablestate.folded)
+		self.assertFalse(self.tablestate.all_in)
+		self.assertTrue(self.tablestate.can_act(0))
+
 
 def main():
 	test = TestTableState()
 	test.setUp()
 	test.test_tablestate_set_up()
+	test.setUp()
+	test.test_tablestate_reset()
 
 if __name__ == "__main__":
 	main()
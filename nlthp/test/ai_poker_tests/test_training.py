@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import tempfile
+import threading
+import unittest
+import numpy
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.linear_model import SGDRegressor
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker.features import NUM_FEATURES
+from ai_poker.history import HandHistory
+from ai_poker.player import Player
+from ai_poker.simulation import simulate
+from ai_poker.table import Table
+from ai_poker.training import BackgroundTraining, IncrementalTraining
+
+
+class RecordingRegressor(SGDRegressor):
+	''' SGDRegressor recording the number of rows of each fit/partial_fit call '''
+
+	def fit(self, X, y, **kwargs):
+		self.calls = getattr(self, 'calls', []) + [('fit', len(y))]
+		return super().fit(X, y, **kwargs)
+
+	def partial_fit(self, X, y, **kwargs):
+		self.calls = getattr(self, 'calls', []) + [('partial_fit', len(y))]
+		return super().partial_fit(X, y, **kwargs)
+
+
+class TestTraining(unittest.TestCase):
+	''' Class for running unittests on functionalities of training.py '''
+
+	def setUp(self):
+		''' SetUp random generator of features/labels '''
+		self.rng = numpy.random.default_rng(0)
+
+	def play(self, player, num_rows):
+		''' Records num_rows random decisions labelled in a single hand '''
+		for i in range(num_rows):
+			player.replay_memory.append(self.rng.random(NUM_FEATURES), int(self.rng.integers(100)))
+		player.replay_memory.label(int(self.rng.integers(100)))
+
+	def test_warm_start(self):
+		''' Test that ensembles grow with estimators fitted on the newest rows and are refitted periodically '''
+		player = Player('Player', 0, 1, 500, regressor=GradientBoostingRegressor(n_estimators=5),
+						training=IncrementalTraining(refit_every=2, extra_estimators=3))
+		estimators = []
+		for training in range(5):
+			self.play(player, 40)
+			player.train_player()
+			estimators.append(len(player.regressor.estimators_))
+		self.assertEqual(estimators, [5, 8, 11, 5, 8])
+		self.assertTrue(player.fit)
+
+	def test_default_refits(self):
+		''' Test that warm started ensembles are refitted by default before growing past refit_every updates '''
+		training = IncrementalTraining()
+		player = Player('Player', 0, 1, 500, regressor=GradientBoostingRegressor(n_estimators=5), training=training)
+		estimators = []
+		for training_round in range(2 * training.refit_every + 2):
+			self.play(player, 10)
+			player.train_player()
+			estimators.append(len(player.regressor.estimators_))
+		self.assertEqual(max(estimators), 5 + training.refit_every * training.extra_estimators)
+		self.assertEqual(estimators.count(5), 2)
+		self.assertEqual(estimators[training.refit_every + 1], 5)
+
+	def test_partial_fit(self):
+		''' Test that regressors with partial_fit are only updated with the rows added since the previous training '''
+		player = Player('Player', 0, 1, 100, regressor=RecordingRegressor(), training=IncrementalTraining())
+		self.play(player, 60)
+		player.train_player()
+		self.play(player, 30)
+		player.train_player()
+		self.play(player, 150)
+		player.train_player()
+		player.train_player()
+		# rows forgotten before training are not trained on
+		self.assertEqual(player.regressor.calls, [('fit', 60), ('partial_fit', 30), ('partial_fit', 100)])
+
+	def test_background_training(self):
+		''' Test that copies of regressors are trained on snapshots of memory and swapped in when collected '''
+		player = Player('Player', 0, 1, 500, regressor=RecordingRegressor(max_iter=5, tol=None))
+		regressor = player.regressor
+		self.play(player, 40)
+		trainer = BackgroundTraining()
+		self.assertTrue(trainer.train(player))
+		self.assertFalse(trainer.train(player))
+
+		# rows recorded while training are not part of the snapshot
+		self.play(player, 20)
+		self.assertIs(player.regressor, regressor)
+		self.assertFalse(player.fit)
+		self.assertEqual(trainer.collect(wait=True), [player])
+		self.assertIsNot(player.regressor, regressor)
+		self.assertTrue(player.fit)
+		self.assertEqual(player.regressor.calls, [('fit', 40)])
+		self.assertFalse(hasattr(regressor, 'calls'))
+
+		# players that do not train are skipped
+		player.train = False
+		self.assertFalse(trainer.train(player))
+		trainer.close()
+		self.assertEqual(trainer.pending, {})
+
+	def test_failed_simulation(self):
+		''' Test that background training and hand history are closed when a hand fails '''
+		table = Table(small_bind=10, big_blind=20, max_buy_in=200, seed=0)
+		for i in range(3):
+			table.add_player(Player('Player ' + str(i), 10**5, 10, 10**3, regressor=RecordingRegressor(max_iter=5, tol=None),
+									raise_increase=0.7))
+		play_hand = table.play_hand
+
+		def failing_hand(narrate_hands=False):
+			if len(table.sinks[0].offsets) == 30:
+				raise Exception('Hand failed.')
+			return play_hand(narrate_hands)
+
+		table.play_hand = failing_hand
+		threads = threading.active_count()
+		with tempfile.TemporaryDirectory() as path:
+			with self.assertRaises(Exception), contextlib.redirect_stdout(io.StringIO()):
+				simulate(table, 50, hands_before_training=10, hands_between_training=10, hands_between_buyin=5, history=path,
+						 background_training=True)
+			self.assertEqual(HandHistory(path).num_hands, 29)
+		self.assertEqual(table.sinks, [])
+		self.assertEqual(threading.active_count(), threads)
+
+
+def main():
+	test = TestTraining()
+	test.setUp()
+	test.test_warm_start()
+	test.setUp()
+	test.test_default_refits()
+	test.setUp()
+	test.test_partial_fit()
+	test.setUp()
+	test.test_background_training()
+	test.setUp()
+	test.test_failed_simulation()
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import unittest
+import numpy
+from sklearn.ensemble import GradientBoostingRegressor
+import sys
+sys.path.append("..")											# allows imports from parent directories
+from ai_poker.player import Player
+from ai_poker.table import Table
+from ai_poker.vector_table import VectorTable, PlayerPolicy, FOLD, CHECK, CALL, RAISE
+
+
+def scripted_action(hole, to_call, current_bet, stack, min_raise_amount):
+	''' Returns action code and raise amount of a deterministic strategy (raises pairs all-in and high cards by the minimum) '''
+	ranks = [(card >> 8) & 0xF for card in hole]
+	if ranks[0] == ranks[1] and stack + current_bet >= min_raise_amount:
+		return RAISE, stack + current_bet
+	if max(ranks) >= 10 and stack + current_bet >= min_raise_amount:
+		return RAISE, min_raise_amount
+	if max(ranks) >= 10 or to_call == 0:
+		return (CHECK, 0) if to_call == 0 else (CALL, 0)
+	return (CALL, 0) if to_call <= 20 else (FOLD, 0)
+
+
+class ScriptedPlayer(Player):
+	''' Player taking the actions of scripted_action '''
+
+	def perform_action(self, table_state, narrate_hands=False):
+		current_bet = table_state.current_bets[table_state.currently_active]
+		action, amount = scripted_action(self.cards, table_state.to_call, current_bet, self.stack, table_state.min_raise_amount)
+		return {FOLD: ('fold',), CHECK: ('check',), CALL: ('call',), RAISE: ('raise', amount)}[action]
+
+
+class ScriptedPolicy(object):
+	''' Policy taking the actions of scripted_action on every table '''
+
+	def act(self, table, tables, seat):
+		actions, amounts = [], []
+		for i in tables:
+			current_bet = table.current_bets[i, seat]
+			action, amount = scripted_action(table.holes[i, seat], table.current_bets[i].max() - current_bet,
+											 current_bet, table.stacks[i, seat], table.min_raise_amount[i])
+			actions.append(action)
+			amounts.append(amount)
+		return numpy.array(actions), numpy.array(amounts)
+
+
+class TestVectorTable(unittest.TestCase):
+	''' Class for running unittests on functionalities of vector_table.py '''
+
+	def test_same_results_as_table(self):
+		''' Test that hands played in lockstep end as the same hands played by Table '''
+		num_hands = 300
+		start_stacks = [200, 60, 150, 25, 120]
+
+		table = Table(small_bind=10, big_blind=20, max_buy_in=200, seed=3)
+		players = [ScriptedPlayer('Player ' + str(i), 0, 1, 10, raise_increase=0.5) for i in range(len(start_stacks))]
+		for player in players:
+			table.add_player(player)
+
+		results = []
+		for hand in range(num_hands):
+			for player, stack in zip(players, start_stacks):
+				player.stack = stack
+			table.active_players, table.eliminated_players, table.dealer = [], players[:], 0
+			table.play_hand()
+			results.append([player.get_stack() - stack for player, stack in zip(players, start_stacks)])
+
+		vector_table = VectorTable(num_hands, len(start_stacks), 10, 20, 200, seed=3)
+		vector_table.stacks[:] = start_stacks
+		vector_results = vector_table.play_hands([ScriptedPolicy()] * len(start_stacks))
+
+		self.assertEqual(vector_results.tolist(), results)
+		self.assertEqual(vector_results.sum(), 0)
+
+	def test_player_policies(self):
+		''' Test hands played by random and trained Player policies '''
+		players = [Player('Agent ' + str(i), 10**5, 50, 10**4, GradientBoostingRegressor(n_estimators=5), 0.8) for i in range(4)]
+		policies = [PlayerPolicy(player, seed=i) for i, player in enumerate(players)]
+		vector_table = VectorTable(200, 4, 10, 20, 200, seed=1)
+
+		results, features, labels, tables, seats = vector_table.play_hands(policies, record=True)
+		self.assertEqual(vector_table.stacks.sum(), 200 * 4 * 200)
+		self.assertTrue((vector_table.stacks >= 0).all())
+		self.assertEqual(features.shape, (len(labels), 50))
+		self.assertEqual(features.dtype, players[0].replay_memory.features.dtype)
+		self.assertEqual(set(features[:, 43:47].sum(axis=1)), {1})
+
+		# labels of the last decision of each seat of a table add up with its stack before the decision
+		for table, seat in list(zip(tables, seats))[:50]:
+			rows = (tables == table) & (seats == seat)
+			self.assertTrue((features[rows, 42] + labels[rows] == vector_table.stacks[table, seat]).all())
+
+		# trained players pick the action with highest predicted gain
+		for player in players:
+			player.regressor.fit(features, labels)
+			player.fit = True
+		for hand in range(3):
+			vector_table.play_hands(policies)
+		self.assertEqual(vector_table.stacks.sum(), 200 * 4 * 200)
+
+
+def main():
+	test = TestVectorTable()
+	test.test_same_results_as_table()
+	test.test_player_policies()
+
+
+if __name__ == "__main__":
+	main()